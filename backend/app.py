@@ -18,10 +18,20 @@ CORS(app)
 from routes.respondent import respondent_bp
 from routes.diagnosis import diagnosis_bp
 from routes.roadmap import roadmap_bp
+from routes.analytics import analytics_bp
+from routes.bulk import bulk_bp
+from routes.metrics import metrics_bp
+import metrics
+import storage
+import roadmap_sync
 
 app.register_blueprint(respondent_bp, url_prefix='/api')
 app.register_blueprint(diagnosis_bp, url_prefix='/api')
 app.register_blueprint(roadmap_bp, url_prefix='/api')
+app.register_blueprint(analytics_bp, url_prefix='/api')
+app.register_blueprint(bulk_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp, url_prefix='/api')
+metrics.init_app(app)
 
 
 @app.route('/', defaults={'path': ''})
@@ -35,6 +45,8 @@ def serve_frontend(path):
 
 with app.app_context():
     init_db()
+    storage.start()
+    roadmap_sync.start()
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001, host='0.0.0.0')
@@ -0,0 +1,276 @@
+"""
+엔드포인트 벤치마크 (Google Sheets 에뮬레이터 위에서 실행)
+
+sheets_emulator 에 정적 참조 데이터(database.db)와 응답자 N 명 분량의 동적 데이터를 채운 뒤,
+routes/ 의 각 엔드포인트를 Flask 테스트 클라이언트로 호출해 다음을 보고합니다.
+
+  cold      : 캐시를 모두 비운 뒤 첫 요청의 응답 시간과 Sheets API 호출 수
+  p50 / p95 : 캐시가 찬 상태에서 반복 요청의 응답 시간 (할당량 대기·재시도 포함)
+  calls/req : 반복 요청(쓰기는 write-behind 플러시 포함) 한 번당 Sheets API 호출 수
+
+캐시·저널·스냅샷 파일은 임시 디렉터리를 쓰므로 운영 데이터에 영향을 주지 않습니다.
+
+CLI : python bench.py [--respondents 2000] [--iterations 20] [--latency 0.1]
+                      [--per-row-latency 0.00001] [--read-quota N] [--write-quota N]
+                      [--only roadmap] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from collections import Counter
+
+_workdir = tempfile.mkdtemp(prefix='competency-bench-')
+os.environ.update({
+    'STORAGE_BACKEND': 'sheets',
+    'SPREADSHEET_ID': 'emulator',
+    'SHARED_CACHE_PATH': os.path.join(_workdir, 'shared_cache.db'),
+    'WRITE_JOURNAL_PATH': os.path.join(_workdir, 'write_journal.db'),
+    'STATIC_SNAPSHOT_PATH': os.path.join(_workdir, 'static_snapshot.json.gz'),
+    'ROADMAP_SYNC_INTERVAL': '0',
+    'METRICS_DIR': '',
+    'ADMIN_TOKEN': 'bench',
+})
+
+import models
+import quota
+import sheets
+import sheets_emulator
+import write_queue
+from scoring import compute_priorities
+from roadmap_rules import phase_map_of, courses_by_competency
+
+JOB_TYPES = ('연구직', '행정직', '연구관리직')
+CAREER_STAGES = ('신진', '중견', '리더')
+ADMIN_HEADERS = {'Authorization': 'Bearer bench'}
+
+
+# ─── 데이터 준비 ──────────────────────────────────────────────────────────────
+
+def _profile_scenarios(groups, scenarios, sc_comp):
+    """{(job_type, career_stage): [(scenario_id, competency_id), ...]} — 화면에 나오는 시나리오."""
+    result = {}
+    for job_type in JOB_TYPES:
+        for career_stage in CAREER_STAGES:
+            allowed = {
+                g['id'] for g in groups
+                if g['sub_category'] is None
+                or (g['name'] == '리더십' and g['sub_category'] == career_stage)
+                or (g['name'] == '직무역량' and g['sub_category'] == job_type)
+            }
+            result[job_type, career_stage] = [
+                (s['id'], sc_comp[s['id']][0]) for s in scenarios
+                if s['group_id'] in allowed and sc_comp.get(s['id'])
+            ]
+    return result
+
+
+def seed(spreadsheet, respondents, rng):
+    """응답자 respondents 명과 그 진단 결과·로드맵을 API 호출 없이 시트에 채움."""
+    import storage
+    groups = storage.get_competency_groups()
+    sc_comp = {}
+    for row in storage.get_scenario_competencies():
+        sc_comp.setdefault(row['scenario_id'], []).append(row['competency_id'])
+    choices = _profile_scenarios(groups, storage.get_scenarios(), sc_comp)
+    courses_by_comp = courses_by_competency(storage.get_courses())
+
+    headers = sheets._DYNAMIC_HEADERS
+    resp_rows, diag_rows, road_rows = [], [], []
+    for rid in range(1, respondents + 1):
+        job_type, career_stage = rng.choice(JOB_TYPES), rng.choice(CAREER_STAGES)
+        resp_rows.append([rid, f'bench-{rid}', 'bench', job_type, career_stage, '2025-01-01 00:00:00'])
+        picked = rng.sample(choices[job_type, career_stage], min(12, len(choices[job_type, career_stage])))
+        results = [{'competency_id': cid, 'scenario_id': sid, 'likert_score': rng.randint(1, 5)}
+                   for sid, cid in picked]
+        ranks = compute_priorities(results)
+        for r in results:
+            diag_rows.append([len(diag_rows) + 1, rid, r['competency_id'], r['scenario_id'],
+                              r['likert_score'], ranks[r['competency_id']], 1])
+        order_index = 0
+        for cid, phase in phase_map_of(ranks).items():
+            for course in courses_by_comp.get(cid, []):
+                road_rows.append([len(road_rows) + 1, rid, course['id'], cid, order_index, phase])
+                order_index += 1
+
+    spreadsheet.add('respondents', [headers['respondents']] + resp_rows)
+    spreadsheet.add('diagnosis_results', [headers['diagnosis_results']] + diag_rows)
+    spreadsheet.add('roadmap_items', [headers['roadmap_items']] + road_rows)
+    spreadsheet.add(sheets.ID_COUNTER_SHEET, [
+        ['sheet', 'next_id'],
+        ['respondents', len(resp_rows) + 1],
+        ['diagnosis_results', len(diag_rows) + 1],
+        ['roadmap_items', len(road_rows) + 1],
+    ])
+    return choices, {'respondents': len(resp_rows), 'diagnosis_results': len(diag_rows),
+                     'roadmap_items': len(road_rows)}
+
+
+# ─── 시나리오 ─────────────────────────────────────────────────────────────────
+
+def cases(client, respondents, choices, rng):
+    """(이름, 요청 함수) 목록. 요청 함수는 호출마다 다른 응답자를 대상으로 함."""
+    def rid():
+        return rng.randint(1, respondents)
+
+    def profile():
+        return rng.choice(JOB_TYPES), rng.choice(CAREER_STAGES)
+
+    def results_for(job_type, career_stage):
+        picked = rng.sample(choices[job_type, career_stage], min(12, len(choices[job_type, career_stage])))
+        return [{'competency_id': cid, 'scenario_id': sid, 'likert_score': rng.randint(1, 5)}
+                for sid, cid in picked]
+
+    def post_respondent():
+        job_type, career_stage = profile()
+        return client.post('/api/respondents', json={'name': 'bench', 'job_type': job_type,
+                                                      'career_stage': career_stage})
+
+    def post_diagnosis():
+        return client.post('/api/diagnosis', json={'respondent_id': rid(),
+                                                    'results': results_for(*profile())})
+
+    # PUT 은 본문을 만들기 위한 GET(캐시 적중)까지 포함해 잰다
+    def put_diagnosis():
+        target = rid()
+        rows = client.get(f'/api/diagnosis/{target}').get_json() or []
+        rankings = [{'competency_id': r['competency_id'], 'priority_rank': i, 'is_active': 1}
+                    for i, r in enumerate(reversed(rows), 1)]
+        return client.put(f'/api/diagnosis/{target}', json={'rankings': rankings})
+
+    def put_roadmap():
+        target = rid()
+        phases = client.get(f'/api/roadmap/{target}').get_json()
+        items = [{'id': item['id'], 'order_index': i, 'phase': phase}
+                 for phase, phase_items in phases.items() for i, item in enumerate(reversed(phase_items))]
+        return client.put(f'/api/roadmap/{target}', json={'items': items})
+
+    def post_import():
+        lines = []
+        for i in range(20):
+            job_type, career_stage = profile()
+            lines.append(json.dumps({'name': f'import-{i}', 'job_type': job_type, 'career_stage': career_stage,
+                                     'results': results_for(job_type, career_stage)}, ensure_ascii=False))
+        return client.post('/api/import?format=jsonl', data='\n'.join(lines).encode('utf-8'),
+                           content_type='application/x-ndjson', headers=ADMIN_HEADERS)
+
+    def get_export():
+        response = client.get('/api/export?format=jsonl', headers=ADMIN_HEADERS)
+        response.get_data()     # 스트리밍 응답을 끝까지 소비
+        return response
+
+    return [
+        ('GET  /api/competencies', lambda: client.get('/api/competencies?job_type=%s&career_stage=%s' % profile())),
+        ('GET  /api/scenarios', lambda: client.get('/api/scenarios?job_type=%s&career_stage=%s' % profile())),
+        ('POST /api/respondents', post_respondent),
+        ('GET  /api/respondents/<id>', lambda: client.get(f'/api/respondents/{rid()}')),
+        ('GET  /api/respondents/<id>/summary', lambda: client.get(f'/api/respondents/{rid()}/summary')),
+        ('POST /api/diagnosis', post_diagnosis),
+        ('GET  /api/diagnosis/<id>', lambda: client.get(f'/api/diagnosis/{rid()}')),
+        ('PUT  /api/diagnosis/<id>', put_diagnosis),
+        ('GET  /api/courses/<id>', lambda: client.get(f'/api/courses/{rid()}')),
+        ('POST /api/roadmap/<id>/generate', lambda: client.post(f'/api/roadmap/{rid()}/generate')),
+        ('GET  /api/roadmap/<id>', lambda: client.get(f'/api/roadmap/{rid()}')),
+        ('PUT  /api/roadmap/<id>', put_roadmap),
+        ('GET  /api/analytics', lambda: client.get('/api/analytics')),
+        ('POST /api/import', post_import),
+        ('GET  /api/export', get_export),
+        ('GET  /api/metrics', lambda: client.get('/api/metrics')),
+    ]
+
+
+# ─── 측정 ──────────────────────────────────────────────────────────────────────
+
+def _timed(spreadsheet, request):
+    """요청 하나의 (ms, 상태 코드). 쓰기는 write-behind 플러시까지 끝낸 뒤 시간을 잰다."""
+    started = time.perf_counter()
+    status = request().status_code
+    try:
+        write_queue.flush(sheets._flush_entries)
+    except Exception:
+        status = 'flush_error'     # 항목은 저널에 남아 다음 플러시에서 다시 시도됨
+    return (time.perf_counter() - started) * 1000, status
+
+
+def run_case(spreadsheet, request, iterations):
+    sheets.invalidate()
+    spreadsheet.reset_calls()
+    cold_ms, status = _timed(spreadsheet, request)
+    cold_calls = Counter(spreadsheet.calls)
+
+    spreadsheet.reset_calls()
+    timings, statuses = [], Counter([status])
+    for _ in range(iterations):
+        ms, status = _timed(spreadsheet, request)
+        timings.append(ms)
+        statuses[status] += 1
+    warm_calls = Counter(spreadsheet.calls)
+    timings.sort()
+    return {
+        'cold_ms': cold_ms,
+        'cold_calls': sum(cold_calls.values()),
+        'p50_ms': statistics.median(timings),
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'calls_per_request': sum(warm_calls.values()) / iterations,
+        'statuses': {str(code): n for code, n in sorted(statuses.items(), key=lambda x: str(x[0]))},
+        'cold_call_breakdown': {f'{op} {sheet}'.strip(): n for (op, sheet), n in sorted(cold_calls.items())},
+        'warm_call_breakdown': {f'{op} {sheet}'.strip(): n for (op, sheet), n in sorted(warm_calls.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sheets 에뮬레이터 위에서 엔드포인트 벤치마크')
+    parser.add_argument('--respondents', type=int, default=2000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.1, help='API 호출당 지연(초)')
+    parser.add_argument('--per-row-latency', type=float, default=0.00001, help='행당 추가 지연(초)')
+    parser.add_argument('--read-quota', type=int, help='분당 읽기 요청 한도 (기본 무제한)')
+    parser.add_argument('--write-quota', type=int, help='분당 쓰기 요청 한도 (기본 무제한)')
+    parser.add_argument('--only', help='이름에 이 문자열이 들어간 엔드포인트만')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='결과를 JSON 으로 출력')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    spreadsheet = sheets_emulator.Spreadsheet()
+    spreadsheet.load_static(models.DB_PATH)
+    sheets_emulator.install(spreadsheet)
+    choices, sizes = seed(spreadsheet, args.respondents, rng)
+
+    # 데이터 준비가 끝난 뒤 지연·할당량을 켜고 앱을 띄움
+    spreadsheet.latency = args.latency
+    spreadsheet.per_row_latency = args.per_row_latency
+    spreadsheet.quota = {'read': args.read_quota, 'write': args.write_quota}
+    # 앱의 할당량 버킷도 같은 한도로 (지정하지 않으면 버킷 없이)
+    quota.SHEETS_READ_QUOTA = args.read_quota or 0
+    quota.SHEETS_WRITE_QUOTA = args.write_quota or 0
+    from app import app
+    client = app.test_client()
+
+    results = {}
+    for name, request in cases(client, args.respondents, choices, rng):
+        if args.only and args.only not in name:
+            continue
+        results[name] = run_case(spreadsheet, request, args.iterations)
+
+    if args.json:
+        json.dump({'sizes': sizes, 'args': vars(args), 'results': results}, sys.stdout,
+                  ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print(f"rows: {sizes}  latency={args.latency}s per_row={args.per_row_latency}s iterations={args.iterations}")
+    print(f"{'endpoint':36} {'cold ms':>9} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'calls/req':>10}  status")
+    for name, r in results.items():
+        print(f"{name:36} {r['cold_ms']:9.1f} {r['cold_calls']:6d} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} "
+              f"{r['calls_per_request']:10.2f}  {r['statuses']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
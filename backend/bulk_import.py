@@ -0,0 +1,167 @@
+"""
+응답자·진단 결과 일괄 가져오기 (오프라인/종이 세션 결과 입력용)
+
+입력은 한 줄씩 스트리밍으로 읽으며, 응답자 IMPORT_BATCH_SIZE 명 단위로 우선순위를
+메모리에서 계산해 storage.import_diagnoses 로 한 번에 기록합니다.
+
+  JSONL : 한 줄에 응답자 한 명
+          {"name": ..., "organization": ..., "job_type": ..., "career_stage": ...,
+           "results": [{"competency_id": 1, "scenario_id": 3, "likert_score": 4}, ...]}
+  CSV   : 한 행에 선택 하나. 헤더 필수
+          respondent_key,name,organization,job_type,career_stage,competency_id,scenario_id,likert_score
+          연속된 행 중 respondent_key 가 같은 행을 한 응답자로 묶음
+          (respondent_key 컬럼이 없으면 name/organization/job_type/career_stage 로 묶음)
+
+API : POST /api/import?format=csv|jsonl (본문이 파일 내용, Authorization: Bearer $ADMIN_TOKEN)
+CLI : python bulk_import.py results.csv [--format csv|jsonl] [--batch-size N]
+
+환경변수:
+  IMPORT_BATCH_SIZE : 한 번에 기록할 응답자 수 (기본 200)
+"""
+
+import os
+import csv
+import sys
+import json
+import argparse
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+except ImportError:
+    pass
+
+import storage
+from scoring import LIKERT_MIN, LIKERT_MAX, compute_priorities, valid_result
+
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '200'))
+MAX_REPORTED_ERRORS = 100
+FORMATS = ('csv', 'jsonl')
+
+_PROFILE_FIELDS = ('name', 'organization', 'job_type', 'career_stage')
+_RESULT_FIELDS = ('competency_id', 'scenario_id', 'likert_score')
+
+
+def _to_int(value):
+    """정수 또는 정수 문자열만 int 로. 실수·불리언 등은 TypeError."""
+    if isinstance(value, str):
+        return int(value.strip())
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise TypeError(f'not an integer: {value!r}')
+
+
+def _validate(respondent, results):
+    """(respondent, results) 정규화. 잘못된 입력이면 ValueError."""
+    for field in ('name', 'job_type', 'career_stage'):
+        if not respondent.get(field):
+            raise ValueError(f'{field} is required')
+    if not results:
+        raise ValueError('results are required')
+    if not isinstance(results, list):
+        raise ValueError('results must be a list')
+    normalized = []
+    for r in results:
+        try:
+            # CSV 값은 문자열이므로 정수로 바꾼 뒤 단건 제출(POST /diagnosis)과 같은 규칙으로 검사
+            result = {field: _to_int(r[field]) for field in _RESULT_FIELDS}
+        except (KeyError, TypeError, ValueError):
+            result = None
+        if result is None or not valid_result(result):
+            raise ValueError(f'invalid result: {r} (positive integer competency_id and scenario_id, '
+                             f'likert_score between {LIKERT_MIN} and {LIKERT_MAX})')
+        normalized.append(result)
+    profile = {field: respondent.get(field) or '' for field in _PROFILE_FIELDS}
+    return profile, normalized
+
+
+def parse_jsonl(lines):
+    """(line_no, respondent, results, error) 를 한 줄씩 생성."""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+            if not isinstance(item, dict):
+                raise ValueError('expected a JSON object')
+            respondent, results = _validate(item, item.get('results'))
+        except ValueError as exc:
+            yield line_no, None, None, str(exc)
+            continue
+        yield line_no, respondent, results, None
+
+
+def parse_csv(lines):
+    """(line_no, respondent, results, error) 를 응답자 단위로 생성. 같은 응답자의 행은 연속해야 함."""
+    reader = csv.DictReader(lines)
+    group_key, group_line, group_rows = None, None, []
+    for row in reader:
+        key = row.get('respondent_key') or tuple(row.get(f) or '' for f in _PROFILE_FIELDS)
+        if group_rows and key != group_key:
+            yield _csv_group(group_line, group_rows)
+            group_rows = []
+        if not group_rows:
+            group_key, group_line = key, reader.line_num
+        group_rows.append(row)
+    if group_rows:
+        yield _csv_group(group_line, group_rows)
+
+
+def _csv_group(line_no, rows):
+    try:
+        respondent, results = _validate(rows[0], rows)
+    except ValueError as exc:
+        return line_no, None, None, str(exc)
+    return line_no, respondent, results, None
+
+
+def import_records(records, batch_size=IMPORT_BATCH_SIZE):
+    """parse_* 결과를 batch_size 명씩 storage 에 기록하고 요약을 반환."""
+    summary = {'respondents': 0, 'results': 0, 'respondent_ids': [], 'error_count': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        created = storage.import_diagnoses(batch)
+        summary['respondents'] += len(created)
+        summary['results'] += sum(len(results) for _, results, _ in batch)
+        summary['respondent_ids'].extend(r['id'] for r in created)
+        batch.clear()
+
+    for line_no, respondent, results, error in records:
+        if error is not None:
+            summary['error_count'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append({'line': line_no, 'error': error})
+            continue
+        batch.append((respondent, results, compute_priorities(results)))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return summary
+
+
+def parse(lines, fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f'format must be one of: {", ".join(FORMATS)}')
+    return parse_csv(lines) if fmt == 'csv' else parse_jsonl(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='응답자·진단 결과 일괄 가져오기')
+    parser.add_argument('path', help='CSV 또는 JSONL 파일')
+    parser.add_argument('--format', choices=FORMATS, help='기본: 파일 확장자로 판단')
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('csv' if args.path.lower().endswith('.csv') else 'jsonl')
+    storage.start()
+    with open(args.path, encoding='utf-8-sig', newline='') as f:
+        summary = import_records(parse(f, fmt), args.batch_size)
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 1 if summary['error_count'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+역량/시나리오 카탈로그 응답 사전 계산
+
+/api/competencies, /api/scenarios 응답은 (job_type, career_stage) 조합에만 의존하므로
+정적 참조 데이터가 바뀔 때(storage.static_version) 모든 조합의 응답을 한 번에 만들어
+직렬화된 JSON 바이트로 보관합니다. 요청 처리는 dict 조회 한 번으로 끝납니다.
+
+조합은 데이터에서 도출합니다: 리더십 그룹의 sub_category = career_stage,
+직무역량 그룹의 sub_category = job_type.
+"""
+
+import json
+import threading
+
+import storage
+
+_lock = threading.Lock()
+_payloads = {'version': None, 'competencies': {}, 'scenarios': {}}
+
+
+def _matches_profile(group, job_type, career_stage):
+    sub = group.get('sub_category')
+    gname = group.get('name', '')
+    return (sub is None
+            or (gname == '리더십' and sub == career_stage)
+            or (gname == '직무역량' and sub == job_type))
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def _build_competencies(groups, comps, job_type, career_stage):
+    result = []
+    for c in comps:
+        g = groups.get(c['group_id'], {})
+        if _matches_profile(g, job_type, career_stage):
+            result.append({
+                'id': c['id'],
+                'group_id': c['group_id'],
+                'name': c['name'],
+                'description': c['description'],
+                'group_name': g.get('name', ''),
+                'sub_category': g.get('sub_category'),
+            })
+    result.sort(key=lambda x: (x['group_id'], x['id']))
+    return result
+
+
+def _build_scenarios(groups, scenarios, comps_by_id, sc_comp_map, job_type, career_stage):
+    result = []
+    for s in scenarios:
+        g = groups.get(s['group_id'], {})
+        if not _matches_profile(g, job_type, career_stage):
+            continue
+
+        comps = []
+        for cid in sc_comp_map.get(s['id'], []):
+            comp = comps_by_id.get(cid)
+            if comp:
+                comps.append({'id': comp['id'], 'name': comp['name'], 'description': comp['description']})
+
+        result.append({
+            'id': s['id'],
+            'group_id': s['group_id'],
+            'situation': s['situation'],
+            'group_name': g.get('name', ''),
+            'sub_category': g.get('sub_category'),
+            'competencies': comps,
+        })
+    result.sort(key=lambda x: (x['group_id'], x['id']))
+    return result
+
+
+def _source():
+    groups = {g['id']: g for g in storage.get_competency_groups()}
+    comps = storage.get_competencies()
+    sc_comp_map = {}
+    for link in storage.get_scenario_competencies():
+        sc_comp_map.setdefault(link['scenario_id'], []).append(link['competency_id'])
+    return groups, comps, {c['id']: c for c in comps}, storage.get_scenarios(), sc_comp_map
+
+
+def _build(version):
+    groups, comps, comps_by_id, scenarios, sc_comp_map = _source()
+    job_types = {g['sub_category'] for g in groups.values() if g['name'] == '직무역량' and g['sub_category']}
+    stages = {g['sub_category'] for g in groups.values() if g['name'] == '리더십' and g['sub_category']}
+
+    competencies, scenario_payloads = {}, {}
+    for job_type in job_types:
+        for career_stage in stages:
+            key = (job_type, career_stage)
+            competencies[key] = _dumps(_build_competencies(groups, comps, job_type, career_stage))
+            scenario_payloads[key] = _dumps(
+                _build_scenarios(groups, scenarios, comps_by_id, sc_comp_map, job_type, career_stage)
+            )
+    return {'version': version, 'competencies': competencies, 'scenarios': scenario_payloads}
+
+
+def _current():
+    global _payloads
+    version = storage.static_version()
+    if _payloads['version'] != version:
+        with _lock:
+            if _payloads['version'] != version:
+                _payloads = _build(version)
+    return _payloads
+
+
+def competencies_json(job_type, career_stage):
+    """프로필별 역량 목록 (직렬화된 JSON bytes)."""
+    body = _current()['competencies'].get((job_type, career_stage))
+    if body is None:
+        # 데이터에 없는 조합 — 캐시하지 않고 그때그때 계산
+        groups, comps, _, _, _ = _source()
+        body = _dumps(_build_competencies(groups, comps, job_type, career_stage))
+    return body
+
+
+def scenarios_json(job_type, career_stage):
+    """프로필별 시나리오 목록 (직렬화된 JSON bytes)."""
+    body = _current()['scenarios'].get((job_type, career_stage))
+    if body is None:
+        groups, _, comps_by_id, scenarios, sc_comp_map = _source()
+        body = _dumps(_build_scenarios(groups, scenarios, comps_by_id, sc_comp_map, job_type, career_stage))
+    return body
@@ -0,0 +1,199 @@
+"""
+동적 시트용 컬럼형 메모리 테이블
+
+행마다 dict 를 두는 대신 컬럼마다 array('i') 하나를 둡니다.
+  정수 컬럼 : 값을 그대로 저장 (빈 값은 NULL)
+  문자열 컬럼 : 테이블 단위 문자열 목록의 번호를 저장 — phase 처럼 반복되는 값은 한 번만 보관
+
+행 위치(position)는 시트 순서를 따르며, id / respondent_id 인덱스는 위치를 가리킵니다.
+column(name) 은 array 를 그대로 돌려주므로 numpy.frombuffer 등으로 복사 없이 집계할 수 있습니다.
+
+행 삭제는 위치를 인덱스에서만 빼고 묘비(tombstone)로 남겨 둡니다 (삭제한 행 수에 비례).
+컬럼을 당겨 묘비를 없애는 압축은 묘비가 전체의 COMPACT_RATIO 를 넘을 때, 또는
+column() 으로 컬럼 array 를 그대로 넘겨줄 때만 합니다. records / live_columns 는 묘비를 건너뜁니다.
+행 단위 읽기와 변경은 테이블 잠금 안에서 수행합니다.
+"""
+
+import threading
+from array import array
+
+NULL = -2 ** 31   # array('i') 에서 None 을 나타내는 값
+INT_MIN = NULL + 1   # 정수 컬럼에 담을 수 있는 범위 (NULL 제외)
+INT_MAX = 2 ** 31 - 1
+COMPACT_RATIO = 0.25  # 묘비가 이 비율을 넘으면 삭제 시점에 바로 압축
+COMPACT_MIN = 1024    # 이보다 적은 묘비는 전체 읽기 때까지 미룸
+
+
+class ColumnTable:
+
+    def __init__(self, headers, int_columns, records=()):
+        self.headers = list(headers)
+        self.int_columns = frozenset(int_columns)
+        self.columns = {col: array('i') for col in self.headers}
+        self.strings = []
+        self._string_ids = {}
+        self.by_id = {}           # id -> position
+        self.by_respondent = {}   # respondent_id -> [position, ...]
+        self._dead = set()        # 삭제됐지만 아직 컬럼에 남은 위치
+        self.lock = threading.RLock()
+        self.extend(records)
+
+    def __len__(self):
+        return len(self.columns['id']) - len(self._dead)
+
+    # ─── 값 변환 ──────────────────────────────────────────────────────────────
+
+    def _encode(self, col, value):
+        if value is None or value == '':
+            return NULL
+        if col in self.int_columns:
+            return int(value)
+        value = str(value)
+        sid = self._string_ids.get(value)
+        if sid is None:
+            sid = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return sid
+
+    def _decode(self, col, code):
+        if code == NULL:
+            return None if col in self.int_columns else ''
+        return code if col in self.int_columns else self.strings[code]
+
+    # ─── 읽기 ──────────────────────────────────────────────────────────────────
+
+    def column(self, name):
+        """컬럼 array (문자열 컬럼은 self.strings 의 번호). 수정하지 말 것."""
+        with self.lock:
+            self._compact()
+            return self.columns[name]
+
+    def live_columns(self, names):
+        """names 컬럼에서 삭제되지 않은 행만 담은 array 사본 {name: array('i')} (집계용)."""
+        with self.lock:
+            runs = self._live_runs()
+            result = {}
+            for name in names:
+                old, new = self.columns[name], array('i')
+                for lo, hi in runs:
+                    new += old[lo:hi]
+                result[name] = new
+            return result
+
+    def row(self, pos):
+        return {col: self._decode(col, self.columns[col][pos]) for col in self.headers}
+
+    def get(self, row_id):
+        with self.lock:
+            pos = self.by_id.get(row_id)
+            return None if pos is None else self.row(pos)
+
+    def rows_for(self, respondent_id):
+        with self.lock:
+            return [self.row(pos) for pos in self.by_respondent.get(respondent_id, [])]
+
+    def records(self, start=0, stop=None):
+        """start~stop 위치의 행을 시트 순서의 dict 리스트로 (기본: 전체)."""
+        with self.lock:
+            return [self.row(pos) for pos in self._positions()[start:stop]]
+
+    # ─── 변경 ──────────────────────────────────────────────────────────────────
+
+    def append(self, record):
+        """행 추가. id 가 없거나 이미 있는 행이면 무시하고 False."""
+        with self.lock:
+            row_id = self._encode('id', record.get('id'))
+            if row_id == NULL or row_id in self.by_id:
+                return False
+            pos = len(self.columns['id'])
+            for col in self.headers:
+                self.columns[col].append(self._encode(col, record.get(col)))
+            self.by_id[row_id] = pos
+            if 'respondent_id' in self.columns:
+                self.by_respondent.setdefault(self.columns['respondent_id'][pos], []).append(pos)
+            return True
+
+    def extend(self, records):
+        with self.lock:
+            for record in records:
+                self.append(record)
+
+    def copy(self):
+        other = ColumnTable(self.headers, self.int_columns)
+        with self.lock:
+            other.columns = {col: array('i', values) for col, values in self.columns.items()}
+            other.strings = list(self.strings)
+            other._string_ids = dict(self._string_ids)
+            other.by_id = dict(self.by_id)
+            other.by_respondent = {rid: list(positions) for rid, positions in self.by_respondent.items()}
+            other._dead = set(self._dead)
+        return other
+
+    def update(self, row_id, values):
+        with self.lock:
+            pos = self.by_id.get(row_id)
+            if pos is None:
+                return
+            for col, value in values.items():
+                if col in self.columns and col not in ('id', 'respondent_id'):
+                    self.columns[col][pos] = self._encode(col, value)
+
+    def delete_respondent(self, respondent_id):
+        """respondent_id 의 행을 모두 지움."""
+        with self.lock:
+            positions = self.by_respondent.pop(respondent_id, ())
+            ids = self.columns['id']
+            for pos in positions:
+                del self.by_id[ids[pos]]
+            self._bury(positions)
+
+    def delete_ids(self, row_ids):
+        with self.lock:
+            positions = [self.by_id.pop(i) for i in row_ids if i in self.by_id]
+            if positions and 'respondent_id' in self.columns:
+                rids = self.columns['respondent_id']
+                for pos in positions:
+                    same = self.by_respondent[rids[pos]]
+                    same.remove(pos)
+                    if not same:
+                        del self.by_respondent[rids[pos]]
+            self._bury(positions)
+
+    def _bury(self, positions):
+        """인덱스에서 이미 뺀 위치를 묘비로 남기고, 너무 많이 쌓였으면 압축."""
+        self._dead.update(positions)
+        if len(self._dead) > max(COMPACT_MIN, COMPACT_RATIO * len(self.columns['id'])):
+            self._compact()
+
+    def _live_runs(self):
+        """묘비 사이의 살아 있는 위치 구간 [(lo, hi), ...] (hi 제외)."""
+        runs, start = [], 0
+        for pos in sorted(self._dead):
+            if pos > start:
+                runs.append((start, pos))
+            start = pos + 1
+        if start < len(self.columns['id']):
+            runs.append((start, len(self.columns['id'])))
+        return runs
+
+    def _positions(self):
+        """살아 있는 위치를 시트 순서로."""
+        if not self._dead:
+            return range(len(self.columns['id']))
+        return [pos for lo, hi in self._live_runs() for pos in range(lo, hi)]
+
+    def _compact(self):
+        """묘비를 없애고 남은 행을 앞으로 당김. 살아 있는 구간 단위로 잘라 붙인다."""
+        if not self._dead:
+            return
+        self.columns = self.live_columns(self.headers)
+        self._dead = set()
+        self._reindex()
+
+    def _reindex(self):
+        ids = self.columns['id']
+        self.by_id = dict(zip(ids, range(len(ids))))
+        self.by_respondent = {}
+        if 'respondent_id' in self.columns:
+            for pos, rid in enumerate(self.columns['respondent_id']):
+                self.by_respondent.setdefault(rid, []).append(pos)
@@ -0,0 +1,76 @@
+"""
+ID 할당기 (호스트 단위 블록 예약)
+
+시트 행 id 를 데이터 시트를 읽지 않고 O(1)로 발급합니다.
+
+  1. 전역 카운터(reserve 콜백, 예: id_counters 탭의 셀)에서 ID_BLOCK_SIZE 개씩 블록을 예약
+  2. 예약한 블록을 공유 캐시 DB(id_blocks 테이블)에 두고, 같은 호스트의 모든 워커가
+     IMMEDIATE 트랜잭션 안에서 꺼내 씀 — 워커 간 중복 발급이 없음
+
+블록 예약(시트 API 호출)은 SQLite 트랜잭션 밖에서, 공유 캐시 옆의 잠금 파일(flock)로
+호스트 안에서 한 번에 하나씩만 수행합니다. 예약 중에도 다른 워커의 공유 캐시 쓰기는 막히지
+않고, 예약하던 프로세스가 죽으면 잠금은 운영체제가 풀어 줍니다.
+
+블록이 남은 채 프로세스가 재시작되어도 다음 발급은 남은 블록에서 이어지고,
+DB 파일이 사라지면 카운터에서 새 블록을 받으므로 id 에 빈 구간이 생길 뿐 겹치지는 않습니다.
+
+환경변수:
+  ID_BLOCK_SIZE : 한 번에 예약할 id 개수 (기본 100)
+"""
+
+import os
+import fcntl
+from contextlib import contextmanager
+
+import shared_cache
+
+ID_BLOCK_SIZE = int(os.environ.get('ID_BLOCK_SIZE', '100'))
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS id_blocks ('
+    ' sheet TEXT PRIMARY KEY, next INTEGER NOT NULL, end INTEGER NOT NULL)'
+)
+
+
+def allocate(sheet_name, count, reserve):
+    """연속된 id count 개를 발급하고 첫 id 를 반환.
+
+    reserve(sheet_name, n): 전역 카운터에서 n 개를 예약하고 첫 id 를 반환하는 함수.
+    블록이 모자랄 때만 호출되며, 호스트 잠금 안에서 호출되므로 워커끼리 겹쳐 부르지 않는다.
+    """
+    first = _take(sheet_name, count)
+    if first is not None:
+        return first
+    with _reserve_lock():
+        # 잠금을 기다리는 동안 다른 워커가 새 블록을 넣었을 수 있음
+        first = _take(sheet_name, count)
+        if first is not None:
+            return first
+        size = max(ID_BLOCK_SIZE, count)
+        first = reserve(sheet_name, size)
+        with shared_cache.transaction('IMMEDIATE') as conn:
+            conn.execute('INSERT OR REPLACE INTO id_blocks (sheet, next, end) VALUES (?, ?, ?)',
+                         (sheet_name, first + count, first + size))
+    return first
+
+
+def _take(sheet_name, count):
+    """남은 블록에서 count 개를 꺼내 첫 id 를 반환. 모자라면 None."""
+    with shared_cache.transaction('IMMEDIATE') as conn:
+        conn.execute(_SCHEMA)
+        row = conn.execute('SELECT next, end FROM id_blocks WHERE sheet = ?', (sheet_name,)).fetchone()
+        if not row or row[1] - row[0] < count:
+            return None
+        conn.execute('UPDATE id_blocks SET next = ? WHERE sheet = ?', (row[0] + count, sheet_name))
+    return row[0]
+
+
+@contextmanager
+def _reserve_lock():
+    """호스트 단위 블록 예약 잠금 (공유 캐시 파일 옆의 잠금 파일)."""
+    with open(shared_cache.SHARED_CACHE_PATH + '.ids.lock', 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,245 @@
+"""
+Prometheus 형식 메트릭 (카운터·히스토그램)
+
+  sheets_api_calls_total / sheets_api_errors_total   {op, sheet}
+  sheets_api_latency_seconds (히스토그램)            {op, sheet}
+  sheets_api_rows_total / sheets_api_bytes_total     {op, sheet}  — 주고받은 행 수, JSON 기준 크기(앞쪽 행으로 추정)
+  sheets_api_retries_total                           {op, sheet, code}
+  sheets_quota_wait_seconds (히스토그램)             {kind, priority}  — 할당량 토큰 대기 시간
+  write_queue_flush_errors_total                     {kind=transient|permanent}
+  write_queue_quarantined_total                      {sheet}  — failed 테이블로 옮겨진 저널 항목
+  cache_requests_total                               {cache, sheet, result=hit|stale|miss}
+  http_requests_total                                {blueprint, method, status}
+  http_request_duration_seconds (히스토그램)         {blueprint, method}
+
+값은 프로세스 메모리에서 잠금 하나로 갱신하고, 주기적으로 METRICS_DIR 의 프로세스별 파일에
+내려 씁니다. /api/metrics 는 같은 호스트 모든 워커의 파일을 합쳐 보여 줍니다.
+
+환경변수:
+  METRICS_DIR           : 워커별 메트릭 파일 디렉터리 (기본: 시스템 임시 디렉터리 아래,
+                          빈 값이면 응답한 워커의 값만 노출)
+  METRICS_DUMP_INTERVAL : 파일로 내려 쓰는 주기(초, 기본 10)
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+METRICS_DIR = os.environ.get(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'competency_diagnosis_metrics')
+)
+METRICS_DUMP_INTERVAL = float(os.environ.get('METRICS_DUMP_INTERVAL', '10'))
+
+SHEETS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUOTA_WAIT_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1, 2.5, 5, 10, 20)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'sheets_api_calls_total': ('counter', 'Google Sheets API calls', None),
+    'sheets_api_errors_total': ('counter', 'Google Sheets API calls that raised', None),
+    'sheets_api_latency_seconds': ('histogram', 'Google Sheets API call latency', SHEETS_BUCKETS),
+    'sheets_api_rows_total': ('counter', 'Rows read or written by Google Sheets API calls', None),
+    'sheets_api_bytes_total': ('counter', 'Approximate JSON size of Google Sheets API payloads', None),
+    'sheets_api_retries_total': ('counter', 'Google Sheets API calls retried after a quota or server error', None),
+    'sheets_quota_wait_seconds': ('histogram', 'Time spent waiting for a Sheets quota token', QUOTA_WAIT_BUCKETS),
+    'write_queue_flush_errors_total': ('counter', 'Write-behind flush attempts that raised', None),
+    'write_queue_quarantined_total': ('counter', 'Write-behind entries moved to the failed table', None),
+    'cache_requests_total': ('counter', 'Sheet cache lookups by result', None),
+    'http_requests_total': ('counter', 'HTTP requests', None),
+    'http_request_duration_seconds': ('histogram', 'HTTP request duration', HTTP_BUCKETS),
+}
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_values = {}     # (name, labels) -> float  (카운터)
+_histograms = {}  # (name, labels) -> [bucket 별 개수..., +Inf 개수, 합계]
+_dirty = False
+_worker = None
+
+
+# ─── 기록 ──────────────────────────────────────────────────────────────────────
+
+def inc(name, labels, value=1):
+    """labels: ((key, value), ...) 튜플."""
+    global _dirty
+    with _lock:
+        _values[name, labels] = _values.get((name, labels), 0) + value
+        _dirty = True
+
+
+def observe(name, labels, value):
+    global _dirty
+    buckets = METRICS[name][2]
+    with _lock:
+        hist = _histograms.get((name, labels))
+        if hist is None:
+            hist = _histograms[name, labels] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                hist[i] += 1
+                break
+        else:
+            hist[len(buckets)] += 1
+        hist[-1] += value
+        _dirty = True
+
+
+def observe_sheets_call(op, sheet, seconds, rows=0, nbytes=0, error=False):
+    labels = (('op', op), ('sheet', sheet))
+    inc('sheets_api_calls_total', labels)
+    observe('sheets_api_latency_seconds', labels, seconds)
+    if error:
+        inc('sheets_api_errors_total', labels)
+    if rows:
+        inc('sheets_api_rows_total', labels, rows)
+    if nbytes:
+        inc('sheets_api_bytes_total', labels, nbytes)
+
+
+def cache_lookup(cache, sheet, result):
+    inc('cache_requests_total', (('cache', cache), ('sheet', sheet), ('result', result)))
+
+
+def init_app(app):
+    """요청마다 blueprint 별 처리 시간을 기록하고, 파일로 내려 쓰는 스레드를 시작."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            blueprint = request.blueprint or 'app'
+            inc('http_requests_total', (('blueprint', blueprint), ('method', request.method),
+                                        ('status', str(response.status_code))))
+            observe('http_request_duration_seconds', (('blueprint', blueprint), ('method', request.method)),
+                    time.perf_counter() - started)
+        return response
+
+    start()
+
+
+# ─── 워커 간 합치기 ───────────────────────────────────────────────────────────
+
+def _state():
+    with _lock:
+        return {
+            'values': [[name, labels, value] for (name, labels), value in _values.items()],
+            'histograms': [[name, labels, hist] for (name, labels), hist in _histograms.items()],
+        }
+
+
+def dump():
+    """이 프로세스의 값을 METRICS_DIR/<pid>.json 으로 (임시 파일에 쓴 뒤 교체)."""
+    global _dirty
+    if not METRICS_DIR:
+        return
+    with _lock:
+        if not _dirty:
+            return
+        _dirty = False
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=METRICS_DIR, prefix='.metrics-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(_state(), f)
+        os.replace(tmp_path, os.path.join(METRICS_DIR, f'{os.getpid()}.json'))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _collect():
+    """모든 워커 파일을 합친 (values, histograms). 파일이 없으면 이 프로세스 값만."""
+    states = []
+    if METRICS_DIR:
+        dump()
+        for filename in os.listdir(METRICS_DIR) if os.path.isdir(METRICS_DIR) else ():
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, filename), encoding='utf-8') as f:
+                    states.append(json.load(f))
+            except (OSError, ValueError):
+                logger.warning('ignoring unreadable metrics file %s', filename, exc_info=True)
+    if not states:
+        states = [_state()]
+
+    values, histograms = {}, {}
+    for state in states:
+        for name, labels, value in state['values']:
+            key = (name, tuple(map(tuple, labels)))
+            values[key] = values.get(key, 0) + value
+        for name, labels, hist in state['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            if key in histograms:
+                histograms[key] = [a + b for a, b in zip(histograms[key], hist)]
+            else:
+                histograms[key] = list(hist)
+    return values, histograms
+
+
+def start():
+    """파일로 내려 쓰는 스레드를 (프로세스당 한 번) 시작."""
+    global _worker
+    if not METRICS_DIR or (_worker is not None and _worker.is_alive()):
+        return
+    _worker = threading.Thread(target=_run, name='metrics-dump', daemon=True)
+    _worker.start()
+
+
+def _run():
+    while True:
+        time.sleep(METRICS_DUMP_INTERVAL)
+        try:
+            dump()
+        except Exception:
+            logger.exception('could not write metrics file')
+
+
+# ─── Prometheus 텍스트 형식 ───────────────────────────────────────────────────
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render():
+    """Prometheus text exposition format (0.0.4)."""
+    values, histograms = _collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        if kind == 'counter':
+            series = sorted((labels, v) for (n, labels), v in values.items() if n == name)
+        else:
+            series = sorted((labels, h) for (n, labels), h in histograms.items() if n == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series:
+            if kind == 'counter':
+                lines.append(f'{name}{_label_text(labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_label_text(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_label_text(labels)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_label_text(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,99 @@
+"""
+Google Sheets API 할당량 관리 (토큰 버킷 + 재시도)
+
+시트 API 는 분당 읽기/쓰기 요청 수를 제한하고, 넘으면 429 를 돌려줍니다.
+sheets._sheets_call 은 호출마다 먼저 acquire() 로 토큰을 받고, 429(읽기는 5xx 도)가 오면
+retry_delay() 만큼 기다렸다가 다시 호출합니다.
+
+  토큰 버킷 : 읽기·쓰기 각각 호스트 단위(shared_cache) — 같은 호스트의 모든 워커가 나눠 씀.
+              버스트는 한도의 1/6 까지이며, 어떤 60초 구간에서도 한도를 넘지 않도록 채워짐.
+  우선순위 : 토큰이 모자랄 때 쓰기(write) > 요청 처리 중 읽기(read) > 백그라운드 갱신(refresh).
+              낮은 우선순위는 버킷에 RESERVE 비율만큼 남아 있을 때만 토큰을 꺼내므로,
+              부하가 몰리면 갱신이 먼저 밀리고 응답자 제출은 지연될지언정 실패하지 않음.
+  재시도   : 지수 백오프(RETRY_BASE × 2^n, 최대 RETRY_CAP) × 0.5~1 무작위 지터.
+              429 를 받으면 버킷을 비워 다른 워커도 함께 물러남. 쓰기는 중복 반영을 피하려고
+              요청이 처리되지 않았음이 확실한 429 에만 재시도.
+
+우선순위는 스레드 단위로 with quota.priority('refresh'): 처럼 지정합니다 (기본 read).
+
+환경변수:
+  SHEETS_READ_QUOTA     : 분당 읽기 요청 한도 (기본 60, 0 이면 버킷 없이 재시도만)
+  SHEETS_WRITE_QUOTA    : 분당 쓰기 요청 한도 (기본 60)
+  SHEETS_MAX_RETRIES    : 재시도 횟수 (기본 5)
+  SHEETS_QUOTA_MAX_WAIT : 토큰을 기다리는 최대 시간(초, 기본 20). 넘으면 호출하고 재시도에 맡김
+"""
+
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+import metrics
+import shared_cache
+
+SHEETS_READ_QUOTA = int(os.environ.get('SHEETS_READ_QUOTA', '60'))
+SHEETS_WRITE_QUOTA = int(os.environ.get('SHEETS_WRITE_QUOTA', '60'))
+SHEETS_MAX_RETRIES = int(os.environ.get('SHEETS_MAX_RETRIES', '5'))
+SHEETS_QUOTA_MAX_WAIT = float(os.environ.get('SHEETS_QUOTA_MAX_WAIT', '20'))
+RETRY_BASE = 0.5     # 첫 재시도 대기(초)
+RETRY_CAP = 16       # 재시도 대기 상한(초)
+RETRYABLE = {'read': {429, 500, 502, 503}, 'write': {429}}
+RESERVE = {'write': 0.0, 'read': 0.2, 'refresh': 0.5}   # 우선순위별로 버킷에 남겨 둘 비율
+
+_local = threading.local()
+
+
+def _bucket(kind):
+    """(이름, 초당 충전량, 용량) 또는 None (한도 없음)."""
+    limit = SHEETS_READ_QUOTA if kind == 'read' else SHEETS_WRITE_QUOTA
+    if limit <= 0:
+        return None
+    capacity = max(2, limit // 6)
+    return f'sheets-{kind}', max(limit - capacity, 1) / 60, capacity
+
+
+def current_priority():
+    return getattr(_local, 'priority', 'read')
+
+
+@contextmanager
+def priority(name):
+    """이 스레드의 시트 호출 우선순위를 잠시 바꿈 (write / read / refresh)."""
+    previous = current_priority()
+    _local.priority = name
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def acquire(kind):
+    """kind('read' / 'write') 토큰을 받을 때까지 기다림. 기다린 시간(초)을 반환."""
+    bucket = _bucket(kind)
+    if bucket is None:
+        return 0.0
+    name, rate, capacity = bucket
+    level = 'write' if kind == 'write' else current_priority()
+    reserve = min(capacity - 1, RESERVE[level] * capacity)
+    started = time.monotonic()
+    while True:
+        wait = shared_cache.take_token(name, rate, capacity, reserve)
+        waited = time.monotonic() - started
+        if wait <= 0 or waited >= SHEETS_QUOTA_MAX_WAIT:
+            break
+        time.sleep(min(wait, SHEETS_QUOTA_MAX_WAIT - waited, 1.0))
+    metrics.observe('sheets_quota_wait_seconds', (('kind', kind), ('priority', level)), waited)
+    return waited
+
+
+def retry_delay(kind, exc, attempt):
+    """exc(gspread APIError)를 attempt 번째로 받았을 때 기다릴 시간(초). 재시도하지 않으면 None."""
+    code = getattr(exc, 'code', None)
+    if code not in RETRYABLE[kind] or attempt >= SHEETS_MAX_RETRIES:
+        return None
+    if code == 429:
+        bucket = _bucket(kind)
+        if bucket is not None:
+            shared_cache.drain_tokens(bucket[0])
+    return min(RETRY_CAP, RETRY_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
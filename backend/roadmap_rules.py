@@ -0,0 +1,43 @@
+"""
+로드맵 생성 규칙 (라우트와 백그라운드 작업이 함께 사용)
+
+  priority_map_of       : 진단 결과 → 역량별 최고 우선순위
+  phase_map_of          : 우선순위 순으로 역량을 셋으로 나눠 Phase 1~3 배정
+  courses_by_competency : 역량별 과정을 학기 순으로
+"""
+
+from collections import defaultdict
+
+SEMESTER_ORDER = {'상반기': 1, '하반기': 2, '상시': 3}
+
+
+def priority_map_of(diag_rows):
+    """{competency_id: 가장 높은(작은) priority_rank}. 순위가 없는 역량은 빠짐."""
+    priority_map = {}
+    for row in diag_rows:
+        cid, rank = row['competency_id'], row['priority_rank']
+        if rank is not None and (cid not in priority_map or rank < priority_map[cid]):
+            priority_map[cid] = rank
+    return priority_map
+
+
+def phase_map_of(comp_priority):
+    """{competency_id: phase}. 우선순위 순으로 역량을 셋으로 나눠 Phase 1~3 배정."""
+    sorted_comps = sorted(comp_priority.items(), key=lambda x: x[1])
+    total = len(sorted_comps)
+    phase1_cut = max(1, total // 3)
+    phase2_cut = max(phase1_cut + 1, 2 * total // 3)
+    return {
+        comp_id: 'Phase 1' if i < phase1_cut else ('Phase 2' if i < phase2_cut else 'Phase 3')
+        for i, (comp_id, _) in enumerate(sorted_comps)
+    }
+
+
+def courses_by_competency(all_courses):
+    """{competency_id: [course, ...]} — 역량별 과정을 학기 순으로."""
+    courses_by_comp = defaultdict(list)
+    for c in all_courses:
+        courses_by_comp[c['competency_id']].append(c)
+    for cid in courses_by_comp:
+        courses_by_comp[cid].sort(key=lambda c: SEMESTER_ORDER.get(c['semester'], 99))
+    return courses_by_comp
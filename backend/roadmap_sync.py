@@ -0,0 +1,194 @@
+"""
+과정 카탈로그 변경 시 로드맵 증분 재생성
+
+정적 캐시 버전(storage.static_version, 내용 해시)이 바뀌면, 이전 버전의 역량별 과정 목록과
+현재 목록을 비교해 목록이 바뀐 역량만 골라냅니다. 로드맵이 있는 응답자 중 그 역량의 항목을
+이미 가진 응답자의 로드맵만 고칩니다.
+
+  - 카탈로그에서 빠진 과정 : 해당 로드맵 항목 삭제
+  - 카탈로그에 새로 들어온 과정 : 같은 역량의 기존 항목이 있는 Phase 의 끝에 추가
+  - 로드맵에 없는 역량(진단을 다시 했지만 로드맵은 다시 만들지 않은 경우 등)은 건드리지 않음
+  - 그 외 항목의 Phase·순서(사용자가 바꾼 것 포함)는 건드리지 않음
+
+이전 버전의 과정 목록은 공유 캐시의 sync 상태에 둡니다. 상태가 없으면(첫 실행, 캐시 유실)
+비교할 기준이 없으므로 현재 목록을 기준으로 기록만 하고 로드맵은 고치지 않습니다.
+응답자 ROADMAP_SYNC_CHUNK_SIZE 명 단위로 삭제·추가를 각각 한 번씩 모아 기록하며,
+호스트 단위 lease 를 잡은 한 워커만 실행합니다.
+
+CLI : python roadmap_sync.py  (한 번 실행하고 결과 요약 출력)
+
+환경변수:
+  ROADMAP_SYNC_INTERVAL   : 확인 주기(초, 기본 300, 0 이면 백그라운드 실행 안 함)
+  ROADMAP_SYNC_CHUNK_SIZE : 한 번에 처리할 응답자 수 (기본 500)
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+import time
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+except ImportError:
+    pass
+
+import storage
+import shared_cache
+from roadmap_rules import courses_by_competency
+
+ROADMAP_SYNC_INTERVAL = float(os.environ.get('ROADMAP_SYNC_INTERVAL', '300'))
+ROADMAP_SYNC_CHUNK_SIZE = int(os.environ.get('ROADMAP_SYNC_CHUNK_SIZE', '500'))
+LEASE_NAME = 'roadmap-sync'
+LEASE_TTL = 600          # 전체 응답자를 한 번 훑는 시간보다 충분히 길게
+STATE_NAME = 'roadmap-sync'   # 공유 캐시 sync 테이블 키 — {'static_version', 'course_lists'}
+
+logger = logging.getLogger(__name__)
+
+_worker = None
+
+
+def course_lists_of(courses_by_comp):
+    """{competency_id: [course_id, ...]} (학기 순)."""
+    return {cid: [c['id'] for c in courses] for cid, courses in courses_by_comp.items()}
+
+
+def changed_lists(previous, current):
+    """과정 목록이 바뀐 역량의 {competency_id: (이전 목록, 현재 목록)}."""
+    return {
+        cid: (previous.get(cid, []), current.get(cid, []))
+        for cid in set(previous) | set(current)
+        if previous.get(cid, []) != current.get(cid, [])
+    }
+
+
+# ─── 응답자별 변경 계산 ───────────────────────────────────────────────────────
+
+def plan_respondent(respondent_id, roadmap_rows, changes):
+    """한 응답자의 (삭제할 항목 id 목록, 추가할 항목 목록).
+
+    roadmap_rows: get_roadmap_rows 형식 (Phase·순서 정렬)
+    changes: changed_lists 결과 — 로드맵에 이미 있는 역량만 반영
+    """
+    by_comp = {}
+    for r in roadmap_rows:
+        by_comp.setdefault(r['competency_id'], []).append(r)
+    next_index = {}
+    for r in roadmap_rows:
+        next_index[r['phase']] = max(next_index.get(r['phase'], 0), r['order_index'] + 1)
+
+    deletes, inserts = [], []
+    for cid in sorted(set(by_comp) & set(changes)):
+        previous, current = changes[cid]
+        rows = by_comp[cid]
+        removed = set(previous) - set(current)
+        deletes.extend(r['id'] for r in rows if r['course_id'] in removed)
+        held = {r['course_id'] for r in rows}
+        phase = rows[-1]['phase']
+        for course_id in current:
+            if course_id in previous or course_id in held:
+                continue
+            inserts.append({
+                'respondent_id': respondent_id,
+                'course_id': course_id,
+                'competency_id': cid,
+                'order_index': next_index.get(phase, 0),
+                'phase': phase,
+            })
+            next_index[phase] = next_index.get(phase, 0) + 1
+    return deletes, inserts
+
+
+def apply_changes(changes, chunk_size=ROADMAP_SYNC_CHUNK_SIZE):
+    """로드맵이 있는 응답자를 chunk_size 명씩 훑으며 바뀐 역량의 항목만 고침."""
+    summary = {'respondents': 0, 'deleted': 0, 'inserted': 0}
+    if not changes:
+        return summary
+    for chunk in storage.iter_respondents(chunk_size):
+        roadmaps = storage.get_roadmap_rows_for([r['id'] for r in chunk])
+        deletes, inserts = [], []
+        for rid, rows in roadmaps.items():
+            if not rows:
+                continue
+            d, i = plan_respondent(rid, rows, changes)
+            if d or i:
+                summary['respondents'] += 1
+            deletes.extend(d)
+            inserts.extend(i)
+        if deletes:
+            storage.delete_roadmap_items(deletes)
+        if inserts:
+            storage.insert_roadmap_items(inserts)
+        summary['deleted'] += len(deletes)
+        summary['inserted'] += len(inserts)
+    return summary
+
+
+# ─── 실행 ──────────────────────────────────────────────────────────────────────
+
+def _state():
+    state = shared_cache.sync_state(STATE_NAME)
+    if state is None or 'course_lists' not in state:
+        return None
+    # JSON 키는 문자열이므로 역량 id 를 정수로 되돌림
+    return state['static_version'], {int(cid): lists for cid, lists in state['course_lists'].items()}
+
+
+def run_once():
+    """카탈로그 버전이 바뀌었으면 로드맵을 맞추고 요약을 반환.
+
+    이미 확인한 버전이거나 다른 워커가 실행 중이면 None.
+    """
+    version = storage.static_version()
+    state = _state()
+    if (state and state[0] == version) or not shared_cache.acquire_lease(LEASE_NAME, LEASE_TTL):
+        return None
+    try:
+        state = _state()     # lease 를 잡는 사이 다른 워커가 끝냈을 수 있음
+        if state and state[0] == version:
+            return None
+        current = course_lists_of(courses_by_competency(storage.get_courses()))
+        if state is None:
+            logger.info('roadmap sync: no previous catalog recorded; using version %s as the baseline', version)
+            summary = {'respondents': 0, 'deleted': 0, 'inserted': 0}
+        else:
+            summary = apply_changes(changed_lists(state[1], current))
+        shared_cache.save_sync_state(STATE_NAME, {'static_version': version, 'course_lists': current})
+        return summary
+    finally:
+        shared_cache.release_lease(LEASE_NAME)
+
+
+def start():
+    """백그라운드 확인 스레드를 (프로세스당 한 번) 시작. 앱 기동 시 호출."""
+    global _worker
+    if ROADMAP_SYNC_INTERVAL <= 0 or (_worker is not None and _worker.is_alive()):
+        return
+    _worker = threading.Thread(target=_run, name='roadmap-sync', daemon=True)
+    _worker.start()
+
+
+def _run():
+    while True:
+        time.sleep(ROADMAP_SYNC_INTERVAL)
+        try:
+            summary = run_once()
+            if summary:
+                logger.info('roadmap sync: %s', summary)
+        except Exception:
+            logger.exception('roadmap sync failed; will retry')
+
+
+def main():
+    storage.start()
+    summary = run_once()
+    summary = summary or {'respondents': 0, 'deleted': 0, 'inserted': 0}
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+from flask import Blueprint, request, jsonify
+import numpy as np
+import storage
+import scoring
+from columnar import NULL
+
+analytics_bp = Blueprint('analytics', __name__)
+
+
+def aggregate(columns, profiles):
+    """코호트 집계. (job_type, career_stage) 그룹 × 역량별 통계를 NumPy로 계산.
+
+    columns: storage.get_diagnosis_columns() — 활성(is_active=1) 행만 집계
+    profiles: {respondent_id: (job_type, career_stage)}
+    반환: [(job_type, career_stage, respondent_count, [competency stat, ...]), ...]
+    """
+    cols = {name: np.frombuffer(arr, dtype=np.int32) for name, arr in columns.items()}
+    if not profiles or not len(cols['respondent_id']):
+        return []
+
+    # 응답자 → 그룹 번호
+    group_keys = sorted(set(profiles.values()))
+    group_index = {key: i for i, key in enumerate(group_keys)}
+    resp_ids = np.fromiter(profiles.keys(), dtype=np.int64, count=len(profiles))
+    resp_groups = np.fromiter((group_index[p] for p in profiles.values()), dtype=np.int64, count=len(profiles))
+    order = np.argsort(resp_ids)
+    resp_ids, resp_groups = resp_ids[order], resp_groups[order]
+
+    rid = cols['respondent_id'].astype(np.int64)
+    pos = np.clip(np.searchsorted(resp_ids, rid), 0, len(resp_ids) - 1)
+    keep = ((cols['is_active'] == 1) & (resp_ids[pos] == rid)
+            & (cols['competency_id'] != NULL) & (cols['likert_score'] != NULL))
+    rid, group = rid[keep], resp_groups[pos[keep]]
+    cid = cols['competency_id'][keep].astype(np.int64)
+    likert = cols['likert_score'][keep].astype(np.float64)
+    rank = cols['priority_rank'][keep].astype(np.int64)
+    if not len(rid):
+        return []
+
+    # (그룹, 역량) 키별 선택 횟수·리커트 합계
+    n_comp = int(cid.max()) + 1
+    n_resp = int(rid.max()) + 1
+    cell_keys, cell = np.unique(group * n_comp + cid, return_inverse=True)
+    count = np.bincount(cell)
+    likert_sum = np.bincount(cell, weights=likert)
+
+    # (그룹, 역량, 응답자) 쌍별 최소 순위 — get_diagnosis 와 같은 규칙
+    unranked = np.iinfo(np.int64).max
+    pair_keys, pair = np.unique(cell * n_resp + rid, return_inverse=True)
+    pair_cell = pair_keys // n_resp
+    pair_rank = np.full(len(pair_keys), unranked)
+    np.minimum.at(pair_rank, pair, np.where(rank == NULL, unranked, rank))
+    respondents_selected = np.bincount(pair_cell, minlength=len(cell_keys))
+
+    ranked = pair_rank != unranked
+    # 순위 분포는 실제로 나온 (키, 순위) 쌍만 센다 — 순위 값 범위와 무관한 크기
+    hist_pairs, hist_counts = np.unique(np.stack([pair_cell[ranked], pair_rank[ranked]], axis=1),
+                                        axis=0, return_counts=True)
+    rank_distribution = [{} for _ in range(len(cell_keys))]
+    for (c, r), n in zip(hist_pairs.tolist(), hist_counts.tolist()):
+        rank_distribution[c][str(r)] = n
+    rank_sum = np.bincount(pair_cell[ranked], weights=pair_rank[ranked], minlength=len(cell_keys))
+    rank_n = np.bincount(pair_cell[ranked], minlength=len(cell_keys))
+
+    # 그룹별 응답자 수 (진단 결과가 있는 응답자만)
+    resp_group = np.unique(group * n_resp + rid) // n_resp
+    group_respondents = np.bincount(resp_group, minlength=len(group_keys))
+
+    mean_likert = likert_sum / count
+    score = scoring.score(count, mean_likert)
+    stats = {}
+    for i, key in enumerate(cell_keys.tolist()):
+        g, comp_id = divmod(key, n_comp)
+        stats.setdefault(g, []).append({
+            'competency_id': comp_id,
+            'selection_count': int(count[i]),
+            'respondent_count': int(respondents_selected[i]),
+            'mean_likert': float(mean_likert[i]),
+            'score': float(score[i]),
+            'mean_rank': float(rank_sum[i] / rank_n[i]) if rank_n[i] else None,
+            'rank_distribution': rank_distribution[i],
+        })
+
+    return [
+        (group_keys[g][0], group_keys[g][1], int(group_respondents[g]),
+         sorted(items, key=lambda x: (-x['score'], x['competency_id'])))
+        for g, items in sorted(stats.items())
+    ]
+
+
+@analytics_bp.route('/analytics', methods=['GET'])
+def get_analytics():
+    job_type = request.args.get('job_type')
+    career_stage = request.args.get('career_stage')
+
+    profiles = {
+        rid: profile for rid, profile in storage.get_respondent_profiles().items()
+        if (not job_type or profile[0] == job_type) and (not career_stage or profile[1] == career_stage)
+    }
+    groups = aggregate(storage.get_diagnosis_columns(), profiles)
+
+    comp_map = {c['id']: c for c in storage.get_competencies()}
+    groups_map = {g['id']: g for g in storage.get_competency_groups()}
+
+    result = []
+    for jt, cs, respondent_count, stats in groups:
+        for stat in stats:
+            comp_info = comp_map.get(stat['competency_id'], {})
+            stat['competency_name'] = comp_info.get('name', '')
+            stat['group_name'] = groups_map.get(comp_info.get('group_id'), {}).get('name', '')
+        result.append({
+            'job_type': jt,
+            'career_stage': cs,
+            'respondent_count': respondent_count,
+            'competencies': stats,
+        })
+    return jsonify(result)
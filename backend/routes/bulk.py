@@ -0,0 +1,118 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import io
+import os
+import csv
+import hmac
+import json
+from functools import wraps
+import bulk_import
+import storage
+
+bulk_bp = Blueprint('bulk', __name__)
+
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '500'))   # 한 번에 읽는 응답자 수
+# 일괄 가져오기·내보내기 관리자 토큰 (Authorization: Bearer <토큰>). 비어 있으면 두 엔드포인트 모두 꺼짐
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+_MIMETYPE_FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+}
+
+# CSV 는 한 행에 레코드 하나: record_type 이 diagnosis / roadmap / respondent(결과 없음)
+EXPORT_CSV_COLUMNS = [
+    'respondent_id', 'name', 'organization', 'job_type', 'career_stage', 'created_at',
+    'record_type', 'competency_id', 'competency_name', 'scenario_id', 'likert_score',
+    'priority_rank', 'is_active', 'course_id', 'course_name', 'order_index', 'phase',
+]
+_RESPONDENT_FIELDS = ('name', 'organization', 'job_type', 'career_stage', 'created_at')
+
+
+def _require_admin(view):
+    """ADMIN_TOKEN 과 같은 Bearer 토큰이 있어야 view 를 실행."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'error': 'bulk endpoints are disabled (ADMIN_TOKEN is not set)'}), 403
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+            return jsonify({'error': 'admin token required'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@bulk_bp.route('/import', methods=['POST'])
+@_require_admin
+def import_diagnoses():
+    """본문(CSV/JSONL)을 스트리밍으로 읽어 응답자·진단 결과를 일괄 기록. 형식은 bulk_import 참고."""
+    fmt = request.args.get('format') or _MIMETYPE_FORMATS.get(request.mimetype)
+    if fmt not in bulk_import.FORMATS:
+        return jsonify({'error': 'format must be csv or jsonl'}), 400
+
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='')
+    summary = bulk_import.import_records(bulk_import.parse(lines, fmt))
+    return jsonify(summary), 201 if summary['respondents'] else 400
+
+
+def _export_chunks():
+    """응답자 EXPORT_CHUNK_SIZE 명 단위로 (respondent, diagnosis rows, roadmap rows) 를 생성."""
+    comp_names = {c['id']: c['name'] for c in storage.get_competencies()}
+    course_names = {c['id']: c['name'] for c in storage.get_courses()}
+    for respondents in storage.iter_respondents(EXPORT_CHUNK_SIZE):
+        ids = [r['id'] for r in respondents]
+        diagnosis = storage.get_diagnosis_rows_for(ids)
+        roadmap = storage.get_roadmap_rows_for(ids)
+        chunk = []
+        for r in respondents:
+            diag_rows = [dict(d, competency_name=comp_names.get(d['competency_id'], ''))
+                         for d in diagnosis[r['id']]]
+            road_rows = [dict(item, competency_name=comp_names.get(item['competency_id'], ''),
+                              course_name=course_names.get(item['course_id'], ''))
+                         for item in roadmap[r['id']]]
+            chunk.append((r, diag_rows, road_rows))
+        yield chunk
+
+
+def _jsonl_lines():
+    for chunk in _export_chunks():
+        lines = []
+        for r, diag_rows, road_rows in chunk:
+            record = dict(r, diagnosis=[{k: v for k, v in d.items() if k != 'respondent_id'} for d in diag_rows],
+                          roadmap=[{k: v for k, v in i.items() if k != 'respondent_id'} for i in road_rows])
+            lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+        yield ''.join(lines)
+
+
+def _csv_lines():
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=EXPORT_CSV_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for chunk in _export_chunks():
+        for r, diag_rows, road_rows in chunk:
+            base = {'respondent_id': r['id'], **{f: r[f] for f in _RESPONDENT_FIELDS}}
+            for d in diag_rows:
+                writer.writerow({**d, **base, 'record_type': 'diagnosis'})
+            for item in road_rows:
+                writer.writerow({**item, **base, 'record_type': 'roadmap'})
+            if not diag_rows and not road_rows:
+                writer.writerow({**base, 'record_type': 'respondent'})
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+@bulk_bp.route('/export', methods=['GET'])
+@_require_admin
+def export_all():
+    """응답자·진단 결과·로드맵 전체를 CSV 또는 JSONL 로 스트리밍 (?format=csv|jsonl, 기본 csv)."""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({'error': 'format must be csv or jsonl'}), 400
+
+    body = _csv_lines() if fmt == 'csv' else _jsonl_lines()
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=export.{fmt}'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,28 @@
+"""
+조건부 GET (ETag / 304) 헬퍼
+
+참조 데이터 버전(storage.static_version)처럼 응답 본문을 만들기 전에 알 수 있는 값으로
+ETag 를 정하고, If-None-Match 가 일치하면 본문 생성·직렬화 없이 304 를 돌려줍니다.
+Cache-Control: no-cache 를 붙여 브라우저가 매번 재검증하도록 합니다.
+"""
+
+import hashlib
+
+from flask import Response, request
+
+
+def make_etag(*parts):
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:20]
+
+
+def not_modified(etag):
+    """클라이언트가 같은 ETag 를 갖고 있으면 304 응답, 아니면 None."""
+    if etag in request.if_none_match:
+        return tagged(Response(status=304), etag)
+    return None
+
+
+def tagged(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -1,28 +1,12 @@
 from flask import Blueprint, request, jsonify
 from collections import defaultdict
-import sheets
+import storage
+from columnar import INT_MAX
+from scoring import LIKERT_MIN, LIKERT_MAX, compute_priorities, score, valid_result
 
 diagnosis_bp = Blueprint('diagnosis', __name__)
 
-
-def compute_priorities(respondent_id):
-    """선택 횟수 × 평균 리커트 점수로 우선순위 산출 후 Sheets에 기록."""
-    rows = sheets.get_diagnosis_rows(respondent_id, active_only=True)
-
-    groups = defaultdict(list)
-    for row in rows:
-        groups[row['competency_id']].append(row['likert_score'])
-
-    scored = []
-    for comp_id, scores in groups.items():
-        count = len(scores)
-        avg = sum(scores) / count
-        scored.append((comp_id, count * avg))
-
-    scored.sort(key=lambda x: x[1], reverse=True)
-    rank_map = {comp_id: rank for rank, (comp_id, _) in enumerate(scored, 1)}
-    sheets.update_priority_ranks(respondent_id, rank_map)
-    return rank_map
+MAX_PRIORITY_RANK = 999   # 화면에서 제외한 역량은 999 로 보냄
 
 
 @diagnosis_bp.route('/diagnosis', methods=['POST'])
@@ -32,23 +16,23 @@ def save_diagnosis():
     results = data.get('results', [])
     if not respondent_id or not results:
         return jsonify({'error': 'respondent_id and results are required'}), 400
-
-    sheets.delete_diagnosis_by_respondent(respondent_id)
-    sheets.insert_diagnosis_results(respondent_id, results)
-    compute_priorities(respondent_id)
+    if (not isinstance(respondent_id, int) or isinstance(respondent_id, bool)
+            or not 1 <= respondent_id <= INT_MAX):
+        return jsonify({'error': 'respondent_id must be a positive integer'}), 400
+    if not isinstance(results, list) or not all(valid_result(r) for r in results):
+        return jsonify({'error': 'results need positive integer competency_id and scenario_id '
+                                 f'and likert_score between {LIKERT_MIN} and {LIKERT_MAX}'}), 400
+
+    # 우선순위를 먼저 계산해 두고, 기존 결과 삭제와 새 결과 기록을 한 번에 수행
+    storage.replace_diagnosis_results(respondent_id, results, compute_priorities(results))
     return jsonify({'message': 'Diagnosis saved successfully'}), 201
 
 
-@diagnosis_bp.route('/diagnosis/<int:respondent_id>', methods=['GET'])
-def get_diagnosis(respondent_id):
-    rows = sheets.get_diagnosis_rows(respondent_id, active_only=True)
-    if not rows:
-        return jsonify([])
-
-    # 역량명/그룹명을 Sheets에서 조회
-    comp_map = {c['id']: c for c in sheets.get_competencies()}
-    groups_map = {g['id']: g for g in sheets.get_competency_groups()}
+def build_diagnosis(rows, comp_map, groups_map):
+    """진단 결과 행을 역량별로 집계한 응답 목록 (우선순위 순).
 
+    comp_map: {competency_id: competency}, groups_map: {group_id: group}
+    """
     # Python에서 GROUP BY 집계
     grouped = defaultdict(list)
     for row in rows:
@@ -58,7 +42,6 @@ def get_diagnosis(respondent_id):
     for comp_id, comp_rows_list in grouped.items():
         count = len(comp_rows_list)
         avg_likert = sum(r['likert_score'] for r in comp_rows_list) / count
-        score = count * avg_likert
         priority_rank = min(
             (r['priority_rank'] for r in comp_rows_list if r['priority_rank'] is not None),
             default=None
@@ -72,13 +55,38 @@ def get_diagnosis(respondent_id):
             'group_name': group_info.get('name', ''),
             'selection_count': count,
             'avg_likert': avg_likert,
-            'score': score,
+            'score': score(count, avg_likert),
             'priority_rank': priority_rank,
             'is_active': 1,
         })
 
     result.sort(key=lambda x: (x['priority_rank'] is None, x['priority_rank'] or 0))
-    return jsonify(result)
+    return result
+
+
+@diagnosis_bp.route('/diagnosis/<int:respondent_id>', methods=['GET'])
+def get_diagnosis(respondent_id):
+    rows = storage.get_diagnosis_rows(respondent_id, active_only=True)
+    if not rows:
+        return jsonify([])
+
+    # 역량명/그룹명을 Sheets에서 조회
+    comp_map = {c['id']: c for c in storage.get_competencies()}
+    groups_map = {g['id']: g for g in storage.get_competency_groups()}
+    return jsonify(build_diagnosis(rows, comp_map, groups_map))
+
+
+def _valid_ranking(item):
+    """PUT /diagnosis 의 rankings 항목 검증: 정수 competency_id, 1~MAX_PRIORITY_RANK 순위, is_active 0/1."""
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    return (
+        isinstance(item, dict)
+        and is_int(item.get('competency_id'))
+        and is_int(item.get('priority_rank'))
+        and 1 <= item['priority_rank'] <= MAX_PRIORITY_RANK
+        and item.get('is_active', 1) in (0, 1)
+    )
 
 
 @diagnosis_bp.route('/diagnosis/<int:respondent_id>', methods=['PUT'])
@@ -87,5 +95,8 @@ def update_diagnosis(respondent_id):
     rankings = data.get('rankings', [])
     if not rankings:
         return jsonify({'error': 'rankings are required'}), 400
-    sheets.update_diagnosis_rankings(respondent_id, rankings)
+    if not all(_valid_ranking(item) for item in rankings):
+        return jsonify({'error': 'rankings need integer competency_id, priority_rank between 1 and '
+                                 f'{MAX_PRIORITY_RANK} and is_active 0 or 1'}), 400
+    storage.update_diagnosis_rankings(respondent_id, rankings)
     return jsonify({'message': 'Rankings updated successfully'})
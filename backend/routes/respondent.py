@@ -1,5 +1,9 @@
-from flask import Blueprint, request, jsonify
-import sheets
+from flask import Blueprint, Response, request, jsonify
+import catalog
+import storage
+from routes.conditional import make_etag, not_modified, tagged
+from routes.diagnosis import build_diagnosis
+from routes.roadmap import build_courses, build_roadmap
 
 respondent_bp = Blueprint('respondent', __name__)
 
@@ -11,7 +15,7 @@ def create_respondent():
         if not data.get(field):
             return jsonify({'error': f'{field} is required'}), 400
 
-    new_respondent = sheets.insert_respondent(
+    new_respondent = storage.insert_respondent(
         name=data['name'],
         organization=data.get('organization', ''),
         job_type=data['job_type'],
@@ -22,12 +26,38 @@ def create_respondent():
 
 @respondent_bp.route('/respondents/<int:respondent_id>', methods=['GET'])
 def get_respondent(respondent_id):
-    respondent = sheets.get_respondent_by_id(respondent_id)
+    respondent = storage.get_respondent_by_id(respondent_id)
     if not respondent:
         return jsonify({'error': 'Respondent not found'}), 404
     return jsonify(respondent)
 
 
+@respondent_bp.route('/respondents/<int:respondent_id>/summary', methods=['GET'])
+def get_respondent_summary(respondent_id):
+    """결과 화면용: 응답자, 진단 결과, 추천 과정, 로드맵을 한 번에 반환.
+
+    각 시트를 한 번씩만 읽고 역량/과정 맵도 한 번만 만들어 세 화면이 함께 사용한다.
+    """
+    respondent = storage.get_respondent_by_id(respondent_id)
+    if not respondent:
+        return jsonify({'error': 'Respondent not found'}), 404
+
+    diag_rows = storage.get_diagnosis_rows(respondent_id, active_only=True)
+    roadmap_rows = storage.get_roadmap_rows(respondent_id)
+    competencies = storage.get_competencies()
+    courses = storage.get_courses()
+    comp_map = {c['id']: c for c in competencies}
+    groups_map = {g['id']: g for g in storage.get_competency_groups()}
+    course_map = {c['id']: c for c in courses}
+
+    return jsonify({
+        'respondent': respondent,
+        'diagnosis': build_diagnosis(diag_rows, comp_map, groups_map) if diag_rows else [],
+        'courses': build_courses(diag_rows, courses, comp_map) if diag_rows else [],
+        'roadmap': build_roadmap(roadmap_rows, course_map, comp_map),
+    })
+
+
 @respondent_bp.route('/competencies', methods=['GET'])
 def get_competencies():
     job_type = request.args.get('job_type')
@@ -35,28 +65,12 @@ def get_competencies():
     if not job_type or not career_stage:
         return jsonify({'error': 'job_type and career_stage are required'}), 400
 
-    groups = {g['id']: g for g in sheets.get_competency_groups()}
-    comps = sheets.get_competencies()
-
-    result = []
-    for c in comps:
-        g = groups.get(c['group_id'], {})
-        sub = g.get('sub_category')
-        gname = g.get('name', '')
-        if (sub is None
-                or (gname == '리더십' and sub == career_stage)
-                or (gname == '직무역량' and sub == job_type)):
-            result.append({
-                'id': c['id'],
-                'group_id': c['group_id'],
-                'name': c['name'],
-                'description': c['description'],
-                'group_name': gname,
-                'sub_category': sub,
-            })
-
-    result.sort(key=lambda x: (x['group_id'], x['id']))
-    return jsonify(result)
+    etag = make_etag('competencies', storage.static_version(), job_type, career_stage)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    body = catalog.competencies_json(job_type, career_stage)
+    return tagged(Response(body, mimetype='application/json'), etag)
 
 
 @respondent_bp.route('/scenarios', methods=['GET'])
@@ -66,41 +80,9 @@ def get_scenarios():
     if not job_type or not career_stage:
         return jsonify({'error': 'job_type and career_stage are required'}), 400
 
-    groups = {g['id']: g for g in sheets.get_competency_groups()}
-    all_scenarios = sheets.get_scenarios()
-    all_comps = {c['id']: c for c in sheets.get_competencies()}
-    sc_links = sheets.get_scenario_competencies()
-
-    # 시나리오별 역량 목록 사전 구성
-    sc_comp_map = {}
-    for link in sc_links:
-        sid = link['scenario_id']
-        sc_comp_map.setdefault(sid, []).append(link['competency_id'])
-
-    result = []
-    for s in all_scenarios:
-        g = groups.get(s['group_id'], {})
-        sub = g.get('sub_category')
-        gname = g.get('name', '')
-        if not (sub is None
-                or (gname == '리더십' and sub == career_stage)
-                or (gname == '직무역량' and sub == job_type)):
-            continue
-
-        comps = []
-        for cid in sc_comp_map.get(s['id'], []):
-            comp = all_comps.get(cid)
-            if comp:
-                comps.append({'id': comp['id'], 'name': comp['name'], 'description': comp['description']})
-
-        result.append({
-            'id': s['id'],
-            'group_id': s['group_id'],
-            'situation': s['situation'],
-            'group_name': gname,
-            'sub_category': sub,
-            'competencies': comps,
-        })
-
-    result.sort(key=lambda x: (x['group_id'], x['id']))
-    return jsonify(result)
+    etag = make_etag('scenarios', storage.static_version(), job_type, career_stage)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    body = catalog.scenarios_json(job_type, career_stage)
+    return tagged(Response(body, mimetype='application/json'), etag)
@@ -1,28 +1,17 @@
 from flask import Blueprint, request, jsonify
-from collections import defaultdict
-import sheets
+import storage
+from columnar import INT_MAX
+from roadmap_rules import SEMESTER_ORDER, priority_map_of, phase_map_of, courses_by_competency
+from routes.conditional import make_etag, not_modified, tagged
 
 roadmap_bp = Blueprint('roadmap', __name__)
 
-SEMESTER_ORDER = {'상반기': 1, '하반기': 2, '상시': 3}
-
-
-@roadmap_bp.route('/courses/<int:respondent_id>', methods=['GET'])
-def get_courses(respondent_id):
-    diag_rows = sheets.get_diagnosis_rows(respondent_id, active_only=True)
-    if not diag_rows:
-        return jsonify([])
-
-    priority_map = {}
-    for row in diag_rows:
-        cid, rank = row['competency_id'], row['priority_rank']
-        if rank is not None and (cid not in priority_map or rank < priority_map[cid]):
-            priority_map[cid] = rank
-
-    all_courses = sheets.get_courses()
-    comp_map = {c['id']: c for c in sheets.get_competencies()}
 
+def build_courses(diag_rows, all_courses, comp_map):
+    """진단 결과의 역량별 추천 과정 목록 (우선순위 순)."""
+    priority_map = priority_map_of(diag_rows)
     active_cids = {r['competency_id'] for r in diag_rows}
+
     grouped = {}
     for course in all_courses:
         cid = course['competency_id']
@@ -46,39 +35,42 @@ def get_courses(respondent_id):
     for cid in grouped:
         grouped[cid]['courses'].sort(key=lambda c: SEMESTER_ORDER.get(c['semester'], 99))
 
-    return jsonify(sorted(grouped.values(), key=lambda x: x['priority_rank'] or 999))
+    return sorted(grouped.values(), key=lambda x: x['priority_rank'] or 999)
+
+
+@roadmap_bp.route('/courses/<int:respondent_id>', methods=['GET'])
+def get_courses(respondent_id):
+    diag_rows = storage.get_diagnosis_rows(respondent_id, active_only=True)
+    if not diag_rows:
+        return jsonify([])
+
+    # 응답은 과정 카탈로그와 (역량, 우선순위) 집합에만 의존
+    priority_map = priority_map_of(diag_rows)
+    active_cids = {r['competency_id'] for r in diag_rows}
+    etag = make_etag('courses', storage.static_version(),
+                     sorted((cid, priority_map.get(cid)) for cid in active_cids))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    comp_map = {c['id']: c for c in storage.get_competencies()}
+    return tagged(jsonify(build_courses(diag_rows, storage.get_courses(), comp_map)), etag)
 
 
 @roadmap_bp.route('/roadmap/<int:respondent_id>/generate', methods=['POST'])
 def generate_roadmap(respondent_id):
-    diag_rows = sheets.get_diagnosis_rows(respondent_id, active_only=True)
+    diag_rows = storage.get_diagnosis_rows(respondent_id, active_only=True)
     diag_rows = [r for r in diag_rows if r['priority_rank'] is not None]
     if not diag_rows:
         return jsonify({'error': 'No diagnosis results found'}), 404
 
-    comp_priority = {}
-    for row in diag_rows:
-        cid, rank = row['competency_id'], row['priority_rank']
-        if cid not in comp_priority or rank < comp_priority[cid]:
-            comp_priority[cid] = rank
-
-    sorted_comps = sorted(comp_priority.items(), key=lambda x: x[1])
-    total = len(sorted_comps)
-    phase1_cut = max(1, total // 3)
-    phase2_cut = max(phase1_cut + 1, 2 * total // 3)
+    phase_map = phase_map_of(priority_map_of(diag_rows))
+    courses_by_comp = courses_by_competency(storage.get_courses())
 
-    all_courses = sheets.get_courses()
-    courses_by_comp = defaultdict(list)
-    for c in all_courses:
-        courses_by_comp[c['competency_id']].append(c)
-    for cid in courses_by_comp:
-        courses_by_comp[cid].sort(key=lambda c: SEMESTER_ORDER.get(c['semester'], 99))
-
-    sheets.delete_roadmap_by_respondent(respondent_id)
+    storage.delete_roadmap_by_respondent(respondent_id)
 
     items, order_index = [], 0
-    for i, (comp_id, _) in enumerate(sorted_comps):
-        phase = 'Phase 1' if i < phase1_cut else ('Phase 2' if i < phase2_cut else 'Phase 3')
+    for comp_id, phase in phase_map.items():
         for course in courses_by_comp.get(comp_id, []):
             items.append({
                 'respondent_id': respondent_id,
@@ -89,21 +81,13 @@ def generate_roadmap(respondent_id):
             })
             order_index += 1
 
-    sheets.insert_roadmap_items(items)
+    storage.insert_roadmap_items(items)
     return jsonify({'message': 'Roadmap generated successfully'}), 201
 
 
-@roadmap_bp.route('/roadmap/<int:respondent_id>', methods=['GET'])
-def get_roadmap(respondent_id):
-    roadmap_rows = sheets.get_roadmap_rows(respondent_id)
-
+def build_roadmap(roadmap_rows, course_map, comp_map):
+    """로드맵 행을 Phase 별 목록으로. course_map/comp_map: {id: course/competency}"""
     phases = {'Phase 1': [], 'Phase 2': [], 'Phase 3': []}
-    if not roadmap_rows:
-        return jsonify(phases)
-
-    course_map = {c['id']: c for c in sheets.get_courses()}
-    comp_map = {c['id']: c for c in sheets.get_competencies()}
-
     for r in roadmap_rows:
         course = course_map.get(r['course_id'], {})
         comp = comp_map.get(r['competency_id'], {})
@@ -121,8 +105,30 @@ def get_roadmap(respondent_id):
         }
         if r['phase'] in phases:
             phases[r['phase']].append(item)
+    return phases
+
+
+@roadmap_bp.route('/roadmap/<int:respondent_id>', methods=['GET'])
+def get_roadmap(respondent_id):
+    roadmap_rows = storage.get_roadmap_rows(respondent_id)
+    if not roadmap_rows:
+        return jsonify(build_roadmap([], {}, {}))
+
+    course_map = {c['id']: c for c in storage.get_courses()}
+    comp_map = {c['id']: c for c in storage.get_competencies()}
+    return jsonify(build_roadmap(roadmap_rows, course_map, comp_map))
+
 
-    return jsonify(phases)
+def _valid_item(item):
+    """PUT /roadmap 의 items 항목 검증: 양의 정수 id, 0~INT_MAX 정수 order_index, 문자열 phase."""
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    return (
+        isinstance(item, dict)
+        and is_int(item.get('id')) and 1 <= item['id'] <= INT_MAX
+        and is_int(item.get('order_index')) and 0 <= item['order_index'] <= INT_MAX
+        and isinstance(item.get('phase'), str)
+    )
 
 
 @roadmap_bp.route('/roadmap/<int:respondent_id>', methods=['PUT'])
@@ -131,5 +137,8 @@ def update_roadmap(respondent_id):
     items = data.get('items', [])
     if not items:
         return jsonify({'error': 'items are required'}), 400
-    sheets.update_roadmap_items(respondent_id, items)
+    if not all(_valid_item(item) for item in items):
+        return jsonify({'error': 'items need integer id, order_index between 0 and '
+                                 f'{INT_MAX} and a phase'}), 400
+    storage.update_roadmap_items(respondent_id, items)
     return jsonify({'message': 'Roadmap updated successfully'})
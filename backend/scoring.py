@@ -0,0 +1,155 @@
+"""
+역량 우선순위 산출 (가중 방식 선택 + 전체 재산정)
+
+역량별 점수는 응답자가 그 역량을 고른 횟수(count)와 평균 리커트 점수(mean_likert)로
+계산하며, 점수가 높은 순으로 1, 2, ... 순위를 매깁니다. 동점이면 먼저 고른 역량이 앞섭니다.
+
+  count_x_likert (기본) : count × mean_likert
+  mean_likert           : mean_likert
+  weighted              : count^SCORING_COUNT_WEIGHT × mean_likert^SCORING_LIKERT_WEIGHT
+
+가중 방식을 바꾸면 기존 응답자의 priority_rank 는 그대로이므로, rerank() 로
+diagnosis_results 전체를 한 번에(NumPy) 다시 계산하고 바뀐 순위만 한 번의 일괄 수정으로 기록합니다.
+재산정은 응답자가 직접 조정한 순위도 새 점수 순으로 덮어씁니다 (is_active 는 유지).
+
+CLI : python scoring.py [--scheme NAME] [--dry-run]
+
+환경변수:
+  PRIORITY_SCHEME       : 가중 방식 (기본 count_x_likert)
+  SCORING_COUNT_WEIGHT  : weighted 방식의 count 지수 (기본 1)
+  SCORING_LIKERT_WEIGHT : weighted 방식의 mean_likert 지수 (기본 1)
+"""
+
+import os
+import sys
+import json
+import argparse
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '.env'))
+except ImportError:
+    pass
+
+import numpy as np
+import storage
+from columnar import NULL, INT_MAX
+
+SCORING_COUNT_WEIGHT = float(os.environ.get('SCORING_COUNT_WEIGHT', '1'))
+SCORING_LIKERT_WEIGHT = float(os.environ.get('SCORING_LIKERT_WEIGHT', '1'))
+
+# 스칼라와 NumPy 배열 모두에 동작해야 함
+SCHEMES = {
+    'count_x_likert': lambda count, mean_likert: count * mean_likert,
+    'mean_likert': lambda count, mean_likert: mean_likert,
+    'weighted': lambda count, mean_likert: count ** SCORING_COUNT_WEIGHT * mean_likert ** SCORING_LIKERT_WEIGHT,
+}
+
+PRIORITY_SCHEME = os.environ.get('PRIORITY_SCHEME', 'count_x_likert')
+if PRIORITY_SCHEME not in SCHEMES:
+    raise RuntimeError(f'알 수 없는 PRIORITY_SCHEME: {PRIORITY_SCHEME} (가능: {", ".join(SCHEMES)})')
+
+
+LIKERT_MIN, LIKERT_MAX = 1, 5
+
+
+def valid_result(r):
+    """진단 결과 항목 검증: 양의 정수 competency_id·scenario_id, LIKERT_MIN~LIKERT_MAX 정수 likert_score."""
+    def is_int(value):
+        return isinstance(value, int) and not isinstance(value, bool)
+    return (
+        isinstance(r, dict)
+        and all(is_int(r.get(f)) and 1 <= r[f] <= INT_MAX for f in ('competency_id', 'scenario_id'))
+        and is_int(r.get('likert_score')) and LIKERT_MIN <= r['likert_score'] <= LIKERT_MAX
+    )
+
+
+def score(count, mean_likert, scheme=None):
+    return SCHEMES[scheme or PRIORITY_SCHEME](count, mean_likert)
+
+
+def compute_priorities(results, scheme=None):
+    """응답자 한 명의 선택 결과로 우선순위 산출. {competency_id: priority_rank} 반환."""
+    groups = {}
+    for r in results:
+        groups.setdefault(int(r['competency_id']), []).append(int(r['likert_score']))
+
+    scored = [
+        (comp_id, score(len(scores), sum(scores) / len(scores), scheme))
+        for comp_id, scores in groups.items()
+    ]
+    # 안정 정렬 — 동점이면 먼저 고른 역량이 앞
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return {comp_id: rank for rank, (comp_id, _) in enumerate(scored, 1)}
+
+
+def rank_columns(columns, scheme=None):
+    """storage.get_diagnosis_columns() 전체의 행별 새 순위 array (계산하지 않는 행은 NULL).
+
+    compute_priorities 와 같은 규칙을 응답자별 활성(is_active=1) 행에 한 번에 적용한다.
+    비활성 행은 NULL 로 두어 기존 순위를 건드리지 않는다.
+    행이 만들어진 순서(id)를 '먼저 고른 순서'로 본다.
+    """
+    cols = {name: np.frombuffer(columns[name], dtype=np.int32)
+            for name in ('id', 'respondent_id', 'competency_id', 'likert_score', 'is_active')}
+    ranks = np.full(len(cols['id']), NULL, dtype=np.int32)
+    keep = np.flatnonzero((cols['is_active'] == 1) & (cols['respondent_id'] != NULL)
+                          & (cols['competency_id'] != NULL) & (cols['likert_score'] != NULL))
+    if not len(keep):
+        return ranks
+    row_id = cols['id'][keep].astype(np.int64)
+    rid = cols['respondent_id'][keep].astype(np.int64)
+    cid = cols['competency_id'][keep].astype(np.int64)
+    likert = cols['likert_score'][keep].astype(np.float64)
+
+    # (응답자, 역량) 쌍별 선택 횟수·평균 리커트·처음 고른 행
+    n_comp = int(cid.max()) + 1
+    pair_keys, pair = np.unique(rid * n_comp + cid, return_inverse=True)
+    count = np.bincount(pair)
+    mean_likert = np.bincount(pair, weights=likert) / count
+    first = np.full(len(pair_keys), np.iinfo(np.int64).max)
+    np.minimum.at(first, pair, row_id)
+    pair_rid = pair_keys // n_comp
+
+    # 응답자별로 점수 내림차순(동점은 먼저 고른 순) 정렬 후 응답자 안에서의 위치가 순위
+    order = np.lexsort((first, -score(count.astype(np.float64), mean_likert, scheme), pair_rid))
+    sorted_rid = pair_rid[order]
+    pair_rank = np.empty(len(pair_keys), dtype=np.int64)
+    pair_rank[order] = np.arange(len(order)) - np.searchsorted(sorted_rid, sorted_rid) + 1
+    ranks[keep] = pair_rank[pair]
+    return ranks
+
+
+def rerank(scheme=None, dry_run=False):
+    """전체 진단 결과의 priority_rank 를 다시 계산하고 바뀐 행만 기록. 요약 dict 반환."""
+    columns = storage.get_diagnosis_columns()
+    ranks = rank_columns(columns, scheme)
+    current = np.frombuffer(columns['priority_rank'], dtype=np.int32)
+    changed = np.flatnonzero((ranks != NULL) & (ranks != current))
+    ids = np.frombuffer(columns['id'], dtype=np.int32)[changed]
+    respondent_ids = np.frombuffer(columns['respondent_id'], dtype=np.int32)[changed]
+    if len(changed) and not dry_run:
+        storage.update_priority_ranks(dict(zip(ids.tolist(), ranks[changed].tolist())))
+    return {
+        'scheme': scheme or PRIORITY_SCHEME,
+        'rows': len(ranks),
+        'changed_rows': len(changed),
+        'changed_respondents': len(np.unique(respondent_ids)),
+        'dry_run': dry_run,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='전체 응답자 역량 우선순위 재산정')
+    parser.add_argument('--scheme', choices=sorted(SCHEMES), help=f'기본: {PRIORITY_SCHEME}')
+    parser.add_argument('--dry-run', action='store_true', help='바뀔 행 수만 출력')
+    args = parser.parse_args(argv)
+
+    storage.start()
+    json.dump(rerank(args.scheme, args.dry_run), sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+워커 간 공유 캐시 (호스트 단위 SQLite 저장소)
+
+gunicorn 워커들은 각자 메모리 캐시를 갖지만, 시트에서 내려받은 데이터와
+쓰기 변경분은 이 저장소를 통해 같은 호스트의 모든 워커가 공유합니다.
+
+  entries : sheet -> (base, head, fetched_at, payload)
+            payload 는 base 버전의 전체 레코드(JSON), head 는 최신 버전
+  ops     : (sheet, version) -> op(JSON)
+            base 이후 write-through 로 적용된 변경분. 스냅샷이 다시 게시되면 다운로드 중에
+            기록된 것만 새 base 위로 옮겨지고 나머지는 비워짐
+  sync    : sheet -> state(JSON)
+            마지막 동기화 시점의 시트 위치 정보 (sheets.py 의 증분 동기화가 사용).
+            증분 동기화는 스냅샷 대신 새 행을 op 로 기록하고 fetched_at·sync 만 갱신함.
+            시트가 아닌 작업의 상태도 둠 (save_sync_state)
+  leases  : name -> (owner, expires_at)
+            한 워커만 수행해야 하는 작업(시트 다운로드, 쓰기 플러시 등)의 호스트 단위 잠금.
+            expires_at 이 fencing token 을 겸함 (renew_lease)
+  buckets : name -> (tokens, updated_at)
+            호스트 단위 토큰 버킷 (시트 API 할당량, quota.py)
+
+각 워커는 자신이 가진 버전과 head 를 비교해, 뒤처진 만큼의 op 만 재적용하거나
+(base 자체가 바뀐 경우) 스냅샷을 다시 읽습니다. 시트 API는 호스트당 한 번만 호출됩니다.
+
+환경변수:
+  SHARED_CACHE_PATH : SQLite 파일 경로 (기본: 시스템 임시 디렉터리)
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import tempfile
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+SHARED_CACHE_PATH = os.environ.get(
+    'SHARED_CACHE_PATH',
+    os.path.join(tempfile.gettempdir(), 'competency_diagnosis_cache.db')
+)
+
+Meta = namedtuple('Meta', ['base', 'head', 'fetched_at'])
+
+_local = threading.local()
+_owner = uuid.uuid4().hex
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS entries ('
+    ' sheet TEXT PRIMARY KEY, base INTEGER NOT NULL, head INTEGER NOT NULL,'
+    ' fetched_at REAL NOT NULL, payload TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS ops ('
+    ' sheet TEXT NOT NULL, version INTEGER NOT NULL, op TEXT NOT NULL,'
+    ' PRIMARY KEY (sheet, version))',
+    'CREATE TABLE IF NOT EXISTS sync (sheet TEXT PRIMARY KEY, state TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS leases ('
+    ' name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS buckets ('
+    ' name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)',
+)
+
+
+def _connect():
+    return connect(SHARED_CACHE_PATH, 'NORMAL', _SCHEMA)
+
+
+def connect(path, synchronous, schema):
+    """path 의 스레드/프로세스별 WAL 커넥션. fork 이후에는 새로 연결.
+
+    처음 연결할 때 schema(CREATE 문 목록)를 실행한다. write_queue 의 저널도 이 함수로 연다.
+    """
+    if getattr(_local, 'pid', None) != os.getpid():
+        _local.conns = {}
+        _local.pid = os.getpid()
+    conn = _local.conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={synchronous}')
+        for sql in schema:
+            conn.execute(sql)
+        _local.conns[path] = conn
+    return conn
+
+
+@contextmanager
+def transaction(mode='', conn=None):
+    """공유 DB(또는 connect 로 연 conn) 트랜잭션. mode='IMMEDIATE' 면 호스트 전체에서 쓰기 잠금을 잡음.
+
+    잠금은 짧게만 잡는다 — 안에서 시트 API 호출이나 대기를 하지 않음.
+    """
+    conn = conn or _connect()
+    conn.execute(f'BEGIN {mode}')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+
+def meta(sheet):
+    """(base, head, fetched_at) 또는 None."""
+    row = _connect().execute(
+        'SELECT base, head, fetched_at FROM entries WHERE sheet = ?', (sheet,)
+    ).fetchone()
+    return Meta(*row) if row else None
+
+
+def load(sheet):
+    """(meta, records, [op, ...]) 또는 None. records 는 base 버전 스냅샷."""
+    with transaction() as conn:
+        row = conn.execute(
+            'SELECT base, head, fetched_at, payload FROM entries WHERE sheet = ?', (sheet,)
+        ).fetchone()
+        if row is None:
+            return None
+        base, head, fetched_at, payload = row
+        ops = _ops_between(conn, sheet, base, head)
+    return Meta(base, head, fetched_at), json.loads(payload), ops
+
+
+def ops_since(sheet, version):
+    """version 이후 head 까지의 op 리스트. base 가 version 보다 새로우면 None."""
+    with transaction() as conn:
+        row = conn.execute('SELECT base, head FROM entries WHERE sheet = ?', (sheet,)).fetchone()
+        if row is None or row[0] > version:
+            return None
+        return _ops_between(conn, sheet, version, row[1])
+
+
+def sync_state(sheet):
+    """publish 때 함께 저장한 state 또는 None."""
+    row = _connect().execute('SELECT state FROM sync WHERE sheet = ?', (sheet,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def save_sync_state(name, state):
+    """스냅샷과 무관한 동기화 상태를 저장 (예: roadmap_sync 가 마지막으로 확인한 카탈로그 버전)."""
+    _connect().execute('INSERT OR REPLACE INTO sync (sheet, state) VALUES (?, ?)',
+                       (name, json.dumps(state, ensure_ascii=False)))
+
+
+def publish(sheet, records, fetched_at, sync=None, seen=None):
+    """시트에서 새로 읽은 전체 레코드를 게시. (새 head 버전, 이어 붙인 op 리스트)를 반환.
+
+    sync 는 이 스냅샷이 시트의 어디까지를 반영했는지에 대한 정보(JSON 직렬화 가능)로,
+    sync_state 로 다시 읽을 수 있다.
+    seen 은 다운로드를 시작할 때의 head. 그 뒤에 기록된 op 는 스냅샷에 빠져 있을 수 있으므로
+    버리지 않고 새 base 위에 다시 이어 붙인다 (op 는 멱등). None 이면 모든 op 를 버린다.
+    """
+    payload = json.dumps(records, ensure_ascii=False)
+    with transaction('IMMEDIATE') as conn:
+        row = conn.execute('SELECT head FROM entries WHERE sheet = ?', (sheet,)).fetchone()
+        head = row[0] if row else 0
+        carried = []
+        if seen is not None and row:
+            carried = conn.execute(
+                'SELECT op FROM ops WHERE sheet = ? AND version > ? ORDER BY version', (sheet, seen)
+            ).fetchall()
+        base = head + 1
+        conn.execute('DELETE FROM ops WHERE sheet = ?', (sheet,))
+        conn.executemany('INSERT INTO ops (sheet, version, op) VALUES (?, ?, ?)',
+                         [(sheet, base + i, op) for i, (op,) in enumerate(carried, start=1)])
+        conn.execute(
+            'INSERT OR REPLACE INTO entries (sheet, base, head, fetched_at, payload)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            (sheet, base, base + len(carried), fetched_at, payload)
+        )
+        if sync is None:
+            conn.execute('DELETE FROM sync WHERE sheet = ?', (sheet,))
+        else:
+            conn.execute('INSERT OR REPLACE INTO sync (sheet, state) VALUES (?, ?)',
+                         (sheet, json.dumps(sync, ensure_ascii=False)))
+    return base + len(carried), [json.loads(op) for op, in carried]
+
+
+def append_op(sheet, op, since):
+    """write-through 변경분을 기록.
+
+    반환값:
+      None                    — 공유 항목이 없음 (기록하지 않음)
+      (version, None)         — 기록했지만 since 가 base 보다 오래되어 재구성 필요
+      (version, [op, ...])    — 기록 완료. since 와 새 버전 사이에 다른 워커가 남긴 op
+    """
+    with transaction('IMMEDIATE') as conn:
+        row = conn.execute('SELECT base, head FROM entries WHERE sheet = ?', (sheet,)).fetchone()
+        if row is None:
+            return None
+        base, head = row
+        missed = None
+        if since is not None and since >= base:
+            missed = _ops_between(conn, sheet, since, head)
+        version = head + 1
+        conn.execute('INSERT INTO ops (sheet, version, op) VALUES (?, ?, ?)',
+                     (sheet, version, json.dumps(op, ensure_ascii=False)))
+        conn.execute('UPDATE entries SET head = ? WHERE sheet = ?', (version, sheet))
+    return version, missed
+
+
+def record_sync(sheet, op, base, fetched_at, sync):
+    """증분 동기화 결과를 기록. op 가 있으면 로그에 붙이고 fetched_at·sync 를 갱신.
+
+    스냅샷을 다시 게시하지 않으므로 다른 워커는 op 만 재적용하면 된다.
+    그 사이 base 가 바뀌었으면(다른 워커의 게시) 아무것도 하지 않고 False.
+    """
+    with transaction('IMMEDIATE') as conn:
+        row = conn.execute('SELECT base, head FROM entries WHERE sheet = ?', (sheet,)).fetchone()
+        if row is None or row[0] != base:
+            return False
+        head = row[1]
+        if op is not None:
+            head += 1
+            conn.execute('INSERT INTO ops (sheet, version, op) VALUES (?, ?, ?)',
+                         (sheet, head, json.dumps(op, ensure_ascii=False)))
+        conn.execute('UPDATE entries SET head = ?, fetched_at = ? WHERE sheet = ?',
+                     (head, fetched_at, sheet))
+        conn.execute('INSERT OR REPLACE INTO sync (sheet, state) VALUES (?, ?)',
+                     (sheet, json.dumps(sync, ensure_ascii=False)))
+    return True
+
+
+def invalidate(sheet=None):
+    """공유 항목 삭제. 모든 워커가 다음 읽기에서 시트를 다시 읽음."""
+    with transaction('IMMEDIATE') as conn:
+        if sheet is None:
+            conn.execute('DELETE FROM entries')
+            conn.execute('DELETE FROM ops')
+            conn.execute('DELETE FROM sync')
+        else:
+            conn.execute('DELETE FROM entries WHERE sheet = ?', (sheet,))
+            conn.execute('DELETE FROM ops WHERE sheet = ?', (sheet,))
+            conn.execute('DELETE FROM sync WHERE sheet = ?', (sheet,))
+
+
+def acquire_lease(name, ttl):
+    """호스트 단위 lease 를 ttl 초 동안 잡음. 다른 프로세스가 잡고 있으면 None.
+
+    잡으면 fencing token(이번에 기록한 만료 시각)을 반환 — renew_lease 에 넘긴다.
+    """
+    now = time.time()
+    expires_at = now + ttl
+    with transaction('IMMEDIATE') as conn:
+        row = conn.execute('SELECT owner, expires_at FROM leases WHERE name = ?', (name,)).fetchone()
+        if row and row[0] != _owner and row[1] > now:
+            return None
+        conn.execute('INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)',
+                     (name, _owner, expires_at))
+    return expires_at
+
+
+def renew_lease(name, token, ttl):
+    """token 으로 잡은 lease 가 그대로 유효하면 ttl 초 연장하고 새 token 을 반환.
+
+    만료됐거나 그 사이 다른 워커가 잡았으면(만료 시각이 token 과 다름) None.
+    """
+    now = time.time()
+    expires_at = now + ttl
+    cur = _connect().execute(
+        'UPDATE leases SET expires_at = ? WHERE name = ? AND owner = ? AND expires_at = ? AND expires_at > ?',
+        (expires_at, name, _owner, token, now)
+    )
+    return expires_at if cur.rowcount else None
+
+
+def release_lease(name):
+    _connect().execute('DELETE FROM leases WHERE name = ? AND owner = ?', (name, _owner))
+
+
+def take_token(name, rate, capacity, reserve=0):
+    """호스트 단위 토큰 버킷에서 토큰 하나를 꺼냄.
+
+    꺼낸 뒤에도 reserve 개 이상 남을 때만 꺼내고 0 을 반환하며,
+    아니면 꺼내지 않고 그만큼 찰 때까지 기다려야 할 시간(초)을 반환한다.
+    """
+    now = time.time()
+    with transaction('IMMEDIATE') as conn:
+        row = conn.execute('SELECT tokens, updated_at FROM buckets WHERE name = ?', (name,)).fetchone()
+        tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+        if tokens - 1 >= reserve:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (reserve + 1 - tokens) / rate
+        conn.execute('INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)',
+                     (name, tokens, now))
+    return wait
+
+
+def drain_tokens(name):
+    """버킷을 비움 — 시트가 할당량 초과(429)를 알려 왔을 때 모든 워커가 잠시 멈추도록."""
+    _connect().execute('INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, 0, ?)',
+                       (name, time.time()))
+
+
+def _ops_between(conn, sheet, after, upto):
+    rows = conn.execute(
+        'SELECT op FROM ops WHERE sheet = ? AND version > ? AND version <= ? ORDER BY version',
+        (sheet, after, upto)
+    ).fetchall()
+    return [json.loads(r[0]) for r in rows]
@@ -2,32 +2,162 @@
 Google Sheets 추상화 레이어
 동적 테이블(respondents, diagnosis_results, roadmap_items)을 Google Sheets로 관리합니다.
 
+시트에서 읽은 데이터는 shared_cache(호스트 단위 SQLite)를 거쳐 모든 gunicorn 워커가
+공유하며, 각 워커는 그 위에 타입 변환·인덱스가 구성된 메모리 캐시를 둡니다.
+
+쓰기는 write_queue 저널에 먼저 기록된 뒤 백그라운드에서 모아서 시트로 반영됩니다.
+정적 참조 데이터는 기동 시 디스크 스냅샷(snapshot.py)으로 먼저 채워집니다.
+모든 시트 API 호출은 quota.py 의 할당량 버킷과 재시도를 거칩니다.
+
 환경변수:
   GOOGLE_CREDENTIALS_JSON : 서비스 계정 JSON 키 파일 전체 내용 (한 줄 문자열)
   SPREADSHEET_ID          : Google Sheets 스프레드시트 ID
+  SHEETS_WRITE_BEHIND     : 0 이면 쓰기를 요청 스레드에서 바로 시트에 반영 (기본 1)
+  SHEETS_FULL_SYNC_INTERVAL : 동적 시트를 증분이 아닌 전체로 다시 읽는 주기(초, 기본 600)
+  CACHE_HARD_STALE        : 만료된 동적 데이터를 백그라운드 갱신 중에 계속 제공할 최대 나이(초, 기본 600)
+  STATIC_CACHE_HARD_STALE : 정적 참조 데이터의 같은 한도(초, 기본 86400)
 """
 
 import os
 import json
 import time
+import hashlib
+import logging
 import datetime
+import threading
 
 import gspread
 from google.oauth2.service_account import Credentials
 
+import id_allocator
+from columnar import ColumnTable, INT_MIN, INT_MAX
+import metrics
+import quota
+import shared_cache
+import snapshot
+import write_queue
+
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 CACHE_TTL = 30        # 동적 데이터 캐시 (30초)
 STATIC_CACHE_TTL = 300  # 정적 참조 데이터 캐시 (5분)
+CACHE_HARD_STALE = float(os.environ.get('CACHE_HARD_STALE', '600'))
+STATIC_CACHE_HARD_STALE = float(os.environ.get('STATIC_CACHE_HARD_STALE', '86400'))
+SHEETS_WRITE_BEHIND = os.environ.get('SHEETS_WRITE_BEHIND', '1') == '1'
+SHEETS_FULL_SYNC_INTERVAL = float(os.environ.get('SHEETS_FULL_SYNC_INTERVAL', '600'))
+FETCH_LEASE_TTL = 30  # 다른 워커의 다운로드를 기다리는 최대 시간(초)
+ID_COUNTER_SHEET = 'id_counters'   # sheet, next_id — 시트별 다음 id
+STATIC_SHEETS = ('competency_groups', 'competencies', 'scenarios', 'scenario_competencies', 'courses')
+STATIC_BATCH = 'static'  # 정적 탭 일괄 다운로드의 single-flight / lease 키
+_WRITE_OPS = {'append_rows', 'update_cells', 'batch_update', 'add_worksheet'}
+_SIZE_SAMPLE = 20    # 메트릭 바이트 수 추정에 직렬화하는 항목 수
 
 _client = None
 _spreadsheet = None
 _worksheets = {}
-_cache = {}         # sheet_name -> (timestamp, [dict, ...])  — 동적 데이터
-_static_cache = {}  # sheet_name -> (timestamp, [dict, ...])  — 정적 데이터
+_worksheets_lock = threading.Lock()   # _worksheets / _worksheet_properties 변경·순회용 (API 호출 중엔 잡지 않음)
+_worksheet_properties = {}  # title -> 워크시트 속성 (스냅샷에서 읽은 메타데이터)
+_cache = {}         # sheet_name -> (version, ColumnTable)  — 동적 데이터
+_static_cache = {}  # sheet_name -> (version, [dict, ...], digest) — 정적 데이터
+_refreshing = set()  # 백그라운드 갱신 중인 키 (sheet_name 또는 STATIC_BATCH)
+_refresh_lock = threading.Lock()
+_inflight = {}       # 키 -> _Flight (내려받는 중인 시트)
+_inflight_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
 
 
 # ─── 내부 헬퍼 ────────────────────────────────────────────────────────────────
 
+def _sheets_call(op, sheet, fn, *args, **kwargs):
+    """모든 Sheets API 호출의 통로.
+
+    호출 전에 할당량 토큰을 받고(quota.acquire), 429 등은 백오프 후 다시 시도한다.
+    시도마다 호출 수·지연·주고받은 행/바이트를 metrics 에 기록.
+    """
+    kind = 'write' if op in _WRITE_OPS else 'read'
+    attempt = 0
+    while True:
+        quota.acquire(kind)
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+            break
+        except gspread.exceptions.APIError as exc:
+            metrics.observe_sheets_call(op, sheet, time.perf_counter() - started, error=True)
+            delay = quota.retry_delay(kind, exc, attempt)
+            if delay is None:
+                raise
+            logger.warning('sheets %s %s failed with %s; retrying in %.1fs', op, sheet, exc.code, delay)
+            metrics.inc('sheets_api_retries_total', (('op', op), ('sheet', sheet), ('code', str(exc.code))))
+            time.sleep(delay)
+            attempt += 1
+        except Exception:
+            metrics.observe_sheets_call(op, sheet, time.perf_counter() - started, error=True)
+            raise
+    elapsed = time.perf_counter() - started
+    payload = (args[0] if args else None) if op in _WRITE_OPS else result
+    metrics.observe_sheets_call(op, sheet, elapsed, *_payload_size(payload))
+    return result
+
+
+def _payload_size(payload):
+    """(행 수, JSON 기준 바이트 수 추정). 응답(읽기) 또는 요청 본문(쓰기).
+
+    바이트 수는 전체를 직렬화하지 않고 앞쪽 _SIZE_SAMPLE 개 항목의 크기에서 비례 추정한다.
+    """
+    if isinstance(payload, dict):
+        if 'valueRanges' in payload:
+            rows = sum(_range_rows(vr) for vr in payload['valueRanges'])
+            nbytes = sum(_estimate_size(values) for vr in payload['valueRanges']
+                         for values in _range_lines(vr))
+        else:
+            requests = payload.get('requests', [])
+            rows = sum(_request_rows(r) for r in requests)
+            items = []
+            for r in requests:
+                body = r.get('appendCells') or r.get('updateCells')
+                items.extend(body['rows'] if body else [r])
+            nbytes = _estimate_size(items)
+    elif isinstance(payload, list):
+        rows = len(payload)
+        nbytes = _estimate_size(payload)
+    else:
+        return 0, 0
+    return rows, nbytes
+
+
+def _estimate_size(items):
+    if len(items) <= _SIZE_SAMPLE:
+        return _json_size(items)
+    return _json_size(items[:_SIZE_SAMPLE]) * len(items) // _SIZE_SAMPLE
+
+
+def _json_size(value):
+    body = json.dumps(value, ensure_ascii=False, default=lambda o: getattr(o, 'value', None))
+    return len(body.encode('utf-8'))
+
+
+def _range_lines(value_range):
+    """크기 추정용 항목 리스트들 — COLUMNS 응답은 열마다 긴 리스트이므로 열별로."""
+    values = value_range.get('values', [])
+    return values if value_range.get('majorDimension') == 'COLUMNS' else [values]
+
+
+def _range_rows(value_range):
+    values = value_range.get('values', [])
+    if value_range.get('majorDimension') == 'COLUMNS':
+        return max(map(len, values), default=0)
+    return len(values)
+
+
+def _request_rows(request):
+    if 'deleteDimension' in request:
+        r = request['deleteDimension']['range']
+        return r['endIndex'] - r['startIndex']
+    body = request.get('appendCells') or request.get('updateCells') or {}
+    return len(body.get('rows', []))
+
+
 def _get_client():
     global _client
     if _client is None:
@@ -46,85 +176,740 @@ def _get_spreadsheet():
         spreadsheet_id = os.environ.get('SPREADSHEET_ID')
         if not spreadsheet_id:
             raise RuntimeError('SPREADSHEET_ID 환경변수가 설정되지 않았습니다.')
-        _spreadsheet = _get_client().open_by_key(spreadsheet_id)
+        _spreadsheet = _sheets_call('open_by_key', '', _get_client().open_by_key, spreadsheet_id)
     return _spreadsheet
 
 
 def _get_worksheet(name):
-    if name not in _worksheets:
-        _worksheets[name] = _get_spreadsheet().worksheet(name)
-    return _worksheets[name]
+    ws = _worksheets.get(name)
+    if ws is None:
+        spreadsheet = _get_spreadsheet()
+        properties = _worksheet_properties.get(name)
+        if properties is not None:
+            # 스냅샷의 메타데이터로 바로 구성 — 워크시트 조회 API 호출을 생략
+            ws = gspread.Worksheet(spreadsheet, properties, spreadsheet.id, spreadsheet.client)
+        else:
+            ws = _sheets_call('worksheet', name, spreadsheet.worksheet, name)
+        with _worksheets_lock:
+            ws = _worksheets.setdefault(name, ws)
+    return ws
+
+
+def invalidate(sheet_name=None):
+    """캐시를 버림 (sheet_name 이 None 이면 전체). 공유 캐시를 통해 모든 워커에 전파됨."""
+    shared_cache.invalidate(sheet_name)
+    if sheet_name is None:
+        _cache.clear()
+        _static_cache.clear()
+    else:
+        _cache.pop(sheet_name, None)
+        _static_cache.pop(sheet_name, None)
+
+
+def _digest(records):
+    return hashlib.sha1(
+        json.dumps(records, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+
 
+def _static_entry(sheet_name):
+    """정적 참조 데이터 캐시 항목 (version, records, digest) — 5분 캐시.
 
-def _invalidate(name):
-    _cache.pop(name, None)
+    만료됐어도 STATIC_CACHE_HARD_STALE 이내면 그대로 반환하고 백그라운드에서 갱신한다.
+    """
+    meta = shared_cache.meta(sheet_name)
+    if meta:
+        age = time.time() - meta.fetched_at
+        if age < STATIC_CACHE_HARD_STALE:
+            entry = _cached_static(sheet_name, meta)
+            if entry is not None:
+                if age >= STATIC_CACHE_TTL:
+                    metrics.cache_lookup('static', sheet_name, 'stale')
+                    _refresh_in_background(STATIC_BATCH, _load_static)
+                else:
+                    metrics.cache_lookup('static', sheet_name, 'hit')
+                return entry
+    metrics.cache_lookup('static', sheet_name, 'miss')
+    return _load_static(STATIC_BATCH)[sheet_name]
+
+
+def _load_static(key):
+    return _coalesced(key, _fetch_static, _fresh_static)
+
+
+def _cached_static(sheet_name, meta):
+    local = _static_cache.get(sheet_name)
+    if local and local[0] == meta.head:
+        return local
+    loaded = shared_cache.load(sheet_name)
+    if loaded:
+        meta, records, _ = loaded
+        _static_cache[sheet_name] = (meta.head, records, _digest(records))
+        return _static_cache[sheet_name]
+    return None
+
+
+def _fresh_static(_key):
+    """모든 정적 탭이 공유 캐시에서 유효하면 {sheet_name: entry}, 아니면 None."""
+    entries = {}
+    for name in STATIC_SHEETS:
+        meta = shared_cache.meta(name)
+        if not meta or time.time() - meta.fetched_at >= STATIC_CACHE_TTL:
+            return None
+        entries[name] = _cached_static(name, meta)
+        if entries[name] is None:
+            return None
+    return entries
+
+
+def _fetch_static(_key):
+    """정적 탭 전체를 values.batchGet 한 번으로 읽어 게시. {sheet_name: entry} 반환."""
+    now = time.time()
+    response = _sheets_call('values_batch_get', STATIC_BATCH, _get_spreadsheet().values_batch_get,
+                            [f"'{name}'" for name in STATIC_SHEETS])
+    entries, tables = {}, {}
+    for name, value_range in zip(STATIC_SHEETS, response['valueRanges']):
+        tables[name] = value_range.get('values', [])
+        records = _records(tables[name])
+        version, _ = shared_cache.publish(name, records, now)
+        entries[name] = _static_cache[name] = (version, records, _digest(records))
+    _save_snapshot(tables, now)
+    return entries
+
+
+def _records(values):
+    """헤더 행 + 데이터 행을 get_all_records(numericise_ignore=['all'])와 같은 dict 리스트로."""
+    if not values:
+        return []
+    header = values[0]
+    return [
+        dict(zip(header, row + [''] * (len(header) - len(row))))
+        for row in values[1:]
+    ]
+
+
+# ─── 웜 스타트 스냅샷 ─────────────────────────────────────────────────────────
+# 정적 탭을 받아 올 때마다 디스크 스냅샷(snapshot.py)을 다시 쓰고, 기동 시
+# 공유 캐시가 비어 있으면 스냅샷을 '만료된' 항목으로 게시한 뒤 백그라운드에서 갱신한다.
+
+def _save_snapshot(tables, saved_at):
+    """스냅샷 저장은 최선 노력 — 실패해도 이를 부른 정적 데이터 다운로드는 성공으로 끝난다."""
+    try:
+        with _worksheets_lock:
+            for title, ws in list(_worksheets.items()):
+                _worksheet_properties[title] = ws._properties
+            properties = dict(_worksheet_properties)
+        snapshot.save({'spreadsheet_id': os.environ.get('SPREADSHEET_ID'), 'saved_at': saved_at,
+                       'tables': tables, 'worksheets': properties})
+    except Exception:
+        logger.warning('could not write static snapshot', exc_info=True)
+
+
+def _warm_start():
+    data = snapshot.load()
+    if not data or data.get('spreadsheet_id') != os.environ.get('SPREADSHEET_ID'):
+        return      # 다른 스프레드시트의 스냅샷은 쓰지 않음
+    with _worksheets_lock:
+        _worksheet_properties.update(data.get('worksheets', {}))
+    published = False
+    expired_at = time.time() - STATIC_CACHE_TTL
+    for name in STATIC_SHEETS:
+        if name in data['tables'] and shared_cache.meta(name) is None:
+            shared_cache.publish(name, _records(data['tables'][name]), expired_at)
+            published = True
+    if published:
+        _refresh_in_background(STATIC_BATCH, _load_static)
 
 
 def _all_rows_static(sheet_name):
     """정적 참조 데이터를 5분 캐시로 반환 (직접 읽기 전용)."""
+    return _static_entry(sheet_name)[1]
+
+
+def _int_or_none(value):
+    return int(value) if value not in ('', None) else None
+
+
+# 동적 시트 컬럼 순서 (시트 헤더와 동일).
+_DYNAMIC_HEADERS = {
+    'respondents': ['id', 'name', 'organization', 'job_type', 'career_stage', 'created_at'],
+    'diagnosis_results': ['id', 'respondent_id', 'competency_id', 'scenario_id',
+                          'likert_score', 'priority_rank', 'is_active'],
+    'roadmap_items': ['id', 'respondent_id', 'course_id', 'competency_id', 'order_index', 'phase'],
+}
+
+# 동적 시트별 정수 컬럼. 캐시 적재 시 한 번만 변환하고(ColumnTable 의 array('i')),
+# 저널 op 도 같은 변환을 거친 값으로 기록한다.
+_DYNAMIC_COLUMNS = {
+    'respondents': {
+        'id': _int_or_none,
+    },
+    'diagnosis_results': {
+        'id': _int_or_none,
+        'respondent_id': _int_or_none,
+        'competency_id': _int_or_none,
+        'scenario_id': _int_or_none,
+        'likert_score': _int_or_none,
+        'priority_rank': _int_or_none,
+        'is_active': _int_or_none,
+    },
+    'roadmap_items': {
+        'id': _int_or_none,
+        'respondent_id': _int_or_none,
+        'course_id': _int_or_none,
+        'competency_id': _int_or_none,
+        'order_index': _int_or_none,
+    },
+}
+
+
+def _typed_row(sheet_name, record):
+    """정수 컬럼을 변환한 레코드 사본. array('i') 에 담을 수 없는 값이면 ValueError.
+
+    op 는 이 변환을 거쳐 만들어지므로, 범위를 벗어난 값은 저널·공유 op 로그에 들어가기 전에 거부된다.
+    """
+    row = dict(record)
+    for col, conv in _DYNAMIC_COLUMNS.get(sheet_name, {}).items():
+        if col in row:
+            value = conv(row[col])
+            if value is not None and not INT_MIN <= value <= INT_MAX:
+                raise ValueError(f'{sheet_name}.{col} out of range: {value}')
+            row[col] = value
+    return row
+
+
+def _build_table(sheet_name, records):
+    """레코드를 컬럼형 table(columnar.ColumnTable)로 적재. id 가 빈 행은 건너뜀."""
+    return ColumnTable(_DYNAMIC_HEADERS[sheet_name], _DYNAMIC_COLUMNS[sheet_name], records)
+
+
+def _table(sheet_name):
+    """캐시된 동적 시트를 인덱스가 구성된 table로 반환 (30초 캐시).
+
+    공유 캐시가 유효하면 시트를 읽지 않고, 로컬 버전이 뒤처진 만큼만 op 를 재적용한다.
+    만료됐어도 CACHE_HARD_STALE 이내면 그대로 반환하고 백그라운드에서 갱신한다.
+    """
+    meta = shared_cache.meta(sheet_name)
+    if meta:
+        age = time.time() - meta.fetched_at
+        if age < CACHE_HARD_STALE:
+            table = _cached_table(sheet_name, meta)
+            if table is not None:
+                if age >= CACHE_TTL:
+                    metrics.cache_lookup('dynamic', sheet_name, 'stale')
+                    _refresh_in_background(sheet_name, _load_table)
+                else:
+                    metrics.cache_lookup('dynamic', sheet_name, 'hit')
+                return table
+    metrics.cache_lookup('dynamic', sheet_name, 'miss')
+    return _load_table(sheet_name)
+
+
+def _load_table(sheet_name):
+    return _coalesced(sheet_name, _sync_table, _fresh_table)
+
+
+def _fresh_table(sheet_name):
+    """공유 캐시가 TTL 이내면 table, 아니면 None."""
+    meta = shared_cache.meta(sheet_name)
+    if meta and time.time() - meta.fetched_at < CACHE_TTL:
+        return _cached_table(sheet_name, meta)
+    return None
+
+
+def _cached_table(sheet_name, meta):
+    """공유 캐시에서 로컬 table 을 최신 버전으로 맞춰 반환. 공유 항목이 없으면 None."""
+    local = _cache.get(sheet_name)
+    if local and local[0] == meta.head:
+        return local[1]
+    if local and local[0] >= meta.base:
+        ops = shared_cache.ops_since(sheet_name, local[0])
+        if ops is not None:
+            for op in ops:
+                _apply_op(sheet_name, local[1], op)
+            _cache[sheet_name] = (local[0] + len(ops), local[1])
+            return local[1]
+    loaded = shared_cache.load(sheet_name)
+    if loaded:
+        meta, records, ops = loaded
+        table = _build_table(sheet_name, records)
+        for op in ops:
+            _apply_op(sheet_name, table, op)
+        _cache[sheet_name] = (meta.head, table)
+        return table
+    return None
+
+
+def _fetch_table(sheet_name):
+    """시트 전체를 읽어 table 을 만들고 공유 캐시에 게시."""
     now = time.time()
-    if sheet_name in _static_cache:
-        ts, data = _static_cache[sheet_name]
-        if now - ts < STATIC_CACHE_TTL:
-            return data
+    # 저널에 남은(아직 시트에 반영되지 않은) 쓰기를 시트 데이터 위에 덧씌움.
+    # 시트를 읽기 전에 목록을 가져와야 그 사이 플러시된 항목도 빠지지 않고,
+    # 읽은 뒤 한 번 더 가져와야 읽는 동안 들어온 쓰기도 빠지지 않는다 (op 는 멱등).
+    # 두 번째 목록 이후 게시 전까지 들어온 쓰기는 publish 가 seen 이후 op 로 이어 붙인다.
+    meta = shared_cache.meta(sheet_name)
+    seen = meta.head if meta else 0
+    pending = dict((seq, op) for seq, _, op in write_queue.pending(sheet_name))
     ws = _get_worksheet(sheet_name)
-    records = ws.get_all_records(numericise_ignore=['all'])
-    _static_cache[sheet_name] = (now, records)
-    return records
+    records = _sheets_call('get_all_records', sheet_name, ws.get_all_records, numericise_ignore=['all'])
+    pending.update((seq, op) for seq, _, op in write_queue.pending(sheet_name))
+    table = _build_table(sheet_name, records)
+    sync = {
+        'sheet_rows': len(records),
+        'last_row': _raw_row(sheet_name, records[-1]) if records else None,
+        'full_at': now,
+    }
+    return _publish_table(sheet_name, table, pending, now, sync, seen)
+
 
+def _sync_table(sheet_name):
+    """마지막으로 읽은 행 이후만 내려받아 table 을 갱신 (증분 동기화).
 
-def _all_rows(sheet_name):
-    """캐시된 전체 행을 dict 리스트로 반환."""
+    직전에 읽은 마지막 행이 같은 위치에 그대로 있으면 그 뒤의 행은 모두 새로 추가된
+    것으로 본다. 마지막 행이 바뀌었거나(삭제·수정) SHEETS_FULL_SYNC_INTERVAL 이
+    지났으면 전체를 다시 읽는다.
+    """
     now = time.time()
-    if sheet_name in _cache:
-        ts, data = _cache[sheet_name]
-        if now - ts < CACHE_TTL:
-            return data
-    ws = _get_worksheet(sheet_name)
-    records = ws.get_all_records(numericise_ignore=['all'])
-    _cache[sheet_name] = (now, records)
-    return records
+    meta = shared_cache.meta(sheet_name)
+    sync = shared_cache.sync_state(sheet_name)
+    if sync is None or meta is None or now - sync['full_at'] >= SHEETS_FULL_SYNC_INTERVAL:
+        return _fetch_table(sheet_name)
 
+    headers = _DYNAMIC_HEADERS[sheet_name]
+    known = sync['sheet_rows']
+    # 헤더가 1행이므로 데이터 n번째 행은 시트의 n+1행. 마지막으로 알던 행부터 읽는다.
+    start = known + 1 if known else 2
+    pending = dict((seq, op) for seq, _, op in write_queue.pending(sheet_name))
+    response = _sheets_call(
+        'values_batch_get', sheet_name, _get_spreadsheet().values_batch_get,
+        [f"'{sheet_name}'!A{start}:{_column_letter(sheet_name, headers[-1])}"]
+    )
+    pending.update((seq, op) for seq, _, op in write_queue.pending(sheet_name))
+    values = [row + [''] * (len(headers) - len(row))
+              for row in response['valueRanges'][0].get('values', [])]
+    if known:
+        if not values or values[0] != sync['last_row']:
+            return _fetch_table(sheet_name)
+        values = values[1:]
 
-def _next_id(sheet_name):
-    rows = _all_rows(sheet_name)
-    if not rows:
-        return 1
-    ids = [int(r['id']) for r in rows if r.get('id')]
-    return (max(ids) + 1) if ids else 1
+    # 전체 스냅샷을 다시 게시하지 않고 새 행만 append op 로 기록 — 다른 워커는 op 만 재적용
+    op = None
+    if values:
+        sync = dict(sync, sheet_rows=known + len(values), last_row=values[-1])
+        # 아직 시트에 반영되지 않은 삭제·수정을 새 행에도 덧씌움 (append 는 이미 캐시에 있음)
+        tail = _build_table(sheet_name, [dict(zip(headers, row)) for row in values])
+        for seq in sorted(pending):
+            if 'append' not in pending[seq]:
+                _apply_op(sheet_name, tail, pending[seq])
+        op = {'append': tail.records()}
+    # 그 사이 다른 워커가 새 스냅샷을 게시했으면 기록하지 않음 — 그쪽이 더 최신
+    shared_cache.record_sync(sheet_name, op, meta.base, now, sync)
+    meta = shared_cache.meta(sheet_name)
+    table = _cached_table(sheet_name, meta) if meta else None
+    return table if table is not None else _fetch_table(sheet_name)
 
 
-def _delete_rows_for_respondent(sheet_name, respondent_id):
-    """지정된 respondent_id의 행을 모두 삭제."""
-    ws = _get_worksheet(sheet_name)
-    all_values = ws.get_all_values()
-    if len(all_values) <= 1:
+def _publish_table(sheet_name, table, pending, now, sync, seen):
+    """전체 다운로드 결과를 새 base 로 게시 (증분 동기화는 append op 만 기록)."""
+    for seq in sorted(pending):
+        _apply_op(sheet_name, table, pending[seq])
+    version, carried = shared_cache.publish(sheet_name, table.records(), now, sync, seen)
+    for op in carried:
+        _apply_op(sheet_name, table, op)
+    _cache[sheet_name] = (version, table)
+    return table
+
+
+def _raw_row(sheet_name, record):
+    """레코드를 시트에서 읽은 그대로의 문자열 행으로 (증분 동기화의 행 비교용)."""
+    return [str(record.get(col, '')) for col in _DYNAMIC_HEADERS[sheet_name]]
+
+
+# ─── 다운로드 합치기 (single-flight) ─────────────────────────────────────────
+# 같은 시트를 여러 요청이 동시에 못 찾으면, 프로세스 안에서는 한 스레드만 내려받고
+# 나머지는 그 결과를 기다린다. 워커 사이에서는 공유 캐시의 lease 로 한 워커만
+# 내려받고, 다른 워커는 게시된 결과를 공유 캐시에서 읽는다.
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _coalesced(key, fetch, fresh):
+    """fetch(key) 를 key 당 한 번만 실행. fresh(key) 는 이미 유효한 결과가 있으면 반환."""
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    try:
+        flight.result = _fetch_or_follow(key, fetch, fresh)
+        return flight.result
+    except Exception as exc:
+        flight.error = exc
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight.done.set()
+
+
+def _fetch_or_follow(key, fetch, fresh):
+    """lease 를 잡으면 직접 내려받고, 다른 워커가 잡고 있으면 게시되기를 기다린다."""
+    lease = f'fetch:{key}'
+    deadline = time.time() + FETCH_LEASE_TTL
+    while True:
+        result = fresh(key)
+        if result is not None:
+            return result
+        if time.time() >= deadline or shared_cache.acquire_lease(lease, FETCH_LEASE_TTL):
+            break
+        time.sleep(0.05)
+    try:
+        return fetch(key)
+    finally:
+        shared_cache.release_lease(lease)
+
+
+# ─── 백그라운드 갱신 (stale-while-revalidate) ─────────────────────────────────
+# 만료된 항목은 요청 스레드에서 바로 반환하고, 시트 다운로드는 시트별로 하나의
+# 백그라운드 스레드가 맡는다. 갱신이 실패하면 다음 요청이 다시 시도한다.
+
+def _refresh_in_background(key, load):
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    thread = threading.Thread(target=_refresh, args=(key, load),
+                              name=f'sheets-refresh-{key}', daemon=True)
+    thread.start()
+
+
+def _refresh(key, load):
+    try:
+        with quota.priority('refresh'):
+            load(key)
+    except Exception:
+        logger.exception('background refresh of %s failed; serving stale data', key)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+
+# ─── ID 발급 ──────────────────────────────────────────────────────────────────
+# id_counters 탭(sheet, next_id)이 시트별 다음 id 를 들고 있고, id_allocator 가
+# 여기서 블록 단위로 예약해 호스트의 모든 워커에 나눠 준다. 데이터 시트는 읽지 않는다.
+
+def _get_counter_worksheet():
+    try:
+        return _get_worksheet(ID_COUNTER_SHEET)
+    except gspread.WorksheetNotFound:
+        ws = _sheets_call('add_worksheet', ID_COUNTER_SHEET, _get_spreadsheet().add_worksheet,
+                          title=ID_COUNTER_SHEET, rows=10, cols=2)
+        _sheets_call('append_rows', ID_COUNTER_SHEET, ws.append_rows,
+                     [['sheet', 'next_id']], value_input_option='RAW')
+        with _worksheets_lock:
+            _worksheets[ID_COUNTER_SHEET] = ws
+        return ws
+
+
+def _max_known_id(sheet_name):
+    """카운터 행이 처음 만들어질 때 한 번만 호출: 시트와 저널에 있는 가장 큰 id."""
+    ids = _sheets_call('col_values', sheet_name, _get_worksheet(sheet_name).col_values,
+                       _DYNAMIC_HEADERS[sheet_name].index('id') + 1)
+    known = [int(v) for v in ids[1:] if str(v).strip().isdigit()]
+    for _, _, op in write_queue.pending(sheet_name):
+        known.extend(int(r['id']) for r in op.get('append', []))
+    return max(known, default=0)
+
+
+def _reserve_ids(sheet_name, count):
+    """id_counters 에서 count 개를 예약하고 첫 id 를 반환 (id_allocator 콜백)."""
+    with quota.priority('write'):   # 제출 처리의 일부이므로 쓰기와 같은 우선순위
+        ws = _get_counter_worksheet()
+        values = _sheets_call('get_all_values', ID_COUNTER_SHEET, ws.get_all_values)
+        for i, row in enumerate(values[1:], start=2):
+            if row and row[0] == sheet_name:
+                first = int(row[1])
+                _sheets_call('update_cells', ID_COUNTER_SHEET, ws.update_cells,
+                             [gspread.Cell(i, 2, first + count)])
+                return first
+        first = _max_known_id(sheet_name) + 1
+        _sheets_call('append_rows', ID_COUNTER_SHEET, ws.append_rows,
+                     [[sheet_name, first + count]], value_input_option='RAW')
+        return first
+
+
+def _allocate_ids(sheet_name, count=1):
+    """연속된 id count 개를 발급하고 첫 id 를 반환."""
+    return id_allocator.allocate(sheet_name, count, _reserve_ids)
+
+
+# ─── 캐시 write-through ───────────────────────────────────────────────────────
+# 쓰기 후 캐시를 버리지 않고 같은 변경(op)을 캐시된 table에 그대로 반영한다.
+# op 는 공유 캐시에도 기록되어 다른 워커가 같은 순서로 재적용한다.
+#   {'append': [record, ...]}
+#   {'delete_respondent': respondent_id}
+#   {'delete_ids': [row_id, ...]}
+#   {'update': [[row_id, {column: value}], ...]}
+
+def _sheet_values(sheet_name, record):
+    """record(dict)를 시트 컬럼 순서의 값 리스트로 변환."""
+    return ['' if record[col] is None else record[col] for col in _DYNAMIC_HEADERS[sheet_name]]
+
+
+def _apply_op(sheet_name, table, op):
+    # append 는 이미 있는 id 를 건너뛰므로 반영된 스냅샷 위에 재적용해도 안전
+    if 'append' in op:
+        table.extend(op['append'])
+    elif 'delete_respondent' in op:
+        table.delete_respondent(op['delete_respondent'])
+    elif 'delete_ids' in op:
+        table.delete_ids(op['delete_ids'])
+    elif 'update' in op:
+        for row_id, values in op['update']:
+            table.update(row_id, values)
+
+
+def _write_through(sheet_name, op):
+    local = _cache.get(sheet_name)
+    result = shared_cache.append_op(sheet_name, op, local[0] if local else None)
+    if result is None or local is None:
+        _cache.pop(sheet_name, None)
         return
-    header = all_values[0]
-    rid_col = header.index('respondent_id')
-    # 뒤에서부터 삭제해야 행 번호가 바뀌지 않음
-    to_delete = [
-        idx + 2   # 1-based sheet row: header=1, data starts at 2
-        for idx, row in enumerate(all_values[1:])
-        if str(row[rid_col]) == str(respondent_id)
+    version, missed = result
+    if missed is None:
+        # 다른 워커가 스냅샷을 새로 게시함 — 다음 읽기에서 공유 캐시로부터 재구성
+        _cache.pop(sheet_name, None)
+        return
+    table = local[1]
+    for m in missed:
+        _apply_op(sheet_name, table, m)
+    _apply_op(sheet_name, table, op)
+    _cache[sheet_name] = (version, table)
+
+
+def _row_ranges(sheet_rows):
+    """정렬된 1-based 행 번호를 연속 구간 [(start, end), ...] 으로 묶음 (end 포함)."""
+    ranges = []
+    for r in sheet_rows:
+        if ranges and ranges[-1][1] == r - 1:
+            ranges[-1][1] = r
+        else:
+            ranges.append([r, r])
+    return ranges
+
+
+def _delete_requests(ws, sheet_rows):
+    """행 번호 목록을 연속 구간 단위 deleteDimension 요청 리스트로 변환."""
+    # 뒤쪽 구간부터 삭제해야 앞쪽 구간의 행 번호가 바뀌지 않음
+    return [
+        {
+            'deleteDimension': {
+                'range': {
+                    'sheetId': ws.id,
+                    'dimension': 'ROWS',
+                    'startIndex': start - 1,    # 0-based, end exclusive
+                    'endIndex': end,
+                }
+            }
+        }
+        for start, end in reversed(_row_ranges(sorted(sheet_rows)))
     ]
-    for sheet_row in reversed(to_delete):
-        ws.delete_rows(sheet_row)
-    _invalidate(sheet_name)
+
+
+def _cell_data(value):
+    """batch_update(appendCells/updateCells) 요청용 CellData."""
+    if value is None or value == '':
+        return {}
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {'userEnteredValue': {'numberValue': value}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+
+def _column_letter(sheet_name, column):
+    return gspread.utils.rowcol_to_a1(1, _DYNAMIC_HEADERS[sheet_name].index(column) + 1)[:-1]
+
+
+# ─── 쓰기 (write-behind) ──────────────────────────────────────────────────────
+# 쓰기는 op 로 표현되어 write_queue 저널에 먼저 기록되고, 캐시에는 즉시 반영된다.
+# 시트 반영은 백그라운드 플러시가 여러 응답자의 op 를 모아 읽기 1회 + batch_update 1회로
+# 처리한다. SHEETS_WRITE_BEHIND=0 이면 요청 스레드에서 바로 플러시한다.
+
+def start():
+    """기동 시 한 번 호출: 스냅샷으로 정적 캐시를 채우고 write-behind 플러시 스레드 시작.
+
+    이전 프로세스가 남긴 저널 항목도 이어서 처리한다.
+    """
+    _warm_start()
+    write_queue.start(_flush_entries)
+
+
+def _write(sheet_name, *ops):
+    # ops 는 만들 때(_typed_row) 이미 검증됨 — 저널에 넣은 뒤에는 캐시 반영이 실패하면 안 됨
+    for op in ops:
+        write_queue.enqueue(sheet_name, op)
+        _write_through(sheet_name, op)
+    write_queue.start(_flush_entries)
+    if not SHEETS_WRITE_BEHIND:
+        write_queue.flush(_flush_entries)
+
+
+def _append_op(sheet_name, records):
+    return {'append': [_typed_row(sheet_name, r) for r in records]}
+
+
+def _delete_respondent_op(respondent_id):
+    return {'delete_respondent': int(respondent_id)}
+
+
+def _delete_ids_op(row_ids):
+    return {'delete_ids': [int(row_id) for row_id in row_ids]}
+
+
+def _update_op(sheet_name, changes):
+    """changes: {row_id: {column: value}}"""
+    return {
+        'update': [[row_id, _typed_row(sheet_name, values)] for row_id, values in changes.items()]
+    }
+
+
+def _plan_entries(entries):
+    """저널 항목을 시트별 최종 변경으로 합침.
+
+    아직 시트에 없는 행(같은 플러시의 append)에 대한 삭제·수정은 append 자체에 반영하고,
+    시트에 이미 있는 행에 대해서만 삭제(respondent_id)·수정(id) 요청을 남긴다.
+    """
+    plans = {}
+    for _, sheet_name, op in entries:
+        plan = plans.setdefault(sheet_name, {'appends': {}, 'deletes': set(), 'delete_ids': set(),
+                                             'updates': {}})
+        if 'append' in op:
+            for record in op['append']:
+                row = _typed_row(sheet_name, record)
+                plan['appends'][row['id']] = row
+        elif 'delete_respondent' in op:
+            rid = op['delete_respondent']
+            plan['deletes'].add(rid)
+            plan['appends'] = {
+                row_id: row for row_id, row in plan['appends'].items()
+                if row.get('respondent_id') != rid
+            }
+        elif 'delete_ids' in op:
+            for row_id in op['delete_ids']:
+                # 같은 플러시의 append 는 재시도일 수 있으므로 시트에서도 지우도록 남김
+                plan['appends'].pop(row_id, None)
+                plan['updates'].pop(row_id, None)
+                plan['delete_ids'].add(row_id)
+        elif 'update' in op:
+            for row_id, values in op['update']:
+                if row_id in plan['appends']:
+                    plan['appends'][row_id].update(values)
+                else:
+                    plan['updates'].setdefault(row_id, {}).update(values)
+    return plans
+
+
+def _flush_entries(entries):
+    """write_queue.flush 콜백. 모든 시트의 변경을 한 번의 batch_update로 반영.
+
+    id / respondent_id 컬럼만 한 번에 읽어 행 위치를 찾는다. 이미 시트에 있는 id 의
+    append 는 건너뛰고 삭제 대상에서도 빼므로, 반영 직후 저널 삭제 전에 죽어
+    같은 항목이 다시 와도 안전하다.
+    """
+    with quota.priority('write'):
+        _flush_plans(_plan_entries(entries))
+
+
+def _flush_plans(plans):
+    ranges, targets = [], []
+    for sheet_name, plan in plans.items():
+        for column in ('id', 'respondent_id') if plan['deletes'] else ('id',):
+            letter = _column_letter(sheet_name, column)
+            ranges.append(f"'{sheet_name}'!{letter}:{letter}")
+            targets.append((sheet_name, column))
+    label = '+'.join(sorted(plans))
+    response = _sheets_call('values_batch_get', label, _get_spreadsheet().values_batch_get,
+                            ranges, params={'majorDimension': 'COLUMNS'})
+    columns = {}
+    for target, value_range in zip(targets, response.get('valueRanges', [])):
+        values = value_range.get('values') or [[]]
+        columns[target] = [str(v) for v in values[0]]
+
+    updates, deletes, appends = [], [], []
+    for sheet_name, plan in plans.items():
+        ws = _get_worksheet(sheet_name)
+        ids = columns.get((sheet_name, 'id'), [])
+        position = {v: idx for idx, v in enumerate(ids) if idx > 0}   # 0-based, header=0
+        for row_id, values in plan['updates'].items():
+            idx = position.get(str(row_id))
+            if idx is None:
+                continue
+            for column, value in values.items():
+                updates.append({
+                    'updateCells': {
+                        'start': {
+                            'sheetId': ws.id,
+                            'rowIndex': idx,
+                            'columnIndex': _DYNAMIC_HEADERS[sheet_name].index(column),
+                        },
+                        'rows': [{'values': [_cell_data(value)]}],
+                        'fields': 'userEnteredValue',
+                    }
+                })
+        to_delete = set()
+        if plan['deletes']:
+            # 같은 플러시의 append 로 이미 들어간 행(재시도 시)은 지우지 않음
+            rids = {str(rid) for rid in plan['deletes']}
+            new_ids = {str(row_id) for row_id in plan['appends']}
+            rid_values = columns.get((sheet_name, 'respondent_id'), [])
+            to_delete.update(
+                idx + 1 for idx, v in enumerate(rid_values)
+                if idx > 0 and v in rids and (idx >= len(ids) or ids[idx] not in new_ids)
+            )
+        for row_id in plan['delete_ids']:
+            idx = position.get(str(row_id))
+            if idx is not None:
+                to_delete.add(idx + 1)
+        if to_delete:
+            deletes.extend(_delete_requests(ws, sorted(to_delete)))
+        rows = [row for row_id, row in plan['appends'].items() if str(row_id) not in position]
+        if rows:
+            appends.append({
+                'appendCells': {
+                    'sheetId': ws.id,
+                    'rows': [
+                        {'values': [_cell_data(v) for v in _sheet_values(sheet_name, row)]}
+                        for row in rows
+                    ],
+                    'fields': 'userEnteredValue',
+                }
+            })
+    # updateCells 는 삭제 전 행 번호 기준이므로 가장 먼저, append 는 마지막에
+    requests = updates + deletes + appends
+    if requests:
+        _sheets_call('batch_update', label, _fenced_batch_update, {'requests': requests})
+
+
+def _fenced_batch_update(body):
+    # 위에서 id 컬럼을 읽은 뒤 플러시 lease 를 잃었으면 쓰지 않음 — 새 holder 가 같은 항목을 반영한다
+    write_queue.fence()
+    return _get_spreadsheet().batch_update(body)
 
 
 # ─── RESPONDENTS ──────────────────────────────────────────────────────────────
 
 def insert_respondent(name, organization, job_type, career_stage):
-    ws = _get_worksheet('respondents')
-    new_id = _next_id('respondents')
+    new_id = _allocate_ids('respondents')
     created_at = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-    ws.append_row(
-        [new_id, name, organization or '', job_type, career_stage, created_at],
-        value_input_option='USER_ENTERED'
-    )
-    _invalidate('respondents')
-    return {
+    record = {
         'id': new_id,
         'name': name,
         'organization': organization or '',
@@ -132,184 +917,235 @@ def insert_respondent(name, organization, job_type, career_stage):
         'career_stage': career_stage,
         'created_at': created_at,
     }
+    _write('respondents', _append_op('respondents', [record]))
+    return record
 
 
 def get_respondent_by_id(respondent_id):
-    for r in _all_rows('respondents'):
-        if int(r['id']) == respondent_id:
-            return {
-                'id': int(r['id']),
-                'name': r['name'],
-                'organization': r['organization'],
-                'job_type': r['job_type'],
-                'career_stage': r['career_stage'],
-                'created_at': r['created_at'],
-            }
-    return None
+    r = _table('respondents').get(respondent_id)
+    if r is None:
+        return None
+    return {
+        'id': r['id'],
+        'name': r['name'],
+        'organization': r['organization'],
+        'job_type': r['job_type'],
+        'career_stage': r['career_stage'],
+        'created_at': r['created_at'],
+    }
+
+
+def iter_respondents(chunk_size):
+    """전체 응답자를 chunk_size 명씩 나눈 리스트로 생성 (내보내기용)."""
+    table = _table('respondents')
+    for start in range(0, len(table), chunk_size):
+        yield table.records(start, start + chunk_size)
+
+
+def get_respondent_profiles():
+    """{respondent_id: (job_type, career_stage)} — 전체 응답자 (코호트 집계용)."""
+    return {r['id']: (r['job_type'], r['career_stage']) for r in _table('respondents').records()}
 
 
 # ─── DIAGNOSIS RESULTS ────────────────────────────────────────────────────────
 
 def delete_diagnosis_by_respondent(respondent_id):
-    _delete_rows_for_respondent('diagnosis_results', respondent_id)
-
-
-def insert_diagnosis_results(respondent_id, results):
-    """results: list of {competency_id, scenario_id, likert_score}"""
-    ws = _get_worksheet('diagnosis_results')
-    next_id = _next_id('diagnosis_results')
-    rows = []
-    for r in results:
-        rows.append([
-            next_id, respondent_id,
-            r['competency_id'], r['scenario_id'],
-            r['likert_score'], '', 1
-        ])
-        next_id += 1
-    if rows:
-        ws.append_rows(rows, value_input_option='USER_ENTERED')
-    _invalidate('diagnosis_results')
+    _write('diagnosis_results', _delete_respondent_op(respondent_id))
+
+
+def replace_diagnosis_results(respondent_id, results, rank_map):
+    """응답자의 진단 결과를 통째로 교체.
+
+    results: list of {competency_id, scenario_id, likert_score}
+    rank_map: {competency_id: priority_rank} — 저장 전에 계산된 우선순위
+    """
+    records = _diagnosis_records(_allocate_ids('diagnosis_results', len(results)),
+                                 respondent_id, results, rank_map)
+    ops = [_delete_respondent_op(respondent_id)]
+    if records:
+        ops.append(_append_op('diagnosis_results', records))
+    _write('diagnosis_results', *ops)
+
+
+def _diagnosis_records(first_id, respondent_id, results, rank_map):
+    return [
+        {
+            'id': first_id + i,
+            'respondent_id': respondent_id,
+            'competency_id': r['competency_id'],
+            'scenario_id': r['scenario_id'],
+            'likert_score': r['likert_score'],
+            'priority_rank': rank_map.get(int(r['competency_id'])),
+            'is_active': 1,
+        }
+        for i, r in enumerate(results)
+    ]
+
+
+def import_diagnoses(entries):
+    """응답자와 진단 결과를 한꺼번에 기록 (일괄 가져오기).
+
+    entries: list of (respondent, results, rank_map)
+      respondent: {name, organization, job_type, career_stage}
+    id 는 시트별로 한 번에 발급하고, 시트마다 append op 하나로 기록한다.
+    생성된 respondent 레코드 리스트를 반환.
+    """
+    if not entries:
+        return []
+    created_at = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    first_rid = _allocate_ids('respondents', len(entries))
+    total = sum(len(results) for _, results, _ in entries)
+    next_did = _allocate_ids('diagnosis_results', total) if total else 0
+
+    respondents, diagnosis = [], []
+    for i, (respondent, results, rank_map) in enumerate(entries):
+        respondents.append({
+            'id': first_rid + i,
+            'name': respondent['name'],
+            'organization': respondent.get('organization') or '',
+            'job_type': respondent['job_type'],
+            'career_stage': respondent['career_stage'],
+            'created_at': created_at,
+        })
+        diagnosis.extend(_diagnosis_records(next_did, first_rid + i, results, rank_map))
+        next_did += len(results)
+    # 두 op 를 모두 만든(검증한) 뒤에 기록 — 진단 결과가 잘못되면 응답자도 기록하지 않음
+    respondent_op = _append_op('respondents', respondents)
+    diagnosis_op = _append_op('diagnosis_results', diagnosis) if diagnosis else None
+    _write('respondents', respondent_op)
+    if diagnosis_op:
+        _write('diagnosis_results', diagnosis_op)
+    return respondents
 
 
 def get_diagnosis_rows(respondent_id, active_only=True):
     result = []
-    for r in _all_rows('diagnosis_results'):
-        if int(r['respondent_id']) != respondent_id:
-            continue
-        if active_only and str(r['is_active']) != '1':
+    for r in _table('diagnosis_results').rows_for(respondent_id):
+        if active_only and r['is_active'] != 1:
             continue
         result.append({
-            'id': int(r['id']),
-            'respondent_id': int(r['respondent_id']),
-            'competency_id': int(r['competency_id']),
-            'scenario_id': int(r['scenario_id']),
-            'likert_score': int(r['likert_score']),
-            'priority_rank': int(r['priority_rank']) if r.get('priority_rank') else None,
-            'is_active': int(r['is_active']),
+            'id': r['id'],
+            'respondent_id': r['respondent_id'],
+            'competency_id': r['competency_id'],
+            'scenario_id': r['scenario_id'],
+            'likert_score': r['likert_score'],
+            'priority_rank': r['priority_rank'],
+            'is_active': r['is_active'],
         })
     return result
 
 
-def update_priority_ranks(respondent_id, rank_map):
-    """rank_map: {competency_id: priority_rank}"""
-    ws = _get_worksheet('diagnosis_results')
-    all_values = ws.get_all_values()
-    if len(all_values) <= 1:
-        return
-    header = all_values[0]
-    rid_col = header.index('respondent_id')
-    cid_col = header.index('competency_id')
-    rank_col = header.index('priority_rank')
-    active_col = header.index('is_active')
-
-    cell_updates = []
-    for i, row in enumerate(all_values[1:], start=2):
-        if str(row[rid_col]) != str(respondent_id):
-            continue
-        if str(row[active_col]) != '1':
-            continue
-        comp_id = int(row[cid_col])
-        if comp_id in rank_map:
-            cell_updates.append(gspread.Cell(i, rank_col + 1, rank_map[comp_id]))
-    if cell_updates:
-        ws.update_cells(cell_updates)
-    _invalidate('diagnosis_results')
+def get_diagnosis_rows_for(respondent_ids):
+    """{respondent_id: [row, ...]} — 비활성 행 포함, 응답자 여러 명을 한 번에."""
+    table = _table('diagnosis_results')
+    return {rid: table.rows_for(rid) for rid in respondent_ids}
 
 
 def update_diagnosis_rankings(respondent_id, rankings):
     """rankings: list of {competency_id, priority_rank, is_active}"""
-    ws = _get_worksheet('diagnosis_results')
-    all_values = ws.get_all_values()
-    if len(all_values) <= 1:
-        return
-    header = all_values[0]
-    rid_col = header.index('respondent_id')
-    cid_col = header.index('competency_id')
-    rank_col = header.index('priority_rank')
-    active_col = header.index('is_active')
-
     ranking_map = {int(item['competency_id']): item for item in rankings}
-    cell_updates = []
-    for i, row in enumerate(all_values[1:], start=2):
-        if str(row[rid_col]) != str(respondent_id):
-            continue
-        comp_id = int(row[cid_col])
-        if comp_id in ranking_map:
-            item = ranking_map[comp_id]
-            cell_updates.append(gspread.Cell(i, rank_col + 1, item['priority_rank']))
-            cell_updates.append(gspread.Cell(i, active_col + 1, item.get('is_active', 1)))
-    if cell_updates:
-        ws.update_cells(cell_updates)
-    _invalidate('diagnosis_results')
+    changes = {}
+    for r in _table('diagnosis_results').rows_for(int(respondent_id)):
+        item = ranking_map.get(r['competency_id'])
+        if item is not None:
+            changes[r['id']] = {
+                'priority_rank': item['priority_rank'],
+                'is_active': item.get('is_active', 1),
+            }
+    if changes:
+        _write('diagnosis_results', _update_op('diagnosis_results', changes))
+
+
+def update_priority_ranks(changes):
+    """changes: {row_id: priority_rank} — 응답자 구분 없이 한 번의 일괄 수정으로 기록 (재산정용)."""
+    if changes:
+        _write('diagnosis_results', _update_op('diagnosis_results', {
+            row_id: {'priority_rank': rank} for row_id, rank in changes.items()
+        }))
+
+
+def get_diagnosis_columns():
+    """전체 진단 결과를 컬럼별 array('i') 로 반환 (집계·재산정용). 빈 값은 columnar.NULL.
+
+    컬럼: id, respondent_id, competency_id, likert_score, priority_rank, is_active
+    """
+    return _table('diagnosis_results').live_columns(
+        ('id', 'respondent_id', 'competency_id', 'likert_score', 'priority_rank', 'is_active'))
 
 
 # ─── ROADMAP ITEMS ────────────────────────────────────────────────────────────
 
 def delete_roadmap_by_respondent(respondent_id):
-    _delete_rows_for_respondent('roadmap_items', respondent_id)
+    _write('roadmap_items', _delete_respondent_op(respondent_id))
+
+
+def delete_roadmap_items(item_ids):
+    """id 목록의 로드맵 항목을 한 번에 삭제."""
+    if item_ids:
+        _write('roadmap_items', _delete_ids_op(item_ids))
 
 
 def insert_roadmap_items(items):
     """items: list of {respondent_id, course_id, competency_id, order_index, phase}"""
-    ws = _get_worksheet('roadmap_items')
-    next_id = _next_id('roadmap_items')
-    rows = []
+    next_id = _allocate_ids('roadmap_items', len(items))
+    records = []
     for item in items:
-        rows.append([
-            next_id, item['respondent_id'], item['course_id'],
-            item['competency_id'], item['order_index'], item['phase']
-        ])
+        records.append({
+            'id': next_id,
+            'respondent_id': item['respondent_id'],
+            'course_id': item['course_id'],
+            'competency_id': item['competency_id'],
+            'order_index': item['order_index'],
+            'phase': item['phase'],
+        })
         next_id += 1
-    if rows:
-        ws.append_rows(rows, value_input_option='USER_ENTERED')
-    _invalidate('roadmap_items')
+    if records:
+        _write('roadmap_items', _append_op('roadmap_items', records))
 
 
 def get_roadmap_rows(respondent_id):
     result = []
-    for r in _all_rows('roadmap_items'):
-        if int(r['respondent_id']) != respondent_id:
-            continue
+    for r in _table('roadmap_items').rows_for(respondent_id):
         result.append({
-            'id': int(r['id']),
-            'respondent_id': int(r['respondent_id']),
-            'course_id': int(r['course_id']),
-            'competency_id': int(r['competency_id']),
-            'order_index': int(r['order_index']),
+            'id': r['id'],
+            'respondent_id': r['respondent_id'],
+            'course_id': r['course_id'],
+            'competency_id': r['competency_id'],
+            'order_index': r['order_index'],
             'phase': r['phase'],
         })
     result.sort(key=lambda x: (x['phase'], x['order_index']))
     return result
 
 
+def get_roadmap_rows_for(respondent_ids):
+    """{respondent_id: [row, ...]} — 각 목록은 get_roadmap_rows 와 같은 순서."""
+    table = _table('roadmap_items')
+    return {
+        rid: sorted(table.rows_for(rid), key=lambda x: (x['phase'], x['order_index']))
+        for rid in respondent_ids
+    }
+
+
 def update_roadmap_items(respondent_id, items):
     """items: list of {id, order_index, phase}"""
-    ws = _get_worksheet('roadmap_items')
-    all_values = ws.get_all_values()
-    if len(all_values) <= 1:
-        return
-    header = all_values[0]
-    id_col = header.index('id')
-    rid_col = header.index('respondent_id')
-    order_col = header.index('order_index')
-    phase_col = header.index('phase')
-
-    item_map = {int(item['id']): item for item in items}
-    cell_updates = []
-    for i, row in enumerate(all_values[1:], start=2):
-        if str(row[rid_col]) != str(respondent_id):
-            continue
-        row_id = int(row[id_col])
-        if row_id in item_map:
-            cell_updates.append(gspread.Cell(i, order_col + 1, item_map[row_id]['order_index']))
-            cell_updates.append(gspread.Cell(i, phase_col + 1, item_map[row_id]['phase']))
-    if cell_updates:
-        ws.update_cells(cell_updates)
-    _invalidate('roadmap_items')
+    own_ids = {r['id'] for r in _table('roadmap_items').rows_for(int(respondent_id))}
+    changes = {
+        int(item['id']): {'order_index': item['order_index'], 'phase': item['phase']}
+        for item in items
+        if int(item['id']) in own_ids
+    }
+    if changes:
+        _write('roadmap_items', _update_op('roadmap_items', changes))
 
 
 # ─── 정적 참조 데이터 (Google Sheets에서 읽기 전용, 5분 캐시) ─────────────────
 
+def static_version():
+    """정적 참조 데이터 전체의 내용 해시. 내용이 바뀔 때만 달라지며 워커 간에도 같다."""
+    return _digest([_static_entry(name)[2] for name in STATIC_SHEETS])[:16]
+
+
 def get_competency_groups():
     """competency_groups 전체 반환. sub_category가 빈 문자열이면 None으로 정규화."""
     result = []
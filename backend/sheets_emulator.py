@@ -0,0 +1,311 @@
+"""
+Google Sheets 메모리 에뮬레이터 (로컬 벤치마크·개발용)
+
+sheets.py 가 쓰는 gspread Spreadsheet / Worksheet 의 일부를 메모리에서 흉내 냅니다.
+
+  Spreadsheet : worksheet, worksheets, add_worksheet, values_batch_get, batch_update
+  Worksheet   : get_all_values, get_all_records, col_values, append_row(s), update_cells, delete_rows
+
+값은 시트처럼 문자열로 보관하고 돌려줍니다 (get_all_records 는 numericise_ignore=['all'] 과 같음).
+API 호출 하나마다 latency + 행 수 × per_row_latency 만큼 지연하고, 분당 읽기/쓰기 요청 수가
+read_quota / write_quota 를 넘으면 실제 API 처럼 아무것도 바꾸지 않은 채
+gspread.exceptions.APIError(429)를 냅니다.
+호출 수는 calls[(op, sheet)] 에 쌓입니다.
+
+사용:
+    spreadsheet = sheets_emulator.Spreadsheet(latency=0.2)
+    spreadsheet.load_static(models.DB_PATH)
+    sheets_emulator.install(spreadsheet)
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from collections import Counter, deque
+
+import gspread
+import requests
+from gspread.utils import a1_range_to_grid_range
+
+QUOTA_WINDOW = 60   # 초 — 시트 API 할당량은 분 단위
+
+# 정적 탭 컬럼 (migrate_to_sheets.py 와 같은 순서)
+STATIC_COLUMNS = {
+    'competency_groups': ['id', 'name', 'sub_category'],
+    'competencies': ['id', 'group_id', 'name', 'description'],
+    'scenarios': ['id', 'group_id', 'situation'],
+    'scenario_competencies': ['id', 'scenario_id', 'competency_id'],
+    'courses': ['id', 'competency_id', 'name', 'description', 'duration_hours', 'semester'],
+}
+
+
+def _cell(value):
+    return '' if value is None else str(value)
+
+
+def _quota_error(kind):
+    response = requests.Response()
+    response.status_code = 429
+    response._content = json.dumps({'error': {
+        'code': 429,
+        'message': f"Quota exceeded for quota metric '{kind} requests' (emulator)",
+        'status': 'RESOURCE_EXHAUSTED',
+    }}).encode('utf-8')
+    return gspread.exceptions.APIError(response)
+
+
+class Worksheet:
+
+    def __init__(self, spreadsheet, title, sheet_id, rows=()):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.rows = [[_cell(v) for v in row] for row in rows]
+
+    @property
+    def _properties(self):
+        return {'title': self.title, 'sheetId': self.id, 'index': 0,
+                'gridProperties': {'rowCount': len(self.rows), 'columnCount': len(self.rows[0]) if self.rows else 0}}
+
+    def _admit(self, kind):
+        self.spreadsheet._admit(kind, self.title)
+
+    def _done(self, op, rows=0):
+        self.spreadsheet._done(op, self.title, rows)
+
+    # ─── 읽기 ──────────────────────────────────────────────────────────────────
+
+    def get_all_values(self):
+        self._admit('read')
+        with self.spreadsheet.lock:
+            values = [list(row) for row in self.rows]
+        self._done('get_all_values', len(values))
+        return values
+
+    def get_all_records(self, head=1, numericise_ignore=None, **_kwargs):
+        self._admit('read')
+        with self.spreadsheet.lock:
+            header = list(self.rows[head - 1]) if len(self.rows) >= head else []
+            records = [dict(zip(header, row + [''] * (len(header) - len(row)))) for row in self.rows[head:]]
+        self._done('get_all_records', len(records))
+        return records
+
+    def col_values(self, col, **_kwargs):
+        self._admit('read')
+        with self.spreadsheet.lock:
+            values = [row[col - 1] if len(row) >= col else '' for row in self.rows]
+        while values and values[-1] == '':
+            values.pop()
+        self._done('col_values', len(values))
+        return values
+
+    # ─── 쓰기 ──────────────────────────────────────────────────────────────────
+
+    def append_rows(self, values, value_input_option=None, **_kwargs):
+        self._admit('write')
+        with self.spreadsheet.lock:
+            self.rows.extend([_cell(v) for v in row] for row in values)
+        self._done('append_rows', len(values))
+
+    def append_row(self, values, value_input_option=None, **_kwargs):
+        self.append_rows([values], value_input_option)
+
+    def update_cells(self, cell_list, value_input_option=None):
+        self._admit('write')
+        with self.spreadsheet.lock:
+            for cell in cell_list:
+                self._set(cell.row - 1, cell.col - 1, cell.value)
+        self._done('update_cells', len({cell.row for cell in cell_list}))
+
+    def delete_rows(self, start_index, end_index=None):
+        self._admit('write')
+        with self.spreadsheet.lock:
+            del self.rows[start_index - 1:end_index or start_index]
+        self._done('delete_rows', (end_index or start_index) - start_index + 1)
+
+    def _set(self, row_index, col_index, value):
+        while len(self.rows) <= row_index:
+            self.rows.append([])
+        row = self.rows[row_index]
+        while len(row) <= col_index:
+            row.append('')
+        row[col_index] = _cell(value)
+
+    def _grid(self, grid_range, major_dimension='ROWS'):
+        """A1 범위를 API 응답처럼 (뒤쪽 빈 셀·빈 행 생략) 잘라 반환."""
+        rows = self.rows[grid_range.get('startRowIndex', 0):grid_range.get('endRowIndex')]
+        start_col, end_col = grid_range.get('startColumnIndex', 0), grid_range.get('endColumnIndex')
+        values = [row[start_col:end_col] for row in rows]
+        if major_dimension == 'COLUMNS':
+            width = max(map(len, values), default=0)
+            values = [[row[i] if i < len(row) else '' for row in values] for i in range(width)]
+        for line in values:
+            while line and line[-1] == '':
+                line.pop()
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+
+class Spreadsheet:
+
+    def __init__(self, latency=0.0, per_row_latency=0.0, read_quota=None, write_quota=None,
+                 spreadsheet_id='emulator'):
+        self.id = spreadsheet_id
+        self.client = None
+        self.latency = latency
+        self.per_row_latency = per_row_latency
+        self.quota = {'read': read_quota, 'write': write_quota}
+        self.lock = threading.RLock()
+        self.calls = Counter()
+        self._sheets = {}
+        self._recent = {'read': deque(), 'write': deque()}
+        self._next_sheet_id = 1
+
+    def _admit(self, kind, sheet):
+        """API 요청 시작: 할당량 확인. 넘으면 429 — 호출하는 쪽은 아무것도 바꾸기 전에 부름."""
+        now = time.monotonic()
+        with self.lock:
+            recent = self._recent[kind]
+            while recent and recent[0] <= now - QUOTA_WINDOW:
+                recent.popleft()
+            limit = self.quota[kind]
+            if limit is not None and len(recent) >= limit:
+                self.calls['quota_exceeded', sheet] += 1
+                raise _quota_error(kind)
+            recent.append(now)
+
+    def _done(self, op, sheet, rows=0):
+        """API 요청 끝: 호출 수 기록 → 지연."""
+        with self.lock:
+            self.calls[op, sheet] += 1
+        delay = self.latency + rows * self.per_row_latency
+        if delay:
+            time.sleep(delay)
+
+    def reset_calls(self):
+        with self.lock:
+            self.calls.clear()
+
+    # ─── 워크시트 ──────────────────────────────────────────────────────────────
+
+    def add(self, title, rows=()):
+        """API 호출 없이 워크시트를 만들고 rows 로 채움 (데이터 준비용)."""
+        with self.lock:
+            ws = self._sheets[title] = Worksheet(self, title, self._next_sheet_id, rows)
+            self._next_sheet_id += 1
+            return ws
+
+    def load_static(self, db_path):
+        """SQLite(database.db)의 정적 참조 데이터를 정적 탭으로 복사."""
+        conn = sqlite3.connect(db_path)
+        try:
+            for title, columns in STATIC_COLUMNS.items():
+                rows = conn.execute(f'SELECT {", ".join(columns)} FROM {title} ORDER BY id').fetchall()
+                self.add(title, [columns] + [list(r) for r in rows])
+        finally:
+            conn.close()
+
+    def worksheet(self, title):
+        self._admit('read', title)
+        with self.lock:
+            ws = self._sheets.get(title)
+        self._done('worksheet', title)
+        if ws is None:
+            raise gspread.WorksheetNotFound(title)
+        return ws
+
+    def worksheets(self):
+        self._admit('read', '')
+        self._done('worksheets', '')
+        with self.lock:
+            return list(self._sheets.values())
+
+    def add_worksheet(self, title, rows=100, cols=26, index=None):
+        self._admit('write', title)
+        ws = self.add(title)
+        self._done('add_worksheet', title)
+        return ws
+
+    # ─── values / batchUpdate ─────────────────────────────────────────────────
+
+    def values_batch_get(self, ranges, params=None):
+        major_dimension = (params or {}).get('majorDimension', 'ROWS')
+        parsed = []
+        for a1 in ranges:
+            title, _, cells = a1.partition('!')
+            parsed.append((a1, title.strip("'").replace("''", "'"), cells))
+        label = ','.join(title for _, title, _ in parsed)
+        self._admit('read', label)
+        value_ranges = []
+        with self.lock:
+            for a1, title, cells in parsed:
+                ws = self._sheets.get(title)
+                if ws is None:
+                    raise gspread.WorksheetNotFound(title)
+                grid = a1_range_to_grid_range(cells) if cells else {}
+                value_ranges.append({'range': a1, 'majorDimension': major_dimension,
+                                     'values': ws._grid(grid, major_dimension)})
+        self._done('values_batch_get', label, sum(len(vr['values']) for vr in value_ranges))
+        return {'spreadsheetId': self.id, 'valueRanges': value_ranges}
+
+    def batch_update(self, body):
+        rows, titles = 0, set()
+        with self.lock:
+            by_id = {ws.id: ws for ws in self._sheets.values()}
+        for request in body['requests']:
+            if not {'updateCells', 'deleteDimension', 'appendCells'} & set(request):
+                raise NotImplementedError(f'emulator does not support request {list(request)}')
+            target = next(iter(request.values()))
+            sheet_id = target.get('sheetId', target.get('start', target.get('range', {})).get('sheetId'))
+            if sheet_id in by_id:
+                titles.add(by_id[sheet_id].title)
+        label = ','.join(sorted(titles))
+        # 할당량 확인이 먼저 — 429 면 요청 전체가 반영되지 않음 (재시도해도 두 번 지워지지 않음)
+        self._admit('write', label)
+        with self.lock:
+            for request in body['requests']:
+                if 'updateCells' in request:
+                    req = request['updateCells']
+                    ws = by_id[req['start']['sheetId']]
+                    for r, row in enumerate(req['rows']):
+                        for c, cell in enumerate(row.get('values', [])):
+                            ws._set(req['start'].get('rowIndex', 0) + r, req['start'].get('columnIndex', 0) + c,
+                                    _entered_value(cell))
+                    rows += len(req['rows'])
+                elif 'deleteDimension' in request:
+                    rng = request['deleteDimension']['range']
+                    del by_id[rng['sheetId']].rows[rng['startIndex']:rng['endIndex']]
+                    rows += rng['endIndex'] - rng['startIndex']
+                elif 'appendCells' in request:
+                    req = request['appendCells']
+                    by_id[req['sheetId']].rows.extend(
+                        [_entered_value(cell) for cell in row.get('values', [])] for row in req['rows']
+                    )
+                    rows += len(req['rows'])
+        self._done('batch_update', label, rows)
+        return {'spreadsheetId': self.id, 'replies': [{} for _ in body['requests']]}
+
+
+def _entered_value(cell):
+    """CellData.userEnteredValue → 시트에 보이는 문자열."""
+    value = cell.get('userEnteredValue', {})
+    if 'numberValue' in value:
+        number = value['numberValue']
+        return str(int(number)) if float(number).is_integer() else str(number)
+    if 'stringValue' in value:
+        return value['stringValue']
+    return ''
+
+
+def install(spreadsheet):
+    """sheets.py 가 실제 스프레드시트 대신 spreadsheet 를 쓰도록 연결.
+
+    스냅샷의 워크시트 메타데이터로 gspread.Worksheet 를 직접 만들지 않도록, 에뮬레이터를 쓰는
+    프로세스는 STATIC_SNAPSHOT_PATH 를 별도 경로로 두어야 한다.
+    """
+    import sheets
+    sheets._spreadsheet = spreadsheet
+    sheets._worksheets.clear()
+    sheets._worksheet_properties.clear()
@@ -0,0 +1,51 @@
+"""
+정적 참조 데이터 디스크 스냅샷 (웜 스타트용)
+
+마지막으로 시트에서 받은 정적 탭과 워크시트 메타데이터를 gzip 으로 압축한 JSON 파일로
+보관합니다. 새로 뜬 워커는 이 파일로 캐시를 채워 첫 요청부터 시트를 기다리지 않고
+응답하며, 백그라운드 갱신이 끝나면 파일을 다시 씁니다.
+
+  {'spreadsheet_id': str, 'saved_at': float,
+   'tables': {sheet_name: [header, row, ...]},   # 값은 시트와 같은 문자열
+   'worksheets': {title: worksheet properties}}
+
+환경변수:
+  STATIC_SNAPSHOT_PATH : 스냅샷 파일 경로 (기본: backend/static_snapshot.json.gz)
+"""
+
+import os
+import gzip
+import json
+import logging
+import tempfile
+
+STATIC_SNAPSHOT_PATH = os.environ.get(
+    'STATIC_SNAPSHOT_PATH', os.path.join(os.path.dirname(__file__), 'static_snapshot.json.gz')
+)
+
+logger = logging.getLogger(__name__)
+
+
+def load():
+    """스냅샷 dict 또는 None (파일이 없거나 읽을 수 없으면)."""
+    try:
+        with gzip.open(STATIC_SNAPSHOT_PATH, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning('ignoring unreadable snapshot %s', STATIC_SNAPSHOT_PATH, exc_info=True)
+        return None
+
+
+def save(data):
+    """임시 파일에 쓴 뒤 교체 — 동시에 쓰는 워커가 있어도 읽는 쪽은 완전한 파일만 봄."""
+    directory = os.path.dirname(STATIC_SNAPSHOT_PATH) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        os.replace(tmp_path, STATIC_SNAPSHOT_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,346 @@
+"""
+SQLite 저장소 (STORAGE_BACKEND=sqlite)
+sheets.py 와 같은 함수를 로컬 SQLite 위에서 제공합니다. 대규모 코호트를 로컬에서 돌리거나
+Sheets 백엔드와 성능을 비교할 때 사용합니다.
+
+  동적 테이블 : SQLITE_DB_PATH (WAL 모드, respondent_id 인덱스)
+  정적 테이블 : models.DB_PATH (seed_data.py 로 만든 database.db, 읽기 전용으로 ATTACH)
+
+환경변수:
+  SQLITE_DB_PATH : 동적 데이터 DB 파일 경로 (기본: backend/local_store.db)
+"""
+
+import os
+import sqlite3
+import datetime
+import threading
+from array import array
+
+from columnar import NULL
+from models import DB_PATH
+
+SQLITE_DB_PATH = os.environ.get(
+    'SQLITE_DB_PATH', os.path.join(os.path.dirname(__file__), 'local_store.db')
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS respondents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    organization TEXT NOT NULL DEFAULT '',
+    job_type TEXT NOT NULL,
+    career_stage TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS diagnosis_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    respondent_id INTEGER NOT NULL,
+    competency_id INTEGER NOT NULL,
+    scenario_id INTEGER NOT NULL,
+    likert_score INTEGER NOT NULL,
+    priority_rank INTEGER,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_diagnosis_respondent ON diagnosis_results (respondent_id);
+CREATE TABLE IF NOT EXISTS roadmap_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    respondent_id INTEGER NOT NULL,
+    course_id INTEGER NOT NULL,
+    competency_id INTEGER NOT NULL,
+    order_index INTEGER NOT NULL,
+    phase TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_roadmap_respondent ON roadmap_items (respondent_id);
+"""
+
+_local = threading.local()
+
+
+def get_db():
+    """스레드/프로세스별 커넥션. 최초 연결 시 스키마를 생성."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and _local.pid == os.getpid():
+        return conn
+    conn = sqlite3.connect(f'file:{SQLITE_DB_PATH}', timeout=30, uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    conn.execute('ATTACH DATABASE ? AS ref', (f'file:{DB_PATH}?mode=ro',))
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+# ─── RESPONDENTS ──────────────────────────────────────────────────────────────
+
+def insert_respondent(name, organization, job_type, career_stage):
+    conn = get_db()
+    created_at = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    with conn:
+        cur = conn.execute(
+            'INSERT INTO respondents (name, organization, job_type, career_stage, created_at)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            (name, organization or '', job_type, career_stage, created_at)
+        )
+    return {
+        'id': cur.lastrowid,
+        'name': name,
+        'organization': organization or '',
+        'job_type': job_type,
+        'career_stage': career_stage,
+        'created_at': created_at,
+    }
+
+
+def get_respondent_by_id(respondent_id):
+    row = get_db().execute(
+        'SELECT id, name, organization, job_type, career_stage, created_at'
+        ' FROM respondents WHERE id = ?', (respondent_id,)
+    ).fetchone()
+    return dict(row) if row else None
+
+
+def iter_respondents(chunk_size):
+    """id 순으로 chunk_size 명씩 읽어 생성 (키셋 페이지네이션)."""
+    last_id = 0
+    while True:
+        rows = get_db().execute(
+            'SELECT id, name, organization, job_type, career_stage, created_at'
+            ' FROM respondents WHERE id > ? ORDER BY id LIMIT ?', (last_id, chunk_size)
+        ).fetchall()
+        if not rows:
+            return
+        yield [dict(r) for r in rows]
+        last_id = rows[-1]['id']
+
+
+def get_respondent_profiles():
+    rows = get_db().execute('SELECT id, job_type, career_stage FROM respondents')
+    return {r['id']: (r['job_type'], r['career_stage']) for r in rows}
+
+
+# ─── DIAGNOSIS RESULTS ────────────────────────────────────────────────────────
+
+def delete_diagnosis_by_respondent(respondent_id):
+    conn = get_db()
+    with conn:
+        conn.execute('DELETE FROM diagnosis_results WHERE respondent_id = ?', (respondent_id,))
+
+
+def replace_diagnosis_results(respondent_id, results, rank_map):
+    """results: list of {competency_id, scenario_id, likert_score}
+    rank_map: {competency_id: priority_rank}"""
+    conn = get_db()
+    with conn:
+        conn.execute('DELETE FROM diagnosis_results WHERE respondent_id = ?', (respondent_id,))
+        conn.executemany(
+            'INSERT INTO diagnosis_results'
+            ' (respondent_id, competency_id, scenario_id, likert_score, priority_rank, is_active)'
+            ' VALUES (?, ?, ?, ?, ?, 1)',
+            [
+                (respondent_id, r['competency_id'], r['scenario_id'], r['likert_score'],
+                 rank_map.get(int(r['competency_id'])))
+                for r in results
+            ]
+        )
+
+
+def import_diagnoses(entries):
+    """entries: list of (respondent, results, rank_map) — 한 트랜잭션으로 기록."""
+    conn = get_db()
+    created_at = datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    respondents = []
+    with conn:
+        for respondent, results, rank_map in entries:
+            record = {
+                'name': respondent['name'],
+                'organization': respondent.get('organization') or '',
+                'job_type': respondent['job_type'],
+                'career_stage': respondent['career_stage'],
+                'created_at': created_at,
+            }
+            cur = conn.execute(
+                'INSERT INTO respondents (name, organization, job_type, career_stage, created_at)'
+                ' VALUES (:name, :organization, :job_type, :career_stage, :created_at)', record
+            )
+            record = {'id': cur.lastrowid, **record}
+            conn.executemany(
+                'INSERT INTO diagnosis_results'
+                ' (respondent_id, competency_id, scenario_id, likert_score, priority_rank, is_active)'
+                ' VALUES (?, ?, ?, ?, ?, 1)',
+                [
+                    (record['id'], r['competency_id'], r['scenario_id'], r['likert_score'],
+                     rank_map.get(int(r['competency_id'])))
+                    for r in results
+                ]
+            )
+            respondents.append(record)
+    return respondents
+
+
+def get_diagnosis_rows(respondent_id, active_only=True):
+    sql = ('SELECT id, respondent_id, competency_id, scenario_id, likert_score, priority_rank, is_active'
+           ' FROM diagnosis_results WHERE respondent_id = ?')
+    if active_only:
+        sql += ' AND is_active = 1'
+    rows = get_db().execute(sql + ' ORDER BY id', (respondent_id,)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _rows_for(sql, respondent_ids, order):
+    ids = list(respondent_ids)
+    result = {rid: [] for rid in ids}
+    if ids:
+        placeholders = ','.join('?' * len(ids))
+        for r in get_db().execute(f'{sql} WHERE respondent_id IN ({placeholders}) ORDER BY {order}', ids):
+            result[r['respondent_id']].append(dict(r))
+    return result
+
+
+def get_diagnosis_rows_for(respondent_ids):
+    return _rows_for(
+        'SELECT id, respondent_id, competency_id, scenario_id, likert_score, priority_rank, is_active'
+        ' FROM diagnosis_results', respondent_ids, 'id'
+    )
+
+
+def update_diagnosis_rankings(respondent_id, rankings):
+    """rankings: list of {competency_id, priority_rank, is_active}"""
+    conn = get_db()
+    with conn:
+        conn.executemany(
+            'UPDATE diagnosis_results SET priority_rank = ?, is_active = ?'
+            ' WHERE respondent_id = ? AND competency_id = ?',
+            [
+                (item['priority_rank'], item.get('is_active', 1), respondent_id, int(item['competency_id']))
+                for item in rankings
+            ]
+        )
+
+
+def update_priority_ranks(changes):
+    """changes: {row_id: priority_rank}"""
+    conn = get_db()
+    with conn:
+        conn.executemany(
+            'UPDATE diagnosis_results SET priority_rank = ? WHERE id = ?',
+            [(rank, row_id) for row_id, rank in changes.items()]
+        )
+
+
+def get_diagnosis_columns():
+    """sheets.get_diagnosis_columns 와 같은 형식 (빈 priority_rank 는 columnar.NULL)."""
+    columns = ('id', 'respondent_id', 'competency_id', 'likert_score', 'priority_rank', 'is_active')
+    rows = get_db().execute(
+        'SELECT id, respondent_id, competency_id, likert_score, COALESCE(priority_rank, ?), is_active'
+        ' FROM diagnosis_results ORDER BY id', (NULL,)
+    ).fetchall()
+    values = list(zip(*rows)) or [()] * len(columns)
+    return {col: array('i', vals) for col, vals in zip(columns, values)}
+
+
+# ─── ROADMAP ITEMS ────────────────────────────────────────────────────────────
+
+def delete_roadmap_by_respondent(respondent_id):
+    conn = get_db()
+    with conn:
+        conn.execute('DELETE FROM roadmap_items WHERE respondent_id = ?', (respondent_id,))
+
+
+def delete_roadmap_items(item_ids):
+    """id 목록의 로드맵 항목을 한 번에 삭제."""
+    conn = get_db()
+    with conn:
+        conn.executemany('DELETE FROM roadmap_items WHERE id = ?', [(int(i),) for i in item_ids])
+
+
+def insert_roadmap_items(items):
+    """items: list of {respondent_id, course_id, competency_id, order_index, phase}"""
+    conn = get_db()
+    with conn:
+        conn.executemany(
+            'INSERT INTO roadmap_items (respondent_id, course_id, competency_id, order_index, phase)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            [
+                (item['respondent_id'], item['course_id'], item['competency_id'],
+                 item['order_index'], item['phase'])
+                for item in items
+            ]
+        )
+
+
+def get_roadmap_rows(respondent_id):
+    rows = get_db().execute(
+        'SELECT id, respondent_id, course_id, competency_id, order_index, phase'
+        ' FROM roadmap_items WHERE respondent_id = ? ORDER BY phase, order_index',
+        (respondent_id,)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def get_roadmap_rows_for(respondent_ids):
+    return _rows_for(
+        'SELECT id, respondent_id, course_id, competency_id, order_index, phase FROM roadmap_items',
+        respondent_ids, 'phase, order_index'
+    )
+
+
+def update_roadmap_items(respondent_id, items):
+    """items: list of {id, order_index, phase}"""
+    conn = get_db()
+    with conn:
+        conn.executemany(
+            'UPDATE roadmap_items SET order_index = ?, phase = ? WHERE id = ? AND respondent_id = ?',
+            [(item['order_index'], item['phase'], int(item['id']), respondent_id) for item in items]
+        )
+
+
+# ─── 정적 참조 데이터 (database.db, 읽기 전용) ────────────────────────────────
+
+def static_version():
+    """정적 참조 데이터 버전. database.db 가 다시 시드되면 달라짐."""
+    st = os.stat(DB_PATH)
+    return f'{st.st_mtime_ns:x}-{st.st_size:x}'
+
+
+def get_competency_groups():
+    rows = get_db().execute('SELECT id, name, sub_category FROM ref.competency_groups ORDER BY id')
+    return [
+        {'id': r['id'], 'name': r['name'], 'sub_category': r['sub_category'] or None}
+        for r in rows
+    ]
+
+
+def get_competencies():
+    rows = get_db().execute('SELECT id, group_id, name, description FROM ref.competencies ORDER BY id')
+    return [
+        {'id': r['id'], 'group_id': r['group_id'], 'name': r['name'],
+         'description': r['description'] or ''}
+        for r in rows
+    ]
+
+
+def get_scenarios():
+    rows = get_db().execute('SELECT id, group_id, situation FROM ref.scenarios ORDER BY id')
+    return [dict(r) for r in rows]
+
+
+def get_scenario_competencies():
+    rows = get_db().execute(
+        'SELECT id, scenario_id, competency_id FROM ref.scenario_competencies ORDER BY id'
+    )
+    return [dict(r) for r in rows]
+
+
+def get_courses():
+    rows = get_db().execute(
+        'SELECT id, competency_id, name, description, duration_hours, semester'
+        ' FROM ref.courses ORDER BY id'
+    )
+    return [
+        {'id': r['id'], 'competency_id': r['competency_id'], 'name': r['name'],
+         'description': r['description'] or '', 'duration_hours': r['duration_hours'] or 0,
+         'semester': r['semester'] or ''}
+        for r in rows
+    ]
@@ -0,0 +1,63 @@
+"""
+저장소 선택 레이어
+라우트는 이 모듈만 사용하고, 실제 저장소 구현은 STORAGE_BACKEND 환경변수로 선택합니다.
+
+  sheets (기본) : Google Sheets (sheets.py)
+  sqlite        : 로컬 SQLite, WAL 모드 + respondent_id 인덱스 (sqlite_store.py)
+
+각 구현 모듈은 INTERFACE 에 나열된 함수를 같은 시그니처·반환 형식으로 제공해야 합니다.
+"""
+
+import os
+import importlib
+
+BACKENDS = {
+    'sheets': 'sheets',
+    'sqlite': 'sqlite_store',
+}
+
+INTERFACE = (
+    # respondents
+    'insert_respondent',
+    'get_respondent_by_id',
+    'get_respondent_profiles',
+    'iter_respondents',
+    # diagnosis_results
+    'replace_diagnosis_results',
+    'import_diagnoses',
+    'delete_diagnosis_by_respondent',
+    'get_diagnosis_rows',
+    'update_diagnosis_rankings',
+    'update_priority_ranks',
+    'get_diagnosis_columns',
+    'get_diagnosis_rows_for',
+    # roadmap_items
+    'delete_roadmap_by_respondent',
+    'delete_roadmap_items',
+    'insert_roadmap_items',
+    'get_roadmap_rows',
+    'get_roadmap_rows_for',
+    'update_roadmap_items',
+    # 정적 참조 데이터
+    'get_competency_groups',
+    'get_competencies',
+    'get_scenarios',
+    'get_scenario_competencies',
+    'get_courses',
+    'static_version',
+)
+
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'sheets')
+if STORAGE_BACKEND not in BACKENDS:
+    raise RuntimeError(f'알 수 없는 STORAGE_BACKEND: {STORAGE_BACKEND} (가능: {", ".join(BACKENDS)})')
+
+backend = importlib.import_module(BACKENDS[STORAGE_BACKEND])
+
+for _name in INTERFACE:
+    globals()[_name] = getattr(backend, _name)
+
+
+def start():
+    """구현 모듈에 백그라운드 작업(start)이 있으면 시작. 앱 기동 시 한 번 호출."""
+    if hasattr(backend, 'start'):
+        backend.start()
@@ -0,0 +1,41 @@
+"""
+테스트 공통 설정: 임시 디렉터리의 저널·공유 캐시와 메모리 시트 에뮬레이터를 사용.
+"""
+
+import os
+import sys
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix='competency-tests-')
+os.environ.update({
+    'STORAGE_BACKEND': 'sheets',
+    'SPREADSHEET_ID': 'emulator',
+    'SHARED_CACHE_PATH': os.path.join(_workdir, 'shared_cache.db'),
+    'WRITE_JOURNAL_PATH': os.path.join(_workdir, 'write_journal.db'),
+    'STATIC_SNAPSHOT_PATH': os.path.join(_workdir, 'static_snapshot.json.gz'),
+    'SHEETS_READ_QUOTA': '0',
+    'SHEETS_WRITE_QUOTA': '0',
+    'METRICS_DIR': '',
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import sheets
+import sheets_emulator
+import write_queue
+
+
+@pytest.fixture
+def spreadsheet():
+    """동적 탭(헤더만 있음)을 가진 빈 에뮬레이터. 캐시와 저널은 비운 상태로 시작."""
+    spreadsheet = sheets_emulator.Spreadsheet()
+    for name, headers in sheets._DYNAMIC_HEADERS.items():
+        spreadsheet.add(name, [headers])
+    sheets_emulator.install(spreadsheet)
+    sheets.invalidate()
+    conn = write_queue._connect()
+    conn.execute('DELETE FROM journal')
+    conn.execute('DELETE FROM failed')
+    yield spreadsheet
+    sheets.invalidate()
@@ -0,0 +1,43 @@
+"""
+컬럼형 테이블: 삭제는 묘비로 남기고, 읽기는 묘비를 건너뛰며, 압축 후에도 인덱스가 맞아야 함
+"""
+
+import columnar
+from columnar import ColumnTable
+
+HEADERS = ['id', 'respondent_id', 'order_index', 'phase']
+
+
+def _table(count):
+    return ColumnTable(HEADERS, HEADERS[:3], [
+        {'id': i, 'respondent_id': (i + 1) // 2, 'order_index': i, 'phase': 'Phase 1'}
+        for i in range(1, count + 1)
+    ])
+
+
+def test_deletes_are_skipped_by_every_read():
+    table = _table(10)
+    table.delete_respondent(2)        # id 3, 4
+    table.delete_ids([7])
+    assert len(table) == 7
+    assert [r['id'] for r in table.records()] == [1, 2, 5, 6, 8, 9, 10]
+    assert [r['id'] for r in table.records(2, 4)] == [5, 6]
+    assert list(table.live_columns(['id'])['id']) == [1, 2, 5, 6, 8, 9, 10]
+    assert table.get(3) is None and [r['id'] for r in table.rows_for(4)] == [8]
+    assert table.copy().records() == table.records()
+
+
+def test_compaction_keeps_indexes_and_appends_consistent():
+    table = _table(10)
+    table.delete_respondent(1)
+    table.append({'id': 1, 'respondent_id': 1, 'order_index': 99, 'phase': 'Phase 2'})
+    assert list(table.column('id')) == [3, 4, 5, 6, 7, 8, 9, 10, 1]
+    assert table.get(1)['phase'] == 'Phase 2' and table.get(5)['order_index'] == 5
+    assert [r['id'] for r in table.rows_for(1)] == [1]
+
+
+def test_many_deletes_compact_eagerly(monkeypatch):
+    monkeypatch.setattr(columnar, 'COMPACT_MIN', 2)
+    table = _table(10)
+    table.delete_ids([1, 2, 3])
+    assert len(table.columns['id']) == 7 and not table._dead
@@ -0,0 +1,76 @@
+"""
+roadmap_sync: 이전 카탈로그와 비교해 목록이 바뀐 역량만, 로드맵에 이미 있는 역량에만 반영
+"""
+
+import roadmap_sync
+import sheets
+import storage
+
+
+def _item(item_id, course_id, competency_id, order_index, phase):
+    return {'id': item_id, 'respondent_id': 1, 'course_id': course_id, 'competency_id': competency_id,
+            'order_index': order_index, 'phase': phase}
+
+
+ROADMAP = [
+    _item(1, 100, 10, 0, 'Phase 1'),
+    _item(2, 101, 10, 1, 'Phase 1'),
+    _item(3, 200, 20, 0, 'Phase 2'),
+]
+CATALOG = {10: [100, 101], 20: [200]}
+
+
+def _plan(current):
+    return roadmap_sync.plan_respondent(1, ROADMAP, roadmap_sync.changed_lists(CATALOG, current))
+
+
+def test_unchanged_catalog_plans_nothing():
+    assert roadmap_sync.changed_lists(CATALOG, dict(CATALOG)) == {}
+    assert _plan(dict(CATALOG)) == ([], [])
+
+
+def test_removed_and_added_courses_keep_the_existing_phase():
+    deletes, inserts = _plan({10: [100, 102], 20: [200]})
+    assert deletes == [2]
+    assert [(i['course_id'], i['phase'], i['order_index']) for i in inserts] == [(102, 'Phase 1', 2)]
+
+
+def test_competencies_not_on_the_roadmap_are_left_alone():
+    assert _plan({10: [100, 101], 20: [200], 30: [300]}) == ([], [])
+
+
+def test_courses_the_respondent_removed_are_not_added_back():
+    roadmap = ROADMAP[:1] + ROADMAP[2:]      # 사용자가 101 을 뺀 로드맵
+    changes = roadmap_sync.changed_lists(CATALOG, {10: [100, 101], 20: [200, 201]})
+    deletes, inserts = roadmap_sync.plan_respondent(1, roadmap, changes)
+    assert deletes == [] and [i['course_id'] for i in inserts] == [201]
+
+
+# ─── run_once ─────────────────────────────────────────────────────────────────
+
+def _course(course_id, competency_id):
+    return {'id': course_id, 'competency_id': competency_id, 'name': '', 'description': '',
+            'duration_hours': 0, 'semester': '상반기'}
+
+
+def test_run_once_touches_only_changed_competencies_on_the_roadmap(spreadsheet, monkeypatch):
+    catalog = {'version': 'v1', 'courses': [_course(100, 1), _course(200, 2), _course(500, 5)]}
+    monkeypatch.setattr(storage, 'static_version', lambda: catalog['version'])
+    monkeypatch.setattr(storage, 'get_courses', lambda: catalog['courses'])
+    respondent = sheets.insert_respondent('a', '', '연구직', '신진')
+    sheets.insert_roadmap_items([
+        {'respondent_id': respondent['id'], 'course_id': 100, 'competency_id': 1,
+         'order_index': 0, 'phase': 'Phase 1'},
+        {'respondent_id': respondent['id'], 'course_id': 200, 'competency_id': 2,
+         'order_index': 0, 'phase': 'Phase 2'},
+    ])
+
+    # 기준이 없으면 기록만 하고, 같은 버전은 다시 훑지 않음
+    assert roadmap_sync.run_once() == {'respondents': 0, 'deleted': 0, 'inserted': 0}
+    assert roadmap_sync.run_once() is None
+
+    catalog['version'] = 'v2'
+    catalog['courses'] = [_course(101, 1), _course(200, 2), _course(500, 5), _course(501, 5)]
+    assert roadmap_sync.run_once() == {'respondents': 1, 'deleted': 1, 'inserted': 1}
+    rows = sheets.get_roadmap_rows(respondent['id'])
+    assert sorted((r['competency_id'], r['course_id']) for r in rows) == [(1, 101), (2, 200)]
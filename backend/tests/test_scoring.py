@@ -0,0 +1,34 @@
+"""
+scoring.rank_columns: 응답자 전체 일괄 순위가 compute_priorities 와 같은지
+"""
+
+from array import array
+
+import scoring
+from columnar import NULL
+
+
+def _columns(rows):
+    names = ('id', 'respondent_id', 'competency_id', 'likert_score', 'priority_rank', 'is_active')
+    return {name: array('i', [row[i] for row in rows]) for i, name in enumerate(names)}
+
+
+def test_matches_compute_priorities_per_respondent():
+    rows = [
+        (1, 1, 10, 3, NULL, 1), (2, 1, 11, 5, NULL, 1), (3, 1, 10, 4, NULL, 1),
+        (4, 2, 12, 2, NULL, 1), (5, 2, 13, 2, NULL, 1),
+    ]
+    ranks = scoring.rank_columns(_columns(rows))
+    for rid in (1, 2):
+        expected = scoring.compute_priorities(
+            [{'competency_id': r[2], 'likert_score': r[3]} for r in rows if r[1] == rid])
+        assert {r[2]: int(rank) for r, rank in zip(rows, ranks) if r[1] == rid} == expected
+
+
+def test_inactive_rows_are_left_out():
+    rows = [
+        (1, 1, 10, 5, 3, 0), (2, 1, 10, 5, 3, 0),   # 응답자가 제외한 역량
+        (3, 1, 11, 4, 1, 1), (4, 1, 12, 2, 2, 1),
+    ]
+    ranks = scoring.rank_columns(_columns(rows))
+    assert ranks.tolist() == [NULL, NULL, 1, 2]
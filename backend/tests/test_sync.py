@@ -0,0 +1,72 @@
+"""
+동적 시트 동기화: 증분 동기화는 스냅샷을 다시 게시하지 않고 새 행만 op 로 기록
+"""
+
+import shared_cache
+import sheets
+import write_queue
+
+
+def _add_rows(spreadsheet, first, count, respondent_id=1):
+    spreadsheet._sheets['roadmap_items'].rows.extend(
+        [str(i), str(respondent_id), '1', '1', str(i), 'Phase 1'] for i in range(first, first + count)
+    )
+
+
+def test_empty_tail_only_bumps_fetched_at(spreadsheet):
+    _add_rows(spreadsheet, 1, 3)
+    sheets._table('roadmap_items')
+    before = shared_cache.meta('roadmap_items')
+
+    sheets._sync_table('roadmap_items')
+    after = shared_cache.meta('roadmap_items')
+    assert (after.base, after.head) == (before.base, before.head)
+    assert after.fetched_at > before.fetched_at
+
+
+def test_tail_is_logged_as_an_append_op(spreadsheet):
+    _add_rows(spreadsheet, 1, 3)
+    sheets._table('roadmap_items')
+    before = shared_cache.meta('roadmap_items')
+    _add_rows(spreadsheet, 4, 2)
+    write_queue.enqueue('roadmap_items', sheets._delete_ids_op([5]))   # 아직 시트에 반영 안 됨
+
+    table = sheets._sync_table('roadmap_items')
+    after = shared_cache.meta('roadmap_items')
+    assert after.base == before.base and after.head == before.head + 1
+    assert [op['append'][0]['id'] for op in shared_cache.ops_since('roadmap_items', before.head)] == [4]
+    assert table.get(4) is not None and table.get(5) is None
+    assert shared_cache.sync_state('roadmap_items')['sheet_rows'] == 5
+
+
+def test_publish_keeps_ops_logged_during_the_fetch(spreadsheet):
+    _add_rows(spreadsheet, 1, 3)
+    sheets._table('roadmap_items')
+    build = sheets._build_table
+
+    def build_during_write(sheet_name, records):
+        # 다운로드한 뒤 게시하기 전에 들어온 쓰기
+        sheets._build_table = build
+        sheets._write_through('roadmap_items', sheets._update_op('roadmap_items', {2: {'order_index': 9}}))
+        return build(sheet_name, records)
+
+    sheets._build_table = build_during_write
+    try:
+        sheets._fetch_table('roadmap_items')
+    finally:
+        sheets._build_table = build
+    meta, records, ops = shared_cache.load('roadmap_items')
+    table = sheets._build_table('roadmap_items', records)
+    for op in ops:
+        sheets._apply_op('roadmap_items', table, op)
+    assert table.get(2)['order_index'] == 9
+    assert sheets._table('roadmap_items').get(2)['order_index'] == 9
+
+
+def test_snapshot_failure_does_not_fail_the_static_fetch(spreadsheet, monkeypatch):
+    def broken_save(data):
+        raise RuntimeError('dictionary changed size during iteration')
+
+    monkeypatch.setattr(sheets.snapshot, 'save', broken_save)
+    sheets._get_worksheet('roadmap_items')
+    sheets._save_snapshot({}, 0)      # 예외 없이 경고만 남김
@@ -0,0 +1,77 @@
+"""
+입력 검증: 잘못된 값은 저널·공유 op 로그에 들어가기 전에 400 으로 거부
+"""
+
+import json
+
+import pytest
+from flask import Flask
+
+import bulk_import
+import sheets
+import write_queue
+from routes.diagnosis import diagnosis_bp
+from routes.roadmap import roadmap_bp
+
+
+@pytest.fixture
+def client(spreadsheet):
+    app = Flask(__name__)
+    app.register_blueprint(diagnosis_bp, url_prefix='/api')
+    app.register_blueprint(roadmap_bp, url_prefix='/api')
+    return app.test_client()
+
+
+def test_out_of_range_values_never_reach_the_journal(spreadsheet):
+    with pytest.raises(ValueError):
+        sheets.insert_roadmap_items([{'respondent_id': 1, 'course_id': 1, 'competency_id': 1,
+                                      'order_index': 2 ** 31, 'phase': 'Phase 1'}])
+    assert write_queue.pending() == []
+
+
+def test_roadmap_update_rejects_out_of_range_order_index(client):
+    sheets.insert_roadmap_items([{'respondent_id': 1, 'course_id': 1, 'competency_id': 1,
+                                  'order_index': 0, 'phase': 'Phase 1'}])
+    item_id = sheets.get_roadmap_rows(1)[0]['id']
+    response = client.put('/api/roadmap/1', json={'items': [
+        {'id': item_id, 'order_index': 2 ** 31, 'phase': 'Phase 1'}]})
+    assert response.status_code == 400
+    assert sheets.get_roadmap_rows(1)[0]['order_index'] == 0
+    assert not any('update' in op for _, _, op in write_queue.pending())
+
+
+@pytest.mark.parametrize('result', [
+    {'competency_id': 0, 'scenario_id': 1, 'likert_score': 3},
+    {'competency_id': '3', 'scenario_id': 1, 'likert_score': 3},
+    {'competency_id': 3, 'scenario_id': -1, 'likert_score': 3},
+    {'competency_id': 3, 'scenario_id': 1, 'likert_score': 2 ** 31},
+    {'competency_id': 3, 'scenario_id': 1, 'likert_score': 6},
+    {'competency_id': 3, 'scenario_id': 1},
+])
+def test_diagnosis_rejects_invalid_results(client, result):
+    response = client.post('/api/diagnosis', json={'respondent_id': 1, 'results': [result]})
+    assert response.status_code == 400
+    assert write_queue.pending() == []
+
+
+def test_diagnosis_accepts_valid_results(client):
+    response = client.post('/api/diagnosis', json={'respondent_id': 1, 'results': [
+        {'competency_id': 3, 'scenario_id': 1, 'likert_score': 5}]})
+    assert response.status_code == 201
+    assert [r['competency_id'] for r in sheets.get_diagnosis_rows(1)] == [3]
+
+
+def test_bulk_import_reports_bad_lines_without_writing_them(spreadsheet):
+    lines = [json.dumps(item) for item in (
+        {'name': 'a', 'job_type': '연구직', 'career_stage': '신진', 'results': 5},
+        {'name': 'b', 'job_type': '연구직', 'career_stage': '신진', 'results': [5]},
+        {'name': 'c', 'job_type': '연구직', 'career_stage': '신진',
+         'results': [{'competency_id': 1, 'scenario_id': 1, 'likert_score': 2.5}]},
+        {'name': 'd', 'job_type': '연구직', 'career_stage': '신진',
+         'results': [{'competency_id': 1, 'scenario_id': 1, 'likert_score': 9}]},
+        {'name': 'e', 'job_type': '연구직', 'career_stage': '신진',
+         'results': [{'competency_id': 1, 'scenario_id': 1, 'likert_score': 4}]},
+    )]
+    summary = bulk_import.import_records(bulk_import.parse_jsonl(lines))
+    assert [e['line'] for e in summary['errors']] == [1, 2, 3, 4]
+    assert summary['respondents'] == 1 and summary['results'] == 1
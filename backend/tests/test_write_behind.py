@@ -0,0 +1,208 @@
+"""
+write-behind 플러시: _plan_entries / _flush_plans 의 멱등성과 write_queue 의 실패 처리
+"""
+
+import time
+
+import gspread
+import pytest
+
+import shared_cache
+import sheets
+import sheets_emulator
+import write_queue
+
+
+def _diagnosis(row_id, respondent_id, competency_id, rank=1):
+    return {'id': row_id, 'respondent_id': respondent_id, 'competency_id': competency_id,
+            'scenario_id': 1, 'likert_score': 3, 'priority_rank': rank, 'is_active': 1}
+
+
+def _rows(spreadsheet, name='diagnosis_results'):
+    return [row for row in spreadsheet._sheets[name].rows[1:]]
+
+
+def _ids(spreadsheet, name='diagnosis_results'):
+    return [int(row[0]) for row in _rows(spreadsheet, name)]
+
+
+def _seed(spreadsheet, records, name='diagnosis_results'):
+    spreadsheet._sheets[name].rows.extend(
+        [str(v) for v in sheets._sheet_values(name, r)] for r in records
+    )
+
+
+def _entries(*ops, sheet='diagnosis_results'):
+    return [(seq, sheet, op) for seq, op in enumerate(ops, start=1)]
+
+
+# ─── _plan_entries ────────────────────────────────────────────────────────────
+
+def test_plan_folds_updates_into_appends_of_the_same_flush():
+    plans = sheets._plan_entries(_entries(
+        sheets._append_op('diagnosis_results', [_diagnosis(1, 7, 10)]),
+        sheets._update_op('diagnosis_results', {1: {'priority_rank': 3}, 2: {'priority_rank': 4}}),
+    ))
+    plan = plans['diagnosis_results']
+    assert plan['appends'][1]['priority_rank'] == 3
+    assert plan['updates'] == {2: {'priority_rank': 4}}
+
+
+def test_plan_delete_respondent_drops_earlier_appends_only():
+    plans = sheets._plan_entries(_entries(
+        sheets._append_op('diagnosis_results', [_diagnosis(1, 7, 10)]),
+        sheets._delete_respondent_op(7),
+        sheets._append_op('diagnosis_results', [_diagnosis(2, 7, 11)]),
+    ))
+    plan = plans['diagnosis_results']
+    assert list(plan['appends']) == [2]
+    assert plan['deletes'] == {7}
+
+
+def test_plan_delete_ids_removes_pending_appends_and_updates():
+    plans = sheets._plan_entries(_entries(
+        sheets._append_op('diagnosis_results', [_diagnosis(1, 7, 10)]),
+        sheets._update_op('diagnosis_results', {5: {'priority_rank': 2}}),
+        sheets._delete_ids_op([1, 5]),
+    ))
+    plan = plans['diagnosis_results']
+    assert plan['appends'] == {} and plan['updates'] == {}
+    assert plan['delete_ids'] == {1, 5}
+
+
+# ─── _flush_plans ─────────────────────────────────────────────────────────────
+
+def test_flush_applies_each_kind_of_op(spreadsheet):
+    _seed(spreadsheet, [_diagnosis(1, 7, 10), _diagnosis(2, 7, 11), _diagnosis(3, 8, 10)])
+    sheets._flush_entries(_entries(
+        sheets._update_op('diagnosis_results', {3: {'priority_rank': 5}}),
+        sheets._delete_ids_op([2]),
+        sheets._append_op('diagnosis_results', [_diagnosis(4, 8, 12)]),
+    ))
+    assert _ids(spreadsheet) == [1, 3, 4]
+    assert _rows(spreadsheet)[1][5] == '5'
+
+
+def test_flush_twice_leaves_the_sheet_unchanged(spreadsheet):
+    _seed(spreadsheet, [_diagnosis(1, 7, 10), _diagnosis(2, 8, 10), _diagnosis(3, 9, 10)])
+    entries = _entries(
+        sheets._append_op('diagnosis_results', [_diagnosis(4, 8, 11), _diagnosis(5, 8, 12)]),
+        sheets._update_op('diagnosis_results', {1: {'priority_rank': 2}}),
+        sheets._delete_ids_op([3]),
+    )
+    sheets._flush_entries(entries)
+    once = _rows(spreadsheet)
+    sheets._flush_entries(entries)
+    assert _rows(spreadsheet) == once
+    assert _ids(spreadsheet) == [1, 2, 4, 5]
+
+
+def test_replayed_replace_keeps_the_new_rows(spreadsheet):
+    # 진단 결과 교체(삭제 + 새 행)가 반영된 직후 저널에서 지우기 전에 죽은 경우
+    _seed(spreadsheet, [_diagnosis(1, 7, 10), _diagnosis(2, 7, 11), _diagnosis(3, 8, 10)])
+    entries = _entries(
+        sheets._delete_respondent_op(7),
+        sheets._append_op('diagnosis_results', [_diagnosis(4, 7, 10), _diagnosis(5, 7, 11)]),
+    )
+    sheets._flush_entries(entries)
+    sheets._flush_entries(entries)
+    assert _ids(spreadsheet) == [3, 4, 5]
+
+
+def test_flush_batches_all_sheets_into_one_write(spreadsheet):
+    sheets._flush_entries([
+        (1, 'respondents', sheets._append_op('respondents', [{
+            'id': 1, 'name': 'a', 'organization': '', 'job_type': '연구직',
+            'career_stage': '신진', 'created_at': '2025-01-01 00:00:00'}])),
+        (2, 'diagnosis_results', sheets._append_op('diagnosis_results', [_diagnosis(1, 1, 10)])),
+    ])
+    writes = {op: n for (op, _), n in spreadsheet.calls.items() if op == 'batch_update'}
+    assert writes == {'batch_update': 1}
+    assert _ids(spreadsheet, 'respondents') == [1] and _ids(spreadsheet) == [1]
+
+
+# ─── write_queue 실패 처리 ────────────────────────────────────────────────────
+
+def _journal():
+    return write_queue._connect().execute(
+        'SELECT seq, attempts FROM journal ORDER BY seq').fetchall()
+
+
+def _failed():
+    return [row[0] for row in write_queue._connect().execute('SELECT seq FROM failed ORDER BY seq')]
+
+
+def test_transient_errors_keep_every_entry(spreadsheet):
+    for i in range(3):
+        write_queue.enqueue('diagnosis_results', {'append': [_diagnosis(i + 1, 7, 10)]})
+
+    def apply(entries):
+        raise sheets_emulator._quota_error('write')
+
+    for _ in range(write_queue.MAX_ATTEMPTS + 1):
+        with pytest.raises(Exception):
+            write_queue.flush(apply)
+    assert [attempts for _, attempts in _journal()] == [0, 0, 0]
+    assert _failed() == []
+
+
+def test_a_bad_entry_is_isolated_and_quarantined(spreadsheet):
+    good = sheets._append_op('diagnosis_results', [_diagnosis(1, 7, 10)])
+    write_queue.enqueue('diagnosis_results', good)
+    bad = write_queue.enqueue('diagnosis_results', {'append': [{'id': 'x'}]})
+    write_queue.enqueue('respondents', sheets._append_op('respondents', [{
+        'id': 1, 'name': 'a', 'organization': '', 'job_type': '연구직',
+        'career_stage': '신진', 'created_at': '2025-01-01 00:00:00'}]))
+
+    assert write_queue.flush(sheets._flush_entries)
+    assert _ids(spreadsheet) == [1] and _ids(spreadsheet, 'respondents') == [1]
+    assert _journal() == [(bad, 1)]
+
+    for _ in range(write_queue.MAX_ATTEMPTS - 1):
+        write_queue.flush(sheets._flush_entries)
+    assert _journal() == [] and _failed() == [bad]
+
+
+def test_emulator_rejects_writes_over_quota_without_applying_them(spreadsheet):
+    _seed(spreadsheet, [_diagnosis(1, 7, 10), _diagnosis(2, 7, 11)])
+    ws = spreadsheet._sheets['diagnosis_results']
+    spreadsheet.quota['write'] = 0
+    with pytest.raises(gspread.exceptions.APIError):
+        spreadsheet.batch_update({'requests': sheets._delete_requests(ws, [2])})
+    with pytest.raises(gspread.exceptions.APIError):
+        ws.append_rows([['3']])
+    assert _ids(spreadsheet) == [1, 2]
+
+
+def test_flush_backs_off_when_another_worker_takes_the_lease(spreadsheet):
+    write_queue.enqueue('diagnosis_results', sheets._append_op('diagnosis_results', [_diagnosis(1, 7, 10)]))
+
+    def apply(entries):
+        # id 컬럼을 읽은 뒤 lease 가 만료되어 다른 워커가 가져간 경우
+        shared_cache._connect().execute(
+            'UPDATE leases SET owner = ?, expires_at = ? WHERE name = ?',
+            ('other-worker', time.time() + 60, write_queue.LEASE_NAME))
+        sheets._flush_entries(entries)
+
+    try:
+        assert write_queue.flush(apply) is False
+    finally:
+        shared_cache._connect().execute('DELETE FROM leases')
+    assert _ids(spreadsheet) == []
+    assert [attempts for _, attempts in _journal()] == [0]
+
+
+def test_flush_renews_its_lease_between_batches(spreadsheet):
+    write_queue.enqueue('diagnosis_results', sheets._append_op('diagnosis_results', [_diagnosis(1, 7, 10)]))
+    expiries = []
+
+    def apply(entries):
+        expiries.append(shared_cache._connect().execute(
+            'SELECT expires_at FROM leases WHERE name = ?', (write_queue.LEASE_NAME,)).fetchone()[0])
+        sheets._flush_entries(entries)
+        expiries.append(shared_cache._connect().execute(
+            'SELECT expires_at FROM leases WHERE name = ?', (write_queue.LEASE_NAME,)).fetchone()[0])
+
+    assert write_queue.flush(apply)
+    assert expiries[1] > expiries[0]
+    assert _ids(spreadsheet) == [1] and _journal() == []
@@ -0,0 +1,223 @@
+"""
+시트 쓰기 write-behind 큐 (로컬 저널 + 백그라운드 플러시)
+
+쓰기 요청은 먼저 로컬 SQLite 저널에 동기적으로(synchronous=FULL) 기록되고,
+백그라운드 스레드가 쌓인 항목을 모아 한 번에 시트로 내보냅니다.
+프로세스가 죽어도 저널에 남은 항목은 다음 기동 시 이어서 플러시됩니다.
+
+같은 호스트의 모든 워커가 하나의 저널을 공유하며, 플러시는 shared_cache 의 lease 를 잡은
+한 워커만 수행합니다. 플러시가 길어져도 lease 가 만료되지 않도록 배치마다, 그리고 시트에
+쓰기 직전마다(fence) 연장하며, 그 사이 다른 워커가 lease 를 가져갔으면 쓰지 않고 물러납니다.
+
+할당량(429)·서버(5xx)·네트워크·설정 오류로 플러시가 실패하면 항목은 그대로 남아
+백오프 후 다시 시도됩니다. 항목 자체가 잘못된 경우(400, 데이터 변환 오류)에만 시트별,
+다시 항목별로 나눠 반영해 문제 항목을 가려내고, 그 항목이 MAX_ATTEMPTS 번 혼자 실패하면
+failed 테이블로 옮기고 로그(error)와 write_queue_quarantined_total 메트릭으로 알립니다.
+
+환경변수:
+  WRITE_JOURNAL_PATH   : 저널 파일 경로 (기본: backend/write_journal.db)
+  WRITE_FLUSH_INTERVAL : 플러시 주기(초, 기본 2)
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+
+import gspread
+
+import metrics
+import shared_cache
+
+WRITE_JOURNAL_PATH = os.environ.get(
+    'WRITE_JOURNAL_PATH', os.path.join(os.path.dirname(__file__), 'write_journal.db')
+)
+WRITE_FLUSH_INTERVAL = float(os.environ.get('WRITE_FLUSH_INTERVAL', '2'))
+LEASE_NAME = 'write-flush'
+LEASE_TTL = 120          # 플러시 lease 유효 시간(초) — 배치·쓰기마다 연장
+MAX_ATTEMPTS = 5         # 혼자 반영해도 이 횟수만큼 실패한 항목은 failed 테이블로 옮김
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS journal ('
+    ' seq INTEGER PRIMARY KEY AUTOINCREMENT, sheet TEXT NOT NULL, op TEXT NOT NULL,'
+    ' created_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0)',
+    'CREATE TABLE IF NOT EXISTS failed ('
+    ' seq INTEGER PRIMARY KEY, sheet TEXT NOT NULL, op TEXT NOT NULL,'
+    ' created_at REAL NOT NULL, error TEXT)',
+)
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()   # lease: 이 스레드가 진행 중인 플러시의 fencing token
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = None
+
+
+class LeaseLost(Exception):
+    """플러시 도중 lease 가 만료되어 다른 워커가 가져감 — 남은 항목은 그 워커가 반영한다."""
+
+
+def _connect():
+    return shared_cache.connect(WRITE_JOURNAL_PATH, 'FULL', _SCHEMA)
+
+
+def _transaction():
+    return shared_cache.transaction('IMMEDIATE', _connect())
+
+
+def enqueue(sheet, op):
+    """op 를 저널에 기록하고 seq 를 반환. 반환 시점에 디스크에 반영되어 있음."""
+    cur = _connect().execute(
+        'INSERT INTO journal (sheet, op, created_at) VALUES (?, ?, ?)',
+        (sheet, json.dumps(op, ensure_ascii=False), time.time())
+    )
+    _wakeup.set()
+    return cur.lastrowid
+
+
+def pending(sheet=None):
+    """아직 시트에 반영되지 않은 항목 [(seq, sheet, op), ...] (seq 순)."""
+    sql = 'SELECT seq, sheet, op FROM journal'
+    args = ()
+    if sheet is not None:
+        sql += ' WHERE sheet = ?'
+        args = (sheet,)
+    rows = _connect().execute(sql + ' ORDER BY seq', args).fetchall()
+    return [(seq, name, json.loads(op)) for seq, name, op in rows]
+
+
+def fence():
+    """진행 중인 플러시의 lease 를 연장. 잃었으면 LeaseLost — 시트에 쓰기 직전마다 호출.
+
+    write_queue.flush 밖에서(apply 를 직접 부른 경우) 호출되면 아무것도 하지 않는다.
+    """
+    token = getattr(_local, 'lease', None)
+    if token is None:
+        return
+    renewed = shared_cache.renew_lease(LEASE_NAME, token, LEASE_TTL)
+    if renewed is None:
+        raise LeaseLost(LEASE_NAME)
+    _local.lease = renewed
+
+
+def flush(apply):
+    """쌓인 항목을 apply([(seq, sheet, op), ...]) 로 한 번에 내보내고 저널에서 제거.
+
+    다른 워커가 플러시 중이거나 도중에 lease 를 잃으면 False 를 반환. 일시적 오류면 항목을
+    그대로 남기고 예외를 다시 던지며, 항목 자체의 오류면 문제 항목만 남기고 나머지는 반영한다
+    (apply 는 같은 항목을 다시 받아도 안전해야 하고, 시트에 쓰기 직전에 fence() 를 불러야 함).
+    """
+    with _flush_lock:
+        entries = pending()
+        if not entries:
+            return True
+        token = shared_cache.acquire_lease(LEASE_NAME, LEASE_TTL)
+        if token is None:
+            return False
+        _local.lease = token
+        try:
+            entries = pending()
+            if entries:
+                _apply_isolated(apply, entries)
+            return True
+        except LeaseLost:
+            logger.warning('write-behind flush lease expired mid-flush; leaving the rest to its new holder')
+            return False
+        finally:
+            _local.lease = None
+            shared_cache.release_lease(LEASE_NAME)
+
+
+def _is_permanent(exc):
+    """다시 보내도 같은 항목 때문에 실패할 오류인지 (잘못된 요청 400, 데이터 변환 오류).
+
+    할당량·서버·네트워크 오류와 인증·권한 같은 설정 오류는 항목과 무관하므로 False.
+    """
+    if isinstance(exc, gspread.exceptions.APIError):
+        return exc.code == 400
+    return isinstance(exc, (KeyError, ValueError, TypeError))
+
+
+def _apply_isolated(apply, entries):
+    """entries 를 반영하고 저널에서 제거. 항목 오류면 시트별 → 항목별로 나눠 다시 반영."""
+    fence()     # 배치마다 lease 연장
+    try:
+        apply(entries)
+    except LeaseLost:
+        raise
+    except Exception as exc:
+        if not _is_permanent(exc):
+            metrics.inc('write_queue_flush_errors_total', (('kind', 'transient'),))
+            raise
+        metrics.inc('write_queue_flush_errors_total', (('kind', 'permanent'),))
+        if len(entries) == 1:
+            _record_failure(entries[0], exc)
+            return
+        by_sheet = {}
+        for entry in entries:
+            by_sheet.setdefault(entry[1], []).append(entry)
+        groups = list(by_sheet.values()) if len(by_sheet) > 1 else [[entry] for entry in entries]
+        logger.warning('write-behind flush of %d entries failed (%r); retrying in %d groups',
+                       len(entries), exc, len(groups))
+        for group in groups:
+            _apply_isolated(apply, group)
+        return
+    with _transaction() as conn:
+        conn.executemany('DELETE FROM journal WHERE seq = ?', [(seq,) for seq, _, _ in entries])
+
+
+def _record_failure(entry, exc):
+    """혼자 반영해도 실패한 항목의 시도 횟수를 늘리고, MAX_ATTEMPTS 에 이르면 failed 로 옮김."""
+    seq, sheet, _ = entry
+    with _transaction() as conn:
+        conn.execute('UPDATE journal SET attempts = attempts + 1 WHERE seq = ?', (seq,))
+        row = conn.execute('SELECT attempts FROM journal WHERE seq = ?', (seq,)).fetchone()
+        quarantined = row is not None and row[0] >= MAX_ATTEMPTS
+        if quarantined:
+            conn.execute(
+                'INSERT INTO failed (seq, sheet, op, created_at, error)'
+                ' SELECT seq, sheet, op, created_at, ? FROM journal WHERE seq = ?',
+                (repr(exc), seq)
+            )
+            conn.execute('DELETE FROM journal WHERE seq = ?', (seq,))
+    if quarantined:
+        logger.error('write-behind entry %d for %s failed %d times (%r); moved to the failed table',
+                     seq, sheet, MAX_ATTEMPTS, exc)
+        metrics.inc('write_queue_quarantined_total', (('sheet', sheet),))
+    else:
+        logger.warning('write-behind entry %d for %s failed on its own (%r); will retry', seq, sheet, exc)
+
+
+def start(apply):
+    """백그라운드 플러시 스레드를 (프로세스당 한 번) 시작."""
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    _worker = threading.Thread(target=_run, args=(apply,), name='sheets-write-behind', daemon=True)
+    _worker.start()
+    atexit.register(_flush_quietly, apply)
+
+
+def _run(apply):
+    delay = WRITE_FLUSH_INTERVAL
+    while True:
+        _wakeup.wait(delay)
+        _wakeup.clear()
+        # 잠깐 기다려 같은 시점에 들어온 쓰기를 한 번에 모음
+        time.sleep(min(WRITE_FLUSH_INTERVAL, 0.2))
+        try:
+            flush(apply)
+            delay = WRITE_FLUSH_INTERVAL
+        except Exception:
+            logger.exception('write-behind flush failed; will retry')
+            delay = min(delay * 2, 60)
+
+
+def _flush_quietly(apply):
+    try:
+        flush(apply)
+    except Exception:
+        logger.exception('write-behind flush at exit failed; entries remain in the journal')